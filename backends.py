@@ -0,0 +1,258 @@
+"""
+Query backends for the filter-and-aggregate path.
+
+The KPI cards, both bar charts and the aggregate API all need the same
+summary of the filtered rows: counts, lifespan sums and mass sums per
+(Launch_Decade, Orbit_Group, IsActive), as a cube.CubeSlice. A backend
+computes it for a filter combination, with one method:
+
+    summarize(data, decade_range, mass_range, orbit_type, status, as_of=None)
+
+- pandas: boolean masks over the whole frame, then one grouping pass. Slow
+  but obviously right; the reference the others are checked against.
+- cube (default): slices the pre-aggregated filter cube, or the event index's
+  cube for an as-of date, and falls back to the sorted-segment index when
+  the mass bounds are off the cube's grid.
+- duckdb / polars: the filter and the grouping fused into one multithreaded
+  query over the snapshot's columns, which stay memory-mapped. Optional
+  dependencies, imported when the backend is created.
+
+`python backends.py [catalog.tsv]` checks every installed backend against
+the reference on a grid of filters and times them.
+
+"""
+
+import threading
+
+import numpy as np
+import pandas as pd
+
+from catalog import ORBIT_GROUPS, SECONDS_PER_YEAR
+from cube import CubeSlice, summarize_frame
+from events import frame_as_of
+
+
+def selected_rows(data, decade_range, mass_range, orbit_type, status, as_of):
+    # Filtered rows as a frame, with status, lifespans and launches as they
+    # stood at `as_of` when one is given
+    if as_of is None:
+        return data.frame_index.select(decade_range, mass_range, orbit_type, status).to_frame()
+    rows = data.frame_index.select(decade_range, mass_range, orbit_type, 'All').to_frame()
+    return frame_as_of(rows, as_of, status)
+
+
+def orbit_code(orbit_type):
+    # Orbit_Group category code the orbit filter keeps: None for 'All', and a
+    # code no row has for an unknown group
+    if orbit_type == 'All':
+        return None
+    return ORBIT_GROUPS.index(orbit_type) if orbit_type in ORBIT_GROUPS else len(ORBIT_GROUPS)
+
+
+def grouped_slice(decade, orbit, active, count, lifespan_sum, mass_sum):
+    # CubeSlice from one row per (decade, orbit code, active) group, as the
+    # query engines return them; decades without rows are left out, as in
+    # summarize_frame.
+    decades = np.unique(decade)
+    cells = (np.searchsorted(decades, decade), np.asarray(orbit, dtype=np.intp), np.asarray(active, dtype=np.intp))
+    shape = (len(decades), len(ORBIT_GROUPS), 2)
+    counts = np.zeros(shape, dtype=np.int64)
+    lifespans = np.zeros(shape)
+    masses = np.zeros(shape)
+    counts[cells] = count
+    lifespans[cells] = lifespan_sum
+    masses[cells] = mass_sum
+    return CubeSlice(decades, counts, lifespans, masses)
+
+
+class PandasBackend:
+    def summarize(self, data, decade_range, mass_range, orbit_type, status, as_of=None):
+        df = data.df if as_of is None else frame_as_of(data.df, as_of)
+        mask = (
+            df["Launch_Decade"].between(decade_range[0], decade_range[1])
+            & df["Mass"].between(mass_range[0], mass_range[1])
+        )
+        if orbit_type != 'All':
+            mask &= df["Orbit_Group"] == orbit_type
+        if status != 'All':
+            mask &= df["IsActive"] == (status == 'Active')
+        return summarize_frame(df[mask])
+
+
+class CubeBackend:
+    def summarize(self, data, decade_range, mass_range, orbit_type, status, as_of=None):
+        cube = data.cube if as_of is None else data.events.at(as_of)
+        summary = cube.select(decade_range, mass_range, orbit_type, status)
+        if summary is None:
+            summary = summarize_frame(selected_rows(data, decade_range, mass_range, orbit_type, status, as_of))
+        return summary
+
+
+def snapshot_columns(data):
+    # The columns a query needs, as arrays over the snapshot's (memory-mapped)
+    # frame; the orbit group as its code in ORBIT_GROUPS, which need not be
+    # the order of the column's categories.
+    df = data.df
+    return {
+        "LDate": df["LDate"].to_numpy(),
+        "DDate": df["DDate"].to_numpy(),
+        "Lifespan_Years": df["Lifespan_Years"].to_numpy(),
+        "Launch_Decade": df["Launch_Decade"].to_numpy(),
+        "IsActive": df["IsActive"].to_numpy(),
+        "Mass": df["Mass"].to_numpy(),
+        "Orbit_Code": pd.Categorical(df["Orbit_Group"], categories=ORBIT_GROUPS).codes,
+    }
+
+
+class DuckDBBackend:
+    # One in-process connection per thread and snapshot; DuckDB parallelizes
+    # each query itself.
+    QUERY = """
+        WITH rows AS (
+            SELECT Launch_Decade, Orbit_Code, Mass, {active} AS active, {lifespan} AS lifespan
+            FROM frame WHERE {launched}
+        )
+        SELECT Launch_Decade, Orbit_Code, active, count(*), sum(lifespan::DOUBLE), sum(Mass::DOUBLE)
+        FROM rows
+        WHERE Launch_Decade BETWEEN $decade_lo AND $decade_hi AND Mass BETWEEN $mass_lo AND $mass_hi
+            AND ($orbit < 0 OR Orbit_Code = $orbit) AND ($status < 0 OR active::INTEGER = $status)
+        GROUP BY ALL
+    """
+    TODAY = dict(active="IsActive", lifespan="Lifespan_Years", launched="true")
+    AS_OF = dict(
+        active="(DDate IS NULL OR DDate > $as_of)",
+        lifespan=f"((epoch(least(coalesce(DDate, $as_of), $as_of)) - epoch(LDate)) / {SECONDS_PER_YEAR})::FLOAT",
+        launched="LDate <= $as_of",
+    )
+
+    def __init__(self):
+        import duckdb
+        self.duckdb = duckdb
+        self._local = threading.local()
+
+    def _connection(self, data):
+        local = self._local
+        if getattr(local, "version", None) != data.version:
+            con = self.duckdb.connect()
+            con.register("frame", pd.DataFrame(snapshot_columns(data), copy=False))
+            local.version, local.con = data.version, con
+        return local.con
+
+    def summarize(self, data, decade_range, mass_range, orbit_type, status, as_of=None):
+        params = {
+            "decade_lo": int(decade_range[0]), "decade_hi": int(decade_range[1]),
+            "mass_lo": float(mass_range[0]), "mass_hi": float(mass_range[1]),
+            "orbit": -1 if orbit_type == 'All' else orbit_code(orbit_type),
+            "status": -1 if status == 'All' else int(status == 'Active'),
+        }
+        if as_of is None:
+            query = self.QUERY.format(**self.TODAY)
+        else:
+            query = self.QUERY.format(**self.AS_OF)
+            params["as_of"] = np.datetime64(as_of, "us").item()
+        rows = self._connection(data).execute(query, params).fetchnumpy()
+        return grouped_slice(*(np.asarray(rows[column]) for column in rows))
+
+
+class PolarsBackend:
+    # One lazily built Polars frame per snapshot; Polars runs each query on
+    # its own thread pool.
+    def __init__(self):
+        import polars as pl
+        self.pl = pl
+        self._lock = threading.Lock()
+        self._frame = (None, None)
+
+    def _snapshot(self, data):
+        with self._lock:
+            version, frame = self._frame
+            if version != data.version:
+                frame = self.pl.DataFrame(snapshot_columns(data))
+                self._frame = (data.version, frame)
+            return frame
+
+    def summarize(self, data, decade_range, mass_range, orbit_type, status, as_of=None):
+        pl = self.pl
+        rows = self._snapshot(data).lazy()
+        if as_of is None:
+            rows = rows.rename({"IsActive": "active", "Lifespan_Years": "lifespan"})
+        else:
+            t = np.datetime64(as_of, "us").item()
+            active = pl.col("DDate").is_null() | (pl.col("DDate") > t)
+            end = pl.when(active).then(pl.lit(t)).otherwise(pl.col("DDate"))
+            seconds = (end - pl.col("LDate")).dt.total_microseconds() / 1e6
+            rows = rows.filter(pl.col("LDate") <= t).with_columns(
+                active=active, lifespan=(seconds / SECONDS_PER_YEAR).cast(pl.Float32)
+            )
+        rows = rows.filter(
+            pl.col("Launch_Decade").is_between(decade_range[0], decade_range[1])
+            & pl.col("Mass").is_between(mass_range[0], mass_range[1])
+        )
+        if orbit_type != 'All':
+            rows = rows.filter(pl.col("Orbit_Code") == orbit_code(orbit_type))
+        if status != 'All':
+            rows = rows.filter(pl.col("active") == (status == 'Active'))
+        groups = rows.group_by("Launch_Decade", "Orbit_Code", "active").agg(
+            pl.len(), pl.col("lifespan").cast(pl.Float64).sum(), pl.col("Mass").cast(pl.Float64).sum()
+        ).collect()
+        return grouped_slice(*(groups[column].to_numpy() for column in groups.columns))
+
+
+BACKENDS = {
+    "pandas": PandasBackend,
+    "cube": CubeBackend,
+    "duckdb": DuckDBBackend,
+    "polars": PolarsBackend,
+}
+
+
+def make_backend(name):
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown query backend {name!r}; choose one of {', '.join(BACKENDS)}")
+    return BACKENDS[name]()
+
+
+if __name__ == '__main__':
+    # Every installed backend against the pandas reference on a grid of
+    # filters, on today's snapshot and an as-of date.
+    import itertools
+    import sys
+    import time
+
+    from catalog import load_catalog
+    from dataset import Dataset
+
+    data = Dataset(load_catalog(sys.argv[1] if len(sys.argv) > 1 else "satcat.tsv"))
+    grid = list(itertools.product(
+        ([1950, 2020], [1980, 2020], [2010, 2010]),
+        ([0, 10000], [0, 5000], [150, 4250]),
+        ('All', 'LEO', 'GEO'),
+        ('All', 'Active', 'Decommissioned'),
+        (None, '2005-12-31'),
+    ))
+
+    def table(summary):
+        # Non-empty (decade, orbit, status) cells; decades with no rows are
+        # kept by the cube and dropped by the others
+        keep = summary.counts.sum(axis=(1, 2)) > 0
+        return (summary.decades[keep], summary.counts[keep], summary.lifespan_sum[keep], summary.mass_sum[keep])
+
+    reference = make_backend("pandas")
+    expected = [table(reference.summarize(data, *filters)) for filters in grid]
+    for name in BACKENDS:
+        try:
+            backend = make_backend(name)
+        except ImportError as e:
+            print(f"{name:>7}  not installed ({e})")
+            continue
+        backend.summarize(data, *grid[0])  # Builds per-snapshot state
+        start = time.perf_counter()
+        results = [table(backend.summarize(data, *filters)) for filters in grid]
+        elapsed = (time.perf_counter() - start) / len(grid)
+        mismatches = [
+            filters for filters, got, want in zip(grid, results, expected)
+            if not (np.array_equal(got[0], want[0]) and np.array_equal(got[1], want[1])
+                    and np.allclose(got[2], want[2], rtol=1e-6) and np.allclose(got[3], want[3], rtol=1e-6))
+        ]
+        print(f"{name:>7}  {elapsed * 1000:8.2f} ms per query  {len(mismatches)} of {len(grid)} filters differ"
+              + (f", e.g. {mismatches[0]}" if mismatches else ""))
@@ -0,0 +1,36 @@
+"""
+Helpers shared by the benchmark scripts (run.py, load.py).
+
+Importing this module has no side effects: unlike run.py, it sets no
+environment variables and imports none of the project modules.
+
+"""
+
+import json
+import os
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def read_history(path):
+    # Earlier runs, oldest first; none if the file does not exist yet
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return json.load(f)
+
+
+def append_history(path, history, run):
+    history.append(run)
+    with open(path, "w") as f:
+        json.dump(history, f, indent=1)
+    print(f"\nAppended results to {path}")
@@ -0,0 +1,470 @@
+"""
+Concurrent load test of the dashboard's callback endpoint.
+
+For each worker count, the app is started under gunicorn (gunicorn.conf.py,
+SATCAT_WORKERS workers) on a synthetic catalog, and --clients simulated
+users browse it at once for --duration seconds. Each user is an asyncio task
+replaying what the browser sends to /_dash-update-component:
+
+    start       the initial call of every callback, as on page load
+    then        random actions with --think seconds between them on average:
+                moving the decade, mass or as-of slider, picking an orbit
+                group or status, switching tabs, paging or sorting the
+                satellite table, zooming the mass-vs-lifespan chart
+
+Each action fires every callback with a changed input, concurrently, with the
+component state the browser would send (the filter stores carry over from
+earlier responses, so unchanged tabs are skipped as they are in the app).
+The callbacks and the initial component values are read from the running
+app's /_dash-dependencies and /_dash-layout.
+
+For every callback (each tab's figure, the KPIs, the table, ...) the report
+gives throughput, p50/p95/p99 latency of the updates (200 responses; hidden
+tabs answer 204 without work and are counted separately) and the error rate.
+Results are appended to a JSON history file and compared with the most
+recent earlier run of the same catalog size, clients and worker count.
+
+A fresh figure cache is used for each worker count, so every configuration
+starts cold. The client needs no HTTP library: one connection per request,
+as gunicorn's sync workers close the connection after each response anyway.
+
+Usage: python benchmarks/load.py [--workers 1 2 4] [--clients 32]
+                                 [--duration 30] [--rows 100000]
+
+"""
+
+import argparse
+import asyncio
+import collections
+import datetime
+import json
+import os
+import platform
+import random
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.common import append_history, git_commit, read_history  # noqa: E402
+from benchmarks.synthetic import write_catalog  # noqa: E402
+
+DEFAULT_WORKERS = [1, 2, 4]
+DEFAULT_HISTORY = os.path.join(ROOT, "benchmarks", "load_history.json")
+UPDATE_PATH = "/_dash-update-component"
+
+# Relative frequency of each user action
+ACTIONS = {
+    "decade": 4,
+    "mass": 3,
+    "orbit": 2,
+    "status": 2,
+    "as-of": 2,
+    "tab": 3,
+    "page": 2,
+    "sort": 1,
+    "zoom": 1,
+}
+SORT_COLUMNS = ["jcat", "name", "launched", "decommissioned", "mass", "lifespan", "orbit", "status"]
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(workers, port, workdir):
+    # gunicorn on the catalog in `workdir`, with a figure cache of its own
+    memo = os.path.join(workdir, f"figures-{workers}.sqlite")
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(memo + suffix):
+            os.remove(memo + suffix)
+    env = dict(
+        os.environ,
+        SATCAT_WORKERS=str(workers),
+        SATCAT_BIND=f"127.0.0.1:{port}",
+        SATCAT_CACHE_DIR=os.path.join(workdir, "cache"),
+        SATCAT_MEMO_PATH=memo,
+        SATCAT_WATCH_INTERVAL="0",
+    )
+    log = open(os.path.join(workdir, f"gunicorn-{workers}.log"), "w")
+    command = [sys.executable, "-m", "gunicorn", "-c", os.path.join(ROOT, "gunicorn.conf.py"),
+               "--pythonpath", ROOT, "dashboard:server"]
+    return subprocess.Popen(command, cwd=workdir, env=env, stdout=log, stderr=subprocess.STDOUT)
+
+
+def wait_ready(server, base, timeout):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"server exited with status {server.returncode}")
+        try:
+            with urllib.request.urlopen(base + "/readyz", timeout=5) as response:
+                if response.status == 200:
+                    return
+        except (urllib.error.URLError, ConnectionError):
+            pass
+        time.sleep(0.5)
+    raise RuntimeError(f"server not ready after {timeout:.0f}s")
+
+
+def stop_server(server):
+    server.terminate()
+    try:
+        server.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        server.kill()
+        server.wait()
+
+
+def get_json(base, path):
+    with urllib.request.urlopen(base + path, timeout=30) as response:
+        return json.load(response)
+
+
+def layout_components(node, found):
+    # {component id: (type, props)} of the components with an id in a
+    # /_dash-layout tree
+    if isinstance(node, list):
+        for child in node:
+            layout_components(child, found)
+    elif isinstance(node, dict) and "props" in node:
+        props = node["props"]
+        if isinstance(props.get("id"), str):
+            found[props["id"]] = (node.get("type"), props)
+        layout_components(props.get("children"), found)
+    return found
+
+
+def parse_output(output):
+    # 'graph.figure' or '..a.b...c.d..' (several outputs) into [(id, property)]
+    if output.startswith(".."):
+        return [tuple(part.split(".", 1)) for part in output[2:-2].split("...")]
+    return [tuple(output.split(".", 1))]
+
+
+class Callback:
+    def __init__(self, dependency):
+        self.output = dependency["output"]
+        self.outputs = parse_output(self.output)
+        self.inputs = [(d["id"], d["property"]) for d in dependency["inputs"]]
+        self.state = [(d["id"], d["property"]) for d in dependency["state"]]
+        self.initial = not dependency.get("prevent_initial_call")
+        # Reported under its first output's component, e.g. 'survival-graph',
+        # made unique by App
+        self.component = self.outputs[0][0]
+        self.name = self.component
+
+    def body(self, values, changed):
+        def prop(key):
+            return {"id": key[0], "property": key[1], "value": values.get(f"{key[0]}.{key[1]}")}
+
+        outputs = [{"id": id_, "property": property_} for id_, property_ in self.outputs]
+        return {
+            "output": self.output,
+            "outputs": outputs if len(outputs) > 1 else outputs[0],
+            "inputs": [prop(key) for key in self.inputs],
+            "state": [prop(key) for key in self.state],
+            "changedPropIds": changed,
+        }
+
+
+class App:
+    # The callbacks and initial component values of the running app
+    def __init__(self, base):
+        self.callbacks = [Callback(d) for d in get_json(base, "/_dash-dependencies")]
+        # Callbacks writing to the same component (allow_duplicate outputs,
+        # e.g. a tab's figure and its zoom handler) are told apart by their
+        # inputs when they have few, and by their position otherwise
+        for c in self._duplicates():
+            if len(c.inputs) <= 2:
+                c.name += " <- " + ", ".join(f"{id_}.{p}" for id_, p in c.inputs)
+        for c in self._duplicates():
+            c.name += f" #{self.callbacks.index(c)}"
+        self.components = layout_components(get_json(base, "/_dash-layout"), {})
+        self.values = {}
+        for id_, (_, props) in self.components.items():
+            for name, value in props.items():
+                if name not in ("id", "children", "style"):
+                    self.values[f"{id_}.{name}"] = value
+        tabs = self.components["tabs"][1]["children"]
+        self.tabs = [tab["props"]["value"] for tab in tabs]
+        # The tab each callback's graph is drawn on, for the report
+        tab_of = {}
+        for tab in tabs:
+            for id_ in layout_components(tab["props"].get("children"), {}):
+                tab_of[id_] = tab["props"]["value"]
+        self.tab_of = {c.name: tab_of.get(c.component) for c in self.callbacks}
+
+    def triggered(self, changed):
+        # Callbacks with one of the `changed` properties as an input
+        return [c for c in self.callbacks if any(f"{i}.{p}" in changed for i, p in c.inputs)]
+
+    def _duplicates(self):
+        # The callbacks sharing their name with another one
+        counts = collections.Counter(c.name for c in self.callbacks)
+        return [c for c in self.callbacks if counts[c.name] > 1]
+
+
+async def post(host, port, path, body):
+    # (status, response body) of one JSON POST on a fresh connection
+    payload = json.dumps(body).encode()
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        writer.write(
+            f"POST {path} HTTP/1.1\r\nHost: {host}:{port}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(payload)}\r\nConnection: close\r\n\r\n".encode() + payload
+        )
+        await writer.drain()
+        raw = await reader.read()
+    finally:
+        writer.close()
+    head, _, content = raw.partition(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    headers = {k.strip().lower(): v.strip() for k, _, v in (line.partition(":") for line in lines[1:])}
+    if headers.get("transfer-encoding") == "chunked":
+        chunks, rest = [], content
+        while rest:
+            size, _, rest = rest.partition(b"\r\n")
+            size = int(size, 16)
+            if size == 0:
+                break
+            chunks.append(rest[:size])
+            rest = rest[size + 2:]
+        content = b"".join(chunks)
+    return int(lines[0].split(" ", 2)[1]), content
+
+
+def random_range(props, rng):
+    # A [lo, hi] slider value on the slider's grid
+    step = props.get("step") or 1
+    ticks = int((props["max"] - props["min"]) // step)
+    lo, hi = sorted(rng.randint(0, ticks) for _ in range(2))
+    return [props["min"] + lo * step, props["min"] + hi * step]
+
+
+def random_option(props, current, rng):
+    options = [o["value"] if isinstance(o, dict) else o for o in props["options"]]
+    return rng.choice([o for o in options if o != current] or options)
+
+
+class Session:
+    # One simulated user: the component values of their page, and the
+    # actions they take on it
+    def __init__(self, app, host, port, rng, records):
+        self.app, self.host, self.port, self.rng, self.records = app, host, port, rng, records
+        self.values = dict(app.values)
+
+    async def call(self, callback, changed):
+        start = time.perf_counter()
+        try:
+            status, content = await post(self.host, self.port, UPDATE_PATH, callback.body(self.values, changed))
+        except OSError:
+            status, content = None, b""
+        self.records.append((callback.name, status, time.perf_counter() - start, len(content)))
+        if status == 200:
+            # Keep what later requests send back: stores, table page, ...
+            response = json.loads(content).get("response", {})
+            for id_, props in response.items():
+                for name, value in props.items():
+                    if name != "figure":
+                        self.values[f"{id_}.{name}"] = value
+
+    async def fire(self, callbacks, changed):
+        await asyncio.gather(*(self.call(c, changed) for c in callbacks))
+
+    def act(self):
+        # Applies a random action to the page; the properties it changed
+        rng, components, values = self.rng, self.app.components, self.values
+        action = rng.choices(list(ACTIONS), weights=list(ACTIONS.values()))[0]
+        if action == "zoom" and values.get("tabs.value") != "tab-6":
+            action = "tab"
+        if action in ("decade", "mass"):
+            key = f"{action}-slider.value"
+            values[key] = random_range(components[f"{action}-slider"][1], rng)
+        elif action in ("orbit", "status", "tab"):
+            id_ = {"orbit": "orbit-dropdown", "status": "status-radio", "tab": "tabs"}[action]
+            key = f"{id_}.value"
+            if action == "tab":
+                values[key] = rng.choice([t for t in self.app.tabs if t != values.get(key)])
+            else:
+                values[key] = random_option(components[id_][1], values.get(key), rng)
+        elif action == "as-of":
+            props = components["as-of-slider"][1]
+            key = "as-of-slider.value"
+            # Mostly today, sometimes a past year
+            values[key] = props["max"] if rng.random() < 0.5 else rng.randint(props["min"], props["max"])
+        elif action == "page":
+            key = "satellite-table.page_current"
+            values[key] = (values.get(key) or 0) + 1 if rng.random() < 0.8 else 0
+        elif action == "sort":
+            key = "satellite-table.sort_by"
+            values[key] = [{"column_id": rng.choice(SORT_COLUMNS), "direction": rng.choice(["asc", "desc"])}]
+        else:
+            key = "mass-lifespan.relayoutData"
+            (x0, x1), (y0, y1) = sorted(rng.uniform(0, 10000) for _ in range(2)), sorted(rng.uniform(0, 40) for _ in range(2))
+            values[key] = {"xaxis.range[0]": x0, "xaxis.range[1]": x1, "yaxis.range[0]": y0, "yaxis.range[1]": y1}
+        return [key]
+
+    async def run(self, deadline, think):
+        await self.fire([c for c in self.app.callbacks if c.initial], [])
+        while time.perf_counter() < deadline:
+            await asyncio.sleep(self.rng.expovariate(1 / think) if think > 0 else 0)
+            if time.perf_counter() >= deadline:
+                break
+            changed = self.act()
+            await self.fire(self.app.triggered(changed), changed)
+
+
+async def generate_load(app, host, port, clients, duration, think, seed):
+    records = []
+    start = time.perf_counter()
+    sessions = [Session(app, host, port, random.Random(seed + i), records) for i in range(clients)]
+    await asyncio.gather(*(s.run(start + duration, think) for s in sessions))
+    return records, time.perf_counter() - start
+
+
+def percentile(values, q):
+    return statistics.quantiles(values, n=100, method="inclusive")[q - 1] if len(values) > 1 else values[0]
+
+
+def summarize(records, elapsed, tab_of):
+    # {callback: throughput, latency percentiles and error rate}, plus 'all'
+    groups = {}
+    for name, status, seconds, size in records:
+        groups.setdefault(name, []).append((status, seconds, size))
+    groups["all"] = [(status, seconds, size) for _, status, seconds, size in records]
+    results = {}
+    for name, group in groups.items():
+        updates = [seconds for status, seconds, _ in group if status == 200]
+        errors = sum(1 for status, _, _ in group if status is None or status >= 400)
+        result = {
+            "tab": tab_of.get(name),
+            "requests": len(group),
+            "updates": len(updates),
+            "skipped": sum(1 for status, _, _ in group if status == 204),
+            "errors": errors,
+            "error_rate": errors / len(group),
+            "throughput": len(updates) / elapsed,
+            "kb_per_update": sum(size for status, _, size in group if status == 200) / max(len(updates), 1) / 1024,
+        }
+        if updates:
+            for q in (50, 95, 99):
+                result[f"p{q}_ms"] = percentile(updates, q) * 1000
+        results[name] = result
+    return results
+
+
+def previous_callbacks(history, config, workers):
+    # The most recent earlier result for the same catalog, load and workers
+    for run in reversed(history):
+        if {k: run.get(k) for k in config} == config:
+            for result in run["results"]:
+                if result["workers"] == workers:
+                    return result["callbacks"]
+    return {}
+
+
+def report(result, previous, threshold):
+    regressions = []
+    print(f"\n{result['workers']} worker(s), {result['clients']} clients: "
+          f"{result['callbacks']['all']['throughput']:.1f} updates/s over {result['seconds']:.0f}s")
+    width = max(len(name) for name in result["callbacks"])
+    print(f"  {'callback':<{width}} {'tab':>6} {'updates':>8} {'204':>6} {'err %':>6} {'upd/s':>7} "
+          f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'KB':>7}")
+    for name, m in sorted(result["callbacks"].items(), key=lambda item: (item[0] == "all", item[1]["tab"] or "", item[0])):
+        line = (f"  {name:<{width}} {m['tab'] or '':>6} {m['updates']:>8} {m['skipped']:>6} {m['error_rate'] * 100:>6.1f} "
+                f"{m['throughput']:>7.1f} " + " ".join(f"{m.get(f'p{q}_ms', float('nan')):>8.1f}" for q in (50, 95, 99))
+                + f" {m['kb_per_update']:>7.1f}")
+        before = previous.get(name, {})
+        if before.get("p95_ms") and "p95_ms" in m:
+            ratio = m["p95_ms"] / before["p95_ms"]
+            line += f"  p95 x{ratio:.2f}, upd/s x{m['throughput'] / before['throughput']:.2f} vs last"
+            if ratio > 1 + threshold:
+                line += "  REGRESSION"
+                regressions.append((result["workers"], name, ratio))
+        print(line)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=DEFAULT_WORKERS)
+    parser.add_argument("--clients", type=int, default=32, help="concurrent simulated users")
+    parser.add_argument("--duration", type=float, default=30, help="seconds of load per worker count")
+    parser.add_argument("--think", type=float, default=1.0, help="mean seconds between a user's actions")
+    parser.add_argument("--rows", type=int, default=100_000, help="size of the synthetic catalog")
+    parser.add_argument("--catalog", help="catalog TSV to serve instead of a synthetic one")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--history", default=DEFAULT_HISTORY)
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="relative p95 slowdown reported as a regression (default 0.2)")
+    parser.add_argument("--workdir", help="where the catalog, caches and server logs are kept (default: a temp dir)")
+    parser.add_argument("--startup-timeout", type=float, default=300)
+    args = parser.parse_args()
+
+    history = read_history(args.history)
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="satcat-load-")
+    os.makedirs(workdir, exist_ok=True)
+    path = os.path.join(workdir, "satcat.tsv")
+    if args.catalog:
+        shutil.copyfile(args.catalog, path)
+    elif not os.path.exists(path):
+        write_catalog(args.rows, path)
+    rows = None if args.catalog else args.rows
+
+    run = {
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "cpus": os.cpu_count(),
+        "rows": rows,
+        "clients": args.clients,
+        "think": args.think,
+        "duration": args.duration,
+        "results": [],
+    }
+    config = {"rows": rows, "clients": args.clients, "think": args.think}
+    regressions = []
+    for workers in args.workers:
+        port = free_port()
+        base = f"http://127.0.0.1:{port}"
+        server = start_server(workers, port, workdir)
+        try:
+            wait_ready(server, base, args.startup_timeout)
+            app = App(base)
+            records, elapsed = asyncio.run(
+                generate_load(app, "127.0.0.1", port, args.clients, args.duration, args.think, args.seed)
+            )
+        finally:
+            stop_server(server)
+        result = {"workers": workers, "clients": args.clients, "seconds": elapsed,
+                  "callbacks": summarize(records, elapsed, app.tab_of)}
+        regressions += report(result, previous_callbacks(history, config, workers), args.threshold)
+        run["results"].append(result)
+
+    if len(run["results"]) > 1:
+        print("\nworkers  upd/s  p95 ms (all)  error %")
+        for result in run["results"]:
+            m = result["callbacks"]["all"]
+            print(f"  {result['workers']:>5} {m['throughput']:>6.1f} {m.get('p95_ms', float('nan')):>13.1f} "
+                  f"{m['error_rate'] * 100:>8.2f}")
+
+    append_history(args.history, history, run)
+    if regressions:
+        print(f"{len(regressions)} callback(s) with p95 latency above the previous run by more than {args.threshold:.0%}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""
+Per-column memory of the catalog before and after the compact loader.
+
+"Before" is satcat.tsv read with pd.read_csv defaults (every column, object
+and float64 dtypes); "after" is the processed frame catalog.preprocess keeps
+(RAW_COLUMNS only, categoricals, int16 and float32). The filter stage's range
+scans over the numeric columns are timed in both widths too.
+
+Usage: python benchmarks/memory.py [satcat.tsv]
+
+"""
+
+import argparse
+import os
+import sys
+import timeit
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import catalog  # noqa: E402
+
+SCAN_COLUMNS = {"Mass": (0, 5000), "Lifespan_Years": (0, 30), "Launch_Decade": (1980, 2020)}
+
+
+def column_bytes(df):
+    return df.memory_usage(index=False, deep=True)
+
+
+def scan_seconds(values, lo, hi, repeat=20):
+    return min(timeit.repeat(lambda: (values >= lo) & (values <= hi), number=1, repeat=repeat))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", nargs="?", default="satcat.tsv")
+    args = parser.parse_args()
+
+    before = column_bytes(pd.read_csv(args.path, sep="\t", low_memory=False))
+    df = catalog.preprocess(catalog.read_catalog(args.path))
+    after = column_bytes(df)
+
+    print(f"{'column':<18} {'before':>12} {'after':>12}")
+    for name in before.index.union(after.index, sort=False):
+        b = f"{before[name] / 2**20:10.2f}MB" if name in before else "-"
+        a = f"{after[name] / 2**20:10.2f}MB" if name in after else "-"
+        print(f"{name:<18} {b:>12} {a:>12}")
+    print(f"{'total':<18} {before.sum() / 2**20:10.2f}MB {after.sum() / 2**20:10.2f}MB"
+          f"  (x{before.sum() / after.sum():.1f} smaller)")
+
+    print(f"\n{'range scan':<18} {'64-bit':>12} {'compact':>12}")
+    for name, (lo, hi) in SCAN_COLUMNS.items():
+        values = df[name].to_numpy()
+        wide = values.astype(np.float64 if values.dtype.kind == "f" else np.int64)
+        t_wide, t_compact = scan_seconds(wide, lo, hi), scan_seconds(values, lo, hi)
+        print(f"{name:<18} {t_wide * 1000:10.2f}ms {t_compact * 1000:10.2f}ms  ({values.dtype})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,217 @@
+"""
+Benchmark suite for catalog loading, preprocessing and the dashboard callbacks.
+
+For each catalog size a synthetic satcat.tsv is generated (see synthetic.py)
+and every stage is timed, then run once more under tracemalloc for its peak
+memory (tracing slows allocation-heavy code too much to time it as well):
+
+    ingest      streaming catalog.ingest of the TSV into a fresh column cache
+    load        catalog.read_catalog of the TSV
+    dates       payload filter and parse_vague_dates on LDate and DDate
+    derive      lifespans and the other derived columns
+    index       filter cube, sorted-segment index and event index (dataset.Dataset)
+    tab-N/...   each tab's figure builder plus JSON serialization, for a set
+                of representative filter combinations (median of --repeat runs)
+    kpis        the KPI callback
+    summary-*   the filter-and-aggregate step on each installed query backend
+
+Results are appended to a JSON history file, and each stage is compared with
+the most recent earlier run at the same size; slowdowns beyond --threshold
+are reported as regressions.
+
+Usage: python benchmarks/run.py [--sizes 10000 100000 1000000] [--history FILE]
+
+"""
+
+import argparse
+import datetime
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import plotly.io as pio
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# The project modules read their cache paths at import: give them a throwaway
+# directory, removed at exit, before any of them is imported, and keep the
+# dashboard from watching or lazily loading its catalog.
+CACHE = tempfile.TemporaryDirectory(prefix="satcat-bench-cache-")
+os.environ["SATCAT_CACHE_DIR"] = CACHE.name
+os.environ["SATCAT_WATCH_INTERVAL"] = "0"
+os.environ["SATCAT_LAZY_LOAD"] = "0"
+
+from benchmarks.common import append_history, git_commit, read_history  # noqa: E402
+from benchmarks.synthetic import write_catalog  # noqa: E402
+import backends  # noqa: E402
+import catalog  # noqa: E402
+from dataset import Dataset  # noqa: E402
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+DEFAULT_HISTORY = os.path.join(ROOT, "benchmarks", "history.json")
+
+# Representative filter combinations: the dashboard defaults, the full range,
+# a narrow single-decade slice, status/orbit-specific views, and the full
+# range as of a past date.
+FILTER_SETS = {
+    "default": ([1980, 2020], [0, 5000], 'All', 'All'),
+    "full": ([1950, 2020], [0, 10000], 'All', 'All'),
+    "2010s-leo-decommissioned": ([2010, 2010], [0, 10000], 'LEO', 'Decommissioned'),
+    "active-geo": ([1950, 2020], [1000, 8000], 'GEO', 'Active'),
+    "off-grid-mass": ([1990, 2020], [150, 4250], 'All', 'All'),
+    "as-of-2005": ([1950, 2020], [0, 10000], 'All', 'All', '2005-12-31'),
+}
+
+
+def peak_memory(fn, *args):
+    tracemalloc.start()
+    try:
+        fn(*args)
+        return tracemalloc.get_traced_memory()[1] / 2**20
+    finally:
+        tracemalloc.stop()
+
+
+def measure(fn, *args, repeat=1):
+    # fn must not modify its arguments: it runs repeat + 1 times on them.
+    seconds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args)
+        seconds.append(time.perf_counter() - start)
+    return result, {"seconds": statistics.median(seconds), "peak_mb": peak_memory(fn, *args)}
+
+
+def import_dashboard(workdir):
+    # dashboard.py loads ./satcat.tsv at import; point it at a small synthetic
+    # catalog. Its column, figure and metrics caches live in CACHE; the figure
+    # builders timed below are the unmemoized ones.
+    write_catalog(1_000, os.path.join(workdir, "satcat.tsv"))
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        import dashboard
+    finally:
+        os.chdir(cwd)
+    return dashboard
+
+
+def bench_size(n, workdir, dashboard, repeat):
+    path = os.path.join(workdir, f"satcat-{n}.tsv")
+    if not os.path.exists(path):
+        write_catalog(n, path)
+
+    stages = {}
+    # Every run ingests into a fresh cache; all are removed with `caches`
+    with tempfile.TemporaryDirectory(dir=workdir) as caches:
+        _, stages["ingest"] = measure(lambda: catalog.ingest(path, os.path.join(tempfile.mkdtemp(dir=caches), "cache")))
+    df_raw, stages["load"] = measure(catalog.read_catalog, path)
+    df_raw, stages["dates"] = measure(lambda raw: catalog.parse_dates(catalog.select_payloads(raw)), df_raw)
+    df, stages["derive"] = measure(lambda raw: catalog.derive_columns(raw.copy()), df_raw)
+    del df_raw
+    df.attrs["dataset_version"] = f"synthetic-{n}"
+    data, stages["index"] = measure(Dataset, df)
+
+    def render(build, filters):
+        return pio.to_json(build(data, *filters), validate=False)
+
+    builders = {
+        "tab-1": dashboard.build_lifespan_figure,
+        "tab-2": dashboard.build_status_figure,
+        "tab-3": dashboard.build_orbit_figure,
+        "tab-4": dashboard.build_population_figure,
+        "tab-5": dashboard.build_survival_figure,
+        "tab-6": dashboard.build_mass_lifespan_figure,
+    }
+    for tab, build in builders.items():
+        for name, filters in FILTER_SETS.items():
+            _, stages[f"{tab}/{name}"] = measure(render, build, filters, repeat=repeat)
+    # tab-5 mostly reuses cached cohort life tables; time building them too
+    def life_tables(mass_range, as_of=None):
+        dashboard.survival_tables.clear()
+        return dashboard.cohort_life_tables(data, mass_range, as_of)
+
+    for name, filters in FILTER_SETS.items():
+        _, stages[f"life-tables/{name}"] = measure(life_tables, filters[1], *filters[4:], repeat=repeat)
+    for name, filters in FILTER_SETS.items():
+        _, stages[f"kpis/{name}"] = measure(dashboard.compute_kpis, data, *filters, repeat=repeat)
+    for backend_name in backends.BACKENDS:
+        try:
+            backend = backends.make_backend(backend_name)
+        except ImportError:
+            continue
+        for name, filters in FILTER_SETS.items():
+            _, stages[f"summary-{backend_name}/{name}"] = measure(backend.summarize, data, *filters, repeat=repeat)
+    return {"rows": n, "payload_rows": len(df), "stages": stages}
+
+
+
+def previous_stages(history, n):
+    for run in reversed(history):
+        for result in run["results"]:
+            if result["rows"] == n:
+                return result["stages"]
+    return {}
+
+
+def report(result, previous, threshold):
+    regressions = []
+    print(f"\n{result['rows']:,} rows ({result['payload_rows']:,} payloads)")
+    for stage, m in result["stages"].items():
+        line = f"  {stage:<34} {m['seconds'] * 1000:10.2f} ms  {m['peak_mb']:9.1f} MB"
+        if stage in previous and previous[stage]["seconds"] > 0:
+            ratio = m["seconds"] / previous[stage]["seconds"]
+            line += f"  x{ratio:.2f} vs last"
+            if ratio > 1 + threshold:
+                line += "  REGRESSION"
+                regressions.append((result["rows"], stage, ratio))
+        print(line)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--history", default=DEFAULT_HISTORY)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="relative slowdown reported as a regression (default 0.2)")
+    parser.add_argument("--workdir", help="where synthetic catalogs are kept (default: a temp dir, removed at exit)")
+    args = parser.parse_args()
+
+    history = read_history(args.history)
+
+    scratch = None if args.workdir else tempfile.TemporaryDirectory(prefix="satcat-bench-")
+    workdir = args.workdir or scratch.name
+    os.makedirs(workdir, exist_ok=True)
+    dashboard = import_dashboard(workdir)
+
+    run = {
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "results": [],
+    }
+    regressions = []
+    for n in args.sizes:
+        result = bench_size(n, workdir, dashboard, args.repeat)
+        regressions += report(result, previous_stages(history, n), args.threshold)
+        run["results"].append(result)
+
+    append_history(args.history, history, run)
+    if regressions:
+        print(f"{len(regressions)} stage(s) slower than the previous run by more than {args.threshold:.0%}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""
+Synthetic satcat.tsv generator for benchmarks.
+
+Produces a catalog with the columns the dashboard reads, in the same text
+formats as the real file: launch/decay dates at mixed precision (with "?"
+and trailing "s" markers), "-" for missing values, GCAT-style object types
+and OpOrbit codes, and a realistic share of unknown masses. Everything is
+vectorized so multi-million-row catalogs generate in seconds.
+
+Usage: python benchmarks/synthetic.py ROWS OUTPUT.tsv [--seed N]
+
+"""
+
+import argparse
+
+import numpy as np
+import pandas as pd
+
+MONTHS = np.array(["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"])
+
+TYPES = ["P", "PX", "R1", "R2", "D", "C", "S"]
+TYPE_WEIGHTS = [0.42, 0.03, 0.12, 0.04, 0.30, 0.07, 0.02]
+
+OP_ORBITS = ["LLEO/I", "LEO/I", "LEO/S", "LLEO/S", "SSO", "GEO/S", "GEO/I", "GEO", "MEO", "MEO/I",
+             "HEO", "HEO/I", "GTO", "DSO", "EEO", "-"]
+OP_ORBIT_WEIGHTS = [0.05, 0.30, 0.15, 0.05, 0.12, 0.08, 0.03, 0.02, 0.03, 0.01,
+                    0.02, 0.01, 0.03, 0.02, 0.01, 0.07]
+
+# Date precision mix: minute, day, month, year, decade ("1960s"), unknown ("?"),
+# and uncertain month ("1965 Jul?").
+PRECISION_WEIGHTS = [0.55, 0.30, 0.06, 0.03, 0.02, 0.02, 0.02]
+
+MASS_MISSING_RATE = 0.22
+ACTIVE_RATE = 0.35
+
+
+def format_dates(dates, rng):
+    # Renders datetime64 values as GCAT-style text at a random precision.
+    n = len(dates)
+    dates = pd.DatetimeIndex(dates)
+    year = pd.Series(dates.year.astype(str))
+    month = pd.Series(MONTHS[dates.month - 1])
+    day = pd.Series(dates.day.astype(str)).str.pad(2)
+    hhmm = pd.Series(dates.hour * 100 + dates.minute).astype(str).str.zfill(4)
+    decade = pd.Series((dates.year // 10 * 10).astype(str))
+
+    kind = rng.choice(len(PRECISION_WEIGHTS), n, p=PRECISION_WEIGHTS)
+    out = np.select(
+        [kind == 0, kind == 1, kind == 2, kind == 3, kind == 4, kind == 5],
+        [year + " " + month + " " + day + " " + hhmm,
+         year + " " + month + " " + day,
+         year + " " + month,
+         year,
+         decade + "s",
+         pd.Series("?", index=year.index)],
+        default=year + " " + month + "?",
+    )
+    return out
+
+
+def generate(n, seed=0):
+    rng = np.random.default_rng(seed)
+
+    # Launch rate grows roughly exponentially, with the recent surge of
+    # small satellites on top.
+    years = np.clip(2025 - rng.exponential(14.0, n), 1957, 2025.9)
+    launch = (pd.Timestamp("1957-01-01") + pd.to_timedelta((years - 1957) * 365.25, unit="D")).to_numpy()
+    lifespan_days = rng.gamma(1.5, 2500.0, n)
+    decay = launch + pd.to_timedelta(lifespan_days, unit="D").to_numpy()
+    active = (rng.random(n) < ACTIVE_RATE) | (decay > np.datetime64("2025-06-01"))
+
+    ddate = format_dates(decay, rng).astype(object)
+    ddate[active] = "-"
+
+    mass = np.round(rng.lognormal(5.5, 1.6, n), 1).astype(str).astype(object)
+    mass[rng.random(n) < MASS_MISSING_RATE] = "-"
+
+    ids = pd.Series(np.arange(1, n + 1)).astype(str)
+    return pd.DataFrame({
+        "#JCAT": ("S" + ids.str.zfill(6)).to_numpy(),
+        "Satcat": np.arange(1, n + 1),
+        "Type": rng.choice(TYPES, n, p=TYPE_WEIGHTS),
+        "Name": ("SAT " + ids).to_numpy(),
+        "LDate": format_dates(launch, rng),
+        "DDate": ddate,
+        "Mass": mass,
+        "OpOrbit": rng.choice(OP_ORBITS, n, p=OP_ORBIT_WEIGHTS),
+    })
+
+
+def write_catalog(n, path, seed=0):
+    generate(n, seed).to_csv(path, sep="\t", index=False)
+    return path
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("rows", type=int)
+    parser.add_argument("output")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    write_catalog(args.rows, args.output, args.seed)
@@ -0,0 +1,252 @@
+"""
+Server-side paging, sorting and column filtering for the satellite table.
+
+The table under the charts lists the satellites behind the current filters,
+one page at a time: the browser sends the page number, the sort column and
+the column filters (Dash DataTable's custom paging, sorting and filtering)
+and gets back only the rows of that page.
+
+Rows are put in order through per-column sort permutations of the whole
+snapshot, built on first use of each column: the selected rows in the order
+of column c are perm_c[selected[perm_c]], one linear pass with no sorting.
+Selections that are a small share of the catalog are sorted directly instead.
+The ordered rows of the last few (filters, sort) combinations are kept, so
+paging through them only slices.
+
+"""
+
+import re
+import threading
+
+import numpy as np
+import pandas as pd
+
+from catalog import ORBIT_GROUPS, SECONDS_PER_YEAR
+from memo import LocalCache, normalize_filters
+
+# (id, header, DataTable type) of each column of the table
+COLUMNS = [
+    ("jcat", "JCAT", "text"),
+    ("name", "Name", "text"),
+    ("row", "Catalog Row", "numeric"),
+    ("launched", "Launch Date", "datetime"),
+    ("decommissioned", "Decommission Date", "datetime"),
+    ("decade", "Launch Decade", "numeric"),
+    ("orbit", "Orbit Group", "text"),
+    ("status", "Status", "text"),
+    ("mass", "Mass (kg)", "numeric"),
+    ("lifespan", "Lifespan (years)", "numeric"),
+]
+KINDS = {column: kind for column, _, kind in COLUMNS}
+# Text columns are stored as codes into these labels, or as the UTF-8 bytes
+# of these frame columns (which sort like the text, b"" for a missing name)
+LABELS = {"orbit": ORBIT_GROUPS, "status": ["Decommissioned", "Active"]}
+IDENTITY_COLUMNS = {"jcat": "JCAT", "name": "Name"}
+# Columns that change with the as-of date; orders on them are never cached
+AS_OF_COLUMNS = {"decommissioned", "status", "lifespan"}
+
+# Selections under this share of the catalog are sorted directly rather
+# than through a cached permutation
+DIRECT_SORT_SHARE = 1 / 16
+
+# '{mass} ge 500', '{orbit} eq "LEO"', '{launched} datestartswith 2005', ...
+FILTER_PART = re.compile(r"^\{(\w+)\}\s+(\S+)\s+(.*)$")
+OPERATORS = {
+    "eq": "eq", "=": "eq", "ne": "ne", "!=": "ne",
+    "lt": "lt", "<": "lt", "le": "le", "<=": "le",
+    "gt": "gt", ">": "gt", "ge": "ge", ">=": "ge",
+    "contains": "contains", "datestartswith": "datestartswith",
+}
+
+
+def parse_filter(query):
+    # [(column, operator, value)] from a DataTable filter_query. Parts on
+    # unknown columns or with unsupported operators are ignored.
+    parts = []
+    for part in (query or "").split(" && "):
+        match = FILTER_PART.match(part.strip())
+        if not match:
+            continue
+        column, op, value = match.groups()
+        canonical = OPERATORS.get(op)
+        if canonical is None and op[:1] in ("s", "i"):
+            # Case-sensitive and -insensitive variants ('seq', 'icontains')
+            # are treated alike
+            canonical = OPERATORS.get(op[1:])
+        if column in KINDS and canonical is not None:
+            parts.append((column, canonical, value.strip().strip("\"'`")))
+    return parts
+
+
+def column_values(data, column, rows, as_of=None):
+    # Values of a table column for the frame rows `rows` (positions, or a
+    # slice), as they stood at `as_of`: sort keys and filter operands. Text
+    # columns come as codes into LABELS or as bytes, dates as datetime64 with
+    # NaT for satellites not decommissioned (yet).
+    df = data.df
+    if column in IDENTITY_COLUMNS:
+        return df[IDENTITY_COLUMNS[column]].to_numpy()[rows]
+    if column == "row":
+        return df.index.to_numpy()[rows]
+    if column == "launched":
+        return df["LDate"].to_numpy()[rows]
+    if column == "decade":
+        return df["Launch_Decade"].to_numpy()[rows]
+    if column == "mass":
+        return df["Mass"].to_numpy()[rows]
+    if column == "orbit":
+        groups = df["Orbit_Group"]
+        remap = np.array([ORBIT_GROUPS.index(c) for c in groups.cat.categories], dtype=np.int8)
+        return remap[groups.cat.codes.to_numpy()[rows]]
+
+    ddate = df["DDate"].to_numpy()[rows]
+    if as_of is None:
+        if column == "decommissioned":
+            return ddate
+        if column == "status":
+            return df["IsActive"].to_numpy()[rows].astype(np.int8)
+        return df["Lifespan_Years"].to_numpy()[rows]
+    t = np.datetime64(as_of, "us")
+    decommissioned = ddate <= t
+    if column == "decommissioned":
+        return np.where(decommissioned, ddate, np.datetime64("NaT", "us"))
+    if column == "status":
+        return (~decommissioned).astype(np.int8)
+    end = np.where(decommissioned, ddate, t)
+    seconds = (end - df["LDate"].to_numpy()[rows]) / np.timedelta64(1, "s")
+    return (seconds / SECONDS_PER_YEAR).astype(np.float32)
+
+
+def _date_bounds(value):
+    # [start, end) of the period a typed date stands for: '2005' is the
+    # whole year, '2005-03' the month, '2005-03-14' the day
+    start = np.datetime64(value)
+    return start.astype("datetime64[us]"), (start + 1).astype("datetime64[us]")
+
+
+def filter_mask(values, column, op, value):
+    # Which of `values` (column_values of `column`) pass one filter part; a
+    # value that does not parse for the column matches nothing.
+    kind = KINDS[column]
+    try:
+        if column in IDENTITY_COLUMNS:
+            # Compared as bytes, so only ASCII letters are case-folded
+            text = np.char.lower(values)
+            value = value.encode("utf-8").lower()
+            if op == "contains":
+                keep = np.char.find(text, value) >= 0
+            elif op == "ne":
+                keep = text != value
+            else:
+                keep = text == value
+            # A missing name, like a missing date, is only kept by "ne"
+            return np.where(values == b"", op == "ne", keep)
+        if kind == "text":
+            labels = pd.Series(LABELS[column], dtype=object).str.lower()
+            value = value.lower()
+            if op == "contains":
+                keep = labels.str.contains(value, regex=False)
+            elif op == "ne":
+                keep = labels != value
+            else:
+                keep = labels == value
+            return keep.to_numpy(dtype=bool)[values]
+        if kind == "datetime":
+            # NaT compares false, so only "ne" keeps satellites without a date
+            start, end = _date_bounds(value)
+            within = (values >= start) & (values < end)
+            return {"ne": ~within, "lt": values < start, "le": values < end,
+                    "gt": values >= end, "ge": values >= start}.get(op, within)
+        number = float(value)
+    except ValueError:
+        return np.zeros(len(values), dtype=bool)
+    compare = {"eq": np.equal, "ne": np.not_equal, "lt": np.less, "le": np.less_equal,
+               "gt": np.greater, "ge": np.greater_equal}.get(op)
+    if compare is None:
+        return np.zeros(len(values), dtype=bool)
+    return compare(values, number)
+
+
+def selection_rows(data, decade_range, mass_range, orbit_type, status, as_of=None):
+    # Frame positions of the rows matching the dashboard filters, in index
+    # order; with an as-of date, launched by then and with the status they
+    # had at that date
+    if as_of is None:
+        return data.frame_index.select(decade_range, mass_range, orbit_type, status).rows()
+    rows = data.frame_index.select(decade_range, mass_range, orbit_type, 'All').rows()
+    rows = rows[data.df["LDate"].to_numpy()[rows] <= np.datetime64(as_of, "us")]
+    if status != 'All':
+        rows = rows[column_values(data, "status", rows, as_of) == (status == 'Active')]
+    return rows
+
+
+def records(data, rows, as_of=None):
+    # Table rows for the frame positions `rows`, formatted for display
+    columns = {}
+    for column, _, kind in COLUMNS:
+        values = column_values(data, column, rows, as_of)
+        if kind == "datetime":
+            text = np.datetime_as_string(values, unit="D")
+            columns[column] = np.where(np.isnat(values), "", text).tolist()
+        elif column in IDENTITY_COLUMNS:
+            columns[column] = np.char.decode(values, "utf-8").tolist()
+        elif kind == "text":
+            columns[column] = np.asarray(LABELS[column], dtype=object)[values].tolist()
+        elif values.dtype.kind == "f":
+            digits = 2 if column == "lifespan" else 1
+            columns[column] = [None if np.isnan(v) else v for v in np.round(values.astype(np.float64), digits).tolist()]
+        else:
+            columns[column] = values.tolist()
+    return [dict(zip(columns, row)) for row in zip(*columns.values())]
+
+
+class RowBrowser:
+    def __init__(self, counter, max_orders=8):
+        # Ordered rows per (snapshot, filters, sort): at most a few MB each
+        self.orders = LocalCache(counter, max_orders)
+        self._permutations = {}
+        self._version = None
+        self._lock = threading.Lock()
+
+    def permutation(self, data, column):
+        # Stable ascending sort of the whole snapshot by `column`, today
+        with self._lock:
+            if self._version != data.version:
+                self._permutations = {}
+                self._version = data.version
+            if column not in self._permutations:
+                order = np.argsort(column_values(data, column, slice(None)), kind="stable")
+                self._permutations[column] = order.astype(np.int32 if len(order) < 2**31 else np.int64)
+            return self._permutations[column]
+
+    def ordered_rows(self, data, filters, sort_by=None, filter_query=""):
+        # Frame positions of the rows to list, in display order. Unsorted,
+        # they follow the index: decade, orbit group, status, mass.
+        as_of = filters[4] if len(filters) > 4 else None
+        sort = tuple((s["column_id"], s["direction"]) for s in sort_by or () if s.get("column_id") in KINDS)[:1]
+
+        def build():
+            rows = selection_rows(data, *filters)
+            for column, op, value in parse_filter(filter_query):
+                rows = rows[filter_mask(column_values(data, column, rows, as_of), column, op, value)]
+            if not sort:
+                return rows
+            column, direction = sort[0]
+            n = len(data.df)
+            if (as_of is None or column not in AS_OF_COLUMNS) and len(rows) >= n * DIRECT_SORT_SHARE:
+                selected = np.zeros(n, dtype=bool)
+                selected[rows] = True
+                order = self.permutation(data, column)
+                ordered = order[selected[order]]
+            else:
+                rows = np.sort(rows)
+                ordered = rows[np.argsort(column_values(data, column, rows, as_of), kind="stable")]
+            return ordered[::-1] if direction == "desc" else ordered
+
+        return self.orders.get((data.version, *normalize_filters(*filters), filter_query or "", sort), build)
+
+    def page(self, data, filters, page_current, page_size, sort_by=None, filter_query=""):
+        # (records of one page, total rows) for the dashboard filters
+        rows = self.ordered_rows(data, filters, sort_by, filter_query)
+        start = page_current * page_size
+        return records(data, rows[start:start + page_size], filters[4] if len(filters) > 4 else None), len(rows)
@@ -0,0 +1,458 @@
+"""
+Satellite catalog loading and preprocessing for the dashboard.
+
+The processed payload frame is cached on disk as one memory-mapped .npy file
+per column, keyed by a content hash of satcat.tsv and PREPROCESS_VERSION. The
+cache is built by streaming the file in chunks, so catalogs larger than memory
+can be loaded.
+
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+# Bump whenever preprocess() changes what ends up in the frame.
+PREPROCESS_VERSION = 5
+
+CACHE_DIR = os.environ.get("SATCAT_CACHE_DIR", ".satcat_cache")
+
+# Rows of satcat.tsv read and preprocessed at a time while building the cache.
+CHUNK_ROWS = int(os.environ.get("SATCAT_CHUNK_ROWS", "250000"))
+
+# Stable per-satellite key used to diff one catalog snapshot against the next.
+ID_COLUMN = "#JCAT"
+
+# The only columns read from satcat.tsv; the rest of the file is never loaded.
+# Types are fixed up front so that every chunk of a file parses the same way.
+RAW_COLUMNS = {
+    ID_COLUMN: "str", "Name": "str", "Type": "category", "LDate": "str", "DDate": "str", "Mass": "str",
+    "OpOrbit": "category",
+}
+
+SECONDS_PER_YEAR = 365.25 * 24 * 3600
+
+orbit_map = {
+    "LLEO/S": "LEO", "LLEO/I": "LEO", "LEO/S": "LEO", "LEO/I": "LEO", "LEO": "LEO", "SSO": "LEO",
+    "GEO": "GEO", "GEO/I": "GEO", "GEO/S": "GEO",
+    "MEO": "MEO", "MEO/I": "MEO",
+    "HEO": "HEO", "HEO/I": "HEO"
+}
+ORBIT_GROUPS = sorted(set(orbit_map.values()) | {"Other"})
+
+# Columns identifying a satellite, one distinct value per row: kept as
+# fixed-width UTF-8 bytes rather than categoricals, so that they stay
+# memory-mapped instead of every distinct value being held in memory.
+TEXT_COLUMNS = ["JCAT", "Name"]
+
+
+def parse_vague_date(s):
+    if pd.isna(s) or s.strip() in ("?", ""):
+        return pd.NaT
+    s = s.strip().rstrip("?s")
+    for fmt in ["%Y %b %d %H%M", "%Y %b %d", "%Y %b", "%Y"]:
+        try:
+            return pd.to_datetime(s, format=fmt)
+        except:
+            continue
+    return pd.NaT
+
+
+# Precision classes, keyed by the number of whitespace-separated tokens left
+# after stripping. A format with k fields can only ever match a string with
+# k tokens, so each class needs exactly one batched conversion.
+DATE_FORMATS = {
+    4: ("%Y %b %d %H%M", "minute"),
+    3: ("%Y %b %d", "day"),
+    2: ("%Y %b", "month"),
+    1: ("%Y", "year"),
+}
+
+
+def parse_vague_dates(col):
+    # Vectorized equivalent of col.apply(parse_vague_date). Returns the parsed
+    # dates and a precision label per row ("minute", "day", "month", "year",
+    # "decade" for a trailing "s", "unknown" for "?" or unparseable values).
+    s = col.astype("object").where(col.notna())
+    stripped = s.str.strip()
+    missing = stripped.isna() | stripped.isin(["?", ""])
+    core = stripped.str.rstrip("?s")
+    n_tokens = core.str.split().str.len()
+    # Every format starts with %Y, so placeholders such as "-" can be ruled
+    # out here rather than through to_datetime's much slower error path.
+    candidate = ~missing & core.str.match(r"\d{4}", na=False)
+
+    parts = []
+    precision = pd.Series(np.nan, index=col.index, dtype="object")
+    for k, (fmt, label) in DATE_FORMATS.items():
+        mask = candidate & (n_tokens == k)
+        if mask.any():
+            parts.append(pd.to_datetime(core[mask], format=fmt, errors="coerce"))
+            precision[mask] = label
+    if parts:
+        dates = pd.concat(parts).reindex(col.index)
+    else:
+        dates = pd.Series(pd.NaT, index=col.index, dtype="datetime64[ns]")
+
+    decade = ~missing & stripped.str.rstrip("?").str.endswith("s") & (precision == "year")
+    precision[decade] = "decade"
+    precision[stripped.notna() & dates.isna()] = "unknown"
+    return dates, precision.astype("category")
+
+
+def add_lifespans(df, now=None):
+    # Lifespan of active satellites runs up to `now`, so this is recomputed
+    # on every load rather than frozen into the cache. float32 keeps it to
+    # well under a minute, far finer than any date in the catalog.
+    if now is None:
+        now = pd.Timestamp.now()
+    seconds = (df["DDate"].fillna(now) - df["LDate"]).dt.total_seconds()
+    df["Lifespan_Years"] = (seconds / SECONDS_PER_YEAR).astype(np.float32)
+    return df
+
+
+def encode_text(col):
+    # A text column as fixed-width UTF-8 bytes, b"" for missing values
+    return col.fillna("").str.encode("utf-8").to_numpy(dtype=bytes)
+
+
+def read_catalog(path, chunksize=None):
+    # Only RAW_COLUMNS, with the low-cardinality codes as categoricals. With a
+    # chunksize, an iterator over frames of that many rows.
+    return pd.read_csv(
+        path, sep="\t", low_memory=False, chunksize=chunksize,
+        usecols=lambda name: name in RAW_COLUMNS, dtype=RAW_COLUMNS,
+    )
+
+
+def select_payloads(df_raw):
+    return df_raw.loc[df_raw["Type"].str.startswith("P", na=False)]
+
+
+def parse_dates(df_raw):
+    df_raw["LDate"], df_raw["LDate_Precision"] = parse_vague_dates(df_raw["LDate"])
+    df_raw["DDate"], df_raw["DDate_Precision"] = parse_vague_dates(df_raw["DDate"])
+    return df_raw
+
+
+def derive_columns(df):
+    # Lifespan bounds and the columns the dashboard filters on, in the
+    # smallest dtypes that hold them: decades and years fit in int16, masses
+    # (tenths of a kg at most) in float32.
+    df = add_lifespans(df)
+    df = df[(df["Lifespan_Years"] >= 0) & (df["Lifespan_Years"] <= 100)]
+    df["Launch_Year"] = df["LDate"].dt.year.astype(np.int16)
+    df["Launch_Decade"] = (df["Launch_Year"] // 10 * 10).astype(np.int16)
+    df["IsActive"] = df["DDate"].isna()
+    df["Mass"] = pd.to_numeric(df["Mass"], errors='coerce').astype(np.float32)
+    groups = df["OpOrbit"].map(orbit_map).astype("object").fillna("Other")
+    df["Orbit_Group"] = pd.Categorical(groups, categories=ORBIT_GROUPS)
+    # Satellite identity for the table (see TEXT_COLUMNS)
+    df["JCAT"] = encode_text(df.pop(ID_COLUMN))
+    df["Name"] = encode_text(df["Name"])
+    return df
+
+
+def preprocess(df_raw):
+    # Payloads only; dates are parsed after the other object types are dropped.
+    return derive_columns(parse_dates(select_payloads(df_raw)))
+
+
+def file_hash(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def dataset_version(path):
+    return f"{file_hash(path)[:16]}-v{PREPROCESS_VERSION}"
+
+
+def row_fingerprints(df_raw):
+    # Satellite IDs and a hash of every raw row, taken before preprocessing
+    # touches the frame. None if the rows have no usable ID column. IDs are
+    # kept as 64-bit hashes so they take fixed space on disk; a collision
+    # shows up as a duplicate ID.
+    if ID_COLUMN not in df_raw or df_raw[ID_COLUMN].isna().any():
+        return None
+    ids = pd.util.hash_array(df_raw[ID_COLUMN].to_numpy(dtype=object))
+    if pd.Index(ids).has_duplicates:
+        return None
+    return {
+        "ids": ids,
+        "hashes": pd.util.hash_pandas_object(df_raw, index=False).to_numpy(),
+        "raw_columns": list(df_raw.columns),
+    }
+
+
+class CacheWriter:
+    # Builds a column cache from frames appended one after another, so that
+    # only one chunk of a catalog has to be in memory at a time. Numeric, bool,
+    # datetime and fixed-width bytes columns are stored as-is; everything else
+    # becomes integer codes into a sorted list of categories kept in
+    # meta.json, so that codes order like the values. Each file grows as raw
+    # data and gets its .npy header once the final length is known.
+    def __init__(self, cache_path):
+        self.cache_path = cache_path
+        parent = os.path.dirname(cache_path) or "."
+        os.makedirs(parent, exist_ok=True)
+        self.tmp = tempfile.mkdtemp(dir=parent, prefix=".tmp-")
+        self.dtypes = {}
+        # (rows, dtype) of each chunk of a bytes file, whose width can grow
+        self.segments = {}
+        self.columns = None
+        self.raw_columns = None
+        self.fingerprints = True
+
+    def _write(self, file, values):
+        # The first chunk fixes each file's dtype; datetime units may differ
+        # between chunks and are converted. Bytes keep each chunk's width
+        # until _finish pads them all to the widest.
+        if values.dtype.kind == "S":
+            self.segments.setdefault(file, []).append((len(values), values.dtype))
+            dtype = values.dtype
+        else:
+            dtype = self.dtypes.setdefault(file, values.dtype)
+        with open(os.path.join(self.tmp, file + ".part"), "ab") as f:
+            np.ascontiguousarray(values, dtype=dtype).tofile(f)
+
+    def _finish(self, file, dtype=None, remap=None):
+        # With `remap`, codes c >= 0 are written as remap[c]
+        part = os.path.join(self.tmp, file + ".part")
+        segments = self.segments.get(file)
+        if segments is None:
+            src = self.dtypes[file]
+            segments = [(os.path.getsize(part) // src.itemsize, src)]
+        dtype = np.dtype(dtype or max((src for _, src in segments), key=lambda d: d.itemsize))
+        header = {"descr": np.lib.format.dtype_to_descr(dtype), "fortran_order": False,
+                  "shape": (sum(rows for rows, _ in segments),)}
+        with open(part, "rb") as f, open(os.path.join(self.tmp, file), "wb") as out:
+            np.lib.format.write_array_header_1_0(out, header)
+            for rows, src in segments:
+                while rows:
+                    block = np.fromfile(f, dtype=src, count=min(rows, 1 << 20))
+                    if not len(block):
+                        break
+                    rows -= len(block)
+                    if remap is not None:
+                        block = np.where(block >= 0, remap[np.maximum(block, 0)], block)
+                    block.astype(dtype, copy=False).tofile(out)
+        os.remove(part)
+
+    def append(self, df):
+        if self.columns is None:
+            self.columns = [
+                {"name": name, "file": f"{i}.npy", "categories": None if df[name].dtype.kind in "biufcmMS" else {}}
+                for i, name in enumerate(df.columns)
+            ]
+        self._write("index.npy", df.index.to_numpy())
+        for entry in self.columns:
+            col = df[entry["name"]]
+            if entry["categories"] is None:
+                self._write(entry["file"], col.to_numpy())
+            else:
+                # Codes into the categories seen so far, which grow as new values appear.
+                codes, uniques = pd.factorize(col)
+                lookup = np.array([entry["categories"].setdefault(v, len(entry["categories"])) for v in uniques]
+                                  + [-1], dtype=np.int32)
+                self._write(entry["file"], lookup[codes])
+
+    def append_fingerprints(self, fingerprints):
+        # Fingerprints of the raw rows, in file order. One chunk without them
+        # leaves the whole cache without.
+        if fingerprints is None or self.raw_columns not in (None, fingerprints["raw_columns"]):
+            self.fingerprints = False
+        if not self.fingerprints:
+            return
+        self.raw_columns = fingerprints["raw_columns"]
+        self._write("row_ids.npy", fingerprints["ids"])
+        self._write("row_hashes.npy", fingerprints["hashes"])
+
+    def close(self):
+        # Finishes every file and moves the cache into place.
+        if self.columns is None:
+            self.columns = []
+            self._write("index.npy", np.arange(0))
+        meta = {"columns": [], "index": "index.npy"}
+        self._finish("index.npy")
+        if self.fingerprints and self.raw_columns is not None:
+            self._finish("row_ids.npy")
+            self._finish("row_hashes.npy")
+            if pd.Index(np.load(os.path.join(self.tmp, "row_ids.npy"), mmap_mode="r")).is_unique:
+                meta["raw_columns"] = self.raw_columns
+        for entry in self.columns:
+            item = {"name": entry["name"], "file": entry["file"]}
+            if entry["categories"] is None:
+                self._finish(entry["file"])
+            else:
+                categories = list(entry["categories"])
+                n = len(categories)
+                order = sorted(range(n), key=categories.__getitem__)
+                rank = np.empty(n, dtype=np.int32)
+                rank[order] = np.arange(n, dtype=np.int32)
+                self._finish(entry["file"], np.int8 if n < 2**7 else np.int16 if n < 2**15 else np.int32, rank)
+                item["categories"] = [categories[i] for i in order]
+            meta["columns"].append(item)
+        with open(os.path.join(self.tmp, "meta.json"), "w") as f:
+            json.dump(meta, f)
+        try:
+            os.rename(self.tmp, self.cache_path)
+        except OSError:
+            # Another process finished the same cache first.
+            self.abort()
+
+    def abort(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+
+def write_cache(df, cache_path, fingerprints=None):
+    # A whole in-memory frame as a column cache.
+    writer = CacheWriter(cache_path)
+    writer.append(df)
+    writer.append_fingerprints(fingerprints)
+    writer.close()
+
+
+def ingest(path, cache_path, chunk_rows=CHUNK_ROWS):
+    # Streams the catalog at `path` into a column cache. Each chunk is reduced
+    # to processed payload rows and appended before the next one is read, so
+    # memory use follows chunk_rows rather than the size of the file.
+    writer = CacheWriter(cache_path)
+    try:
+        for chunk in read_catalog(path, chunksize=chunk_rows):
+            writer.append_fingerprints(row_fingerprints(chunk))
+            writer.append(preprocess(chunk))
+        writer.close()
+    except BaseException:
+        writer.abort()
+        raise
+
+
+def read_cache(cache_path):
+    with open(os.path.join(cache_path, "meta.json")) as f:
+        meta = json.load(f)
+    columns = {}
+    for entry in meta["columns"]:
+        values = np.load(os.path.join(cache_path, entry["file"]), mmap_mode="r")
+        if "categories" in entry:
+            # The codes stay memory-mapped too, as read-only arrays.
+            values = pd.Categorical.from_codes(values, entry["categories"], validate=False)
+        columns[entry["name"]] = values
+    index = np.load(os.path.join(cache_path, meta["index"]), mmap_mode="r")
+    return pd.DataFrame(columns, index=index, copy=False)
+
+
+def read_fingerprints(cache_path):
+    try:
+        with open(os.path.join(cache_path, "meta.json")) as f:
+            meta = json.load(f)
+        if "raw_columns" not in meta:
+            return None
+        return {
+            "ids": np.load(os.path.join(cache_path, "row_ids.npy"), mmap_mode="r"),
+            "hashes": np.load(os.path.join(cache_path, "row_hashes.npy"), mmap_mode="r"),
+            "raw_columns": meta["raw_columns"],
+        }
+    except (OSError, KeyError):
+        return None
+
+
+def prune_cache(cache_dir, keep):
+    # Only cache directories are pruned; other files in cache_dir are left alone.
+    # Dataset snapshots of the kept version ("<keep>@<date>") are kept too.
+    for name in os.listdir(cache_dir):
+        path = os.path.join(cache_dir, name)
+        if name.split("@")[0] != keep and not name.startswith(".") and os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def open_cache(cache_path, version):
+    df = add_lifespans(read_cache(cache_path))
+    # Rows only fall outside the bounds here if "now" has moved far enough
+    # since the cache was built; the copy is skipped in the usual case.
+    in_bounds = (df["Lifespan_Years"] >= 0) & (df["Lifespan_Years"] <= 100)
+    if not in_bounds.all():
+        df = df[in_bounds]
+    df.attrs["dataset_version"] = version
+    return df
+
+
+def load_catalog(path="satcat.tsv", cache_dir=CACHE_DIR):
+    # Warm starts only map the cached columns; a changed satcat.tsv or a new
+    # PREPROCESS_VERSION gives a new key and triggers a rebuild. The key is
+    # kept in df.attrs["dataset_version"] for caches built on top of the frame.
+    version = dataset_version(path)
+    if cache_dir is None:
+        df = preprocess(read_catalog(path))
+        df.attrs["dataset_version"] = version
+        return df
+
+    cache_path = os.path.join(cache_dir, version)
+    if not os.path.exists(os.path.join(cache_path, "meta.json")):
+        ingest(path, cache_path)
+        prune_cache(cache_dir, keep=version)
+    return open_cache(cache_path, version)
+
+
+def refresh_catalog(df, path="satcat.tsv", cache_dir=CACHE_DIR, chunk_rows=CHUNK_ROWS):
+    # Brings a loaded frame up to date with the file at `path`. Only rows that
+    # are new or changed since the cached snapshot `df` came from (by ID_COLUMN
+    # and row hash) are preprocessed; the rest are carried over. The file is
+    # streamed like ingest() does, and the result is written as the new
+    # version's cache and returned memory-mapped, exactly as load_catalog
+    # would return it. Returns `df` itself if nothing changed.
+    version = dataset_version(path)
+    if version == df.attrs.get("dataset_version"):
+        return df
+    if cache_dir is None:
+        return load_catalog(path, cache_dir)
+    cache_path = os.path.join(cache_dir, version)
+    if os.path.exists(os.path.join(cache_path, "meta.json")):
+        # Another process got there first.
+        return open_cache(cache_path, version)
+
+    old = read_fingerprints(os.path.join(cache_dir, df.attrs.get("dataset_version", "")))
+    if old is None:
+        return load_catalog(path, cache_dir)
+    old_ids = pd.Index(np.asarray(old["ids"]))
+    old_hashes = np.asarray(old["hashes"])
+    # Row of `df` holding each raw row of the old file; -1 for rows that
+    # preprocessing dropped.
+    old_rows = np.full(len(old_ids), -1, dtype=np.int64)
+    old_rows[df.index.to_numpy()] = np.arange(len(df))
+
+    writer = CacheWriter(cache_path)
+    try:
+        for chunk in read_catalog(path, chunksize=chunk_rows):
+            new = row_fingerprints(chunk)
+            if new is None or new["raw_columns"] != old["raw_columns"]:
+                writer.abort()
+                return load_catalog(path, cache_dir)
+            writer.append_fingerprints(new)
+            position = old_ids.get_indexer(new["ids"])
+            unchanged = (position >= 0) & (old_hashes[position] == new["hashes"])
+
+            # Carried-over rows take their row number in the new file as
+            # index, like a full rebuild would give them.
+            rows = old_rows[position[unchanged]]
+            kept = df.iloc[rows[rows >= 0]].set_axis(chunk.index[unchanged][rows >= 0], axis=0)
+            kept = kept.astype({c: "object" for c in kept.columns if kept[c].dtype == "category"})
+            fresh = preprocess(chunk[~unchanged])
+            merged = pd.concat([kept, fresh]).sort_index()
+            # Bytes of different widths concatenate as objects
+            for name in TEXT_COLUMNS:
+                merged[name] = merged[name].to_numpy(dtype=bytes)
+            writer.append(add_lifespans(merged))
+        writer.close()
+    except BaseException:
+        writer.abort()
+        raise
+    prune_cache(cache_dir, keep=version)
+    return open_cache(cache_path, version)
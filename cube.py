@@ -0,0 +1,142 @@
+"""
+Pre-aggregated filter cube for the dashboard callbacks.
+
+Counts, lifespan sums and mass sums are accumulated once over
+(Launch_Decade x mass bin x Orbit_Group x IsActive). Every filter the UI can
+send lines up with the cube's cells, so the KPI cards and both bar charts are
+answered by slicing and summing a few thousand cells, whatever the catalog size.
+
+"""
+
+import numpy as np
+import pandas as pd
+
+from catalog import ORBIT_GROUPS
+
+MASS_STEP = 100
+MASS_MAX = 10000
+
+# Two bins per slider step: bin 2k holds masses exactly equal to k * MASS_STEP,
+# bin 2k + 1 holds the open interval above it. An inclusive [lo, hi] range is
+# then the contiguous run of bins 2 * lo / MASS_STEP .. 2 * hi / MASS_STEP.
+N_MASS_BINS = 2 * (MASS_MAX // MASS_STEP) + 1
+
+
+class CubeSlice:
+    # Counts and sums over (decade, orbit group, active) for one selection.
+    def __init__(self, decades, counts, lifespan_sum, mass_sum):
+        self.decades = decades
+        self.counts = counts
+        self.lifespan_sum = lifespan_sum
+        self.mass_sum = mass_sum
+
+    @property
+    def total(self):
+        return int(self.counts.sum())
+
+    def kpis(self):
+        total = self.total
+        if total == 0:
+            return "0", "0", "0", "0"
+        active = int(self.counts[:, :, 1].sum())
+        avg_lifespan = round(float(self.lifespan_sum.sum() / total), 1)
+        avg_mass = round(float(self.mass_sum.sum() / total), 1)
+        return str(total), str(active), str(avg_lifespan), str(avg_mass)
+
+    def status_counts(self):
+        # Active/decommissioned counts per decade, as the stacked bar chart expects.
+        per_decade = self.counts.sum(axis=1)
+        present = per_decade.sum(axis=1) > 0
+        return pd.DataFrame(
+            {True: per_decade[present, 1], False: per_decade[present, 0]},
+            index=self.decades[present],
+        )
+
+    def orbit_counts(self):
+        # Decommissioned counts per (decade, orbit group), non-empty cells only,
+        # in the same order as groupby(["Launch_Decade", "Orbit_Group"]).size().
+        inactive = self.counts[:, :, 0]
+        d, o = np.nonzero(inactive)
+        return pd.DataFrame({
+            "Launch_Decade": self.decades[d],
+            "Orbit_Group": np.asarray(ORBIT_GROUPS, dtype=object)[o],
+            "count": inactive[d, o],
+        })
+
+
+def mass_bins(mass):
+    # Whether each row's mass is usable (inside the sliders' range), and the
+    # cube mass bin of each usable row.
+    with np.errstate(invalid="ignore"):
+        usable = (mass >= 0) & (mass <= MASS_MAX)
+    mass = mass[usable]
+    steps = mass // MASS_STEP
+    return usable, (2 * steps + (mass != steps * MASS_STEP)).astype(np.intp)
+
+
+def _accumulate(df, decades, bins, n_mass_bins):
+    d = np.searchsorted(decades, df["Launch_Decade"].to_numpy())
+    o = pd.Categorical(df["Orbit_Group"], categories=ORBIT_GROUPS).codes
+    a = df["IsActive"].to_numpy().astype(np.intp)
+    shape = (len(decades), n_mass_bins, len(ORBIT_GROUPS), 2)
+    flat = np.ravel_multi_index((d, bins, o, a), shape)
+    size = int(np.prod(shape))
+    counts = np.bincount(flat, minlength=size).reshape(shape)
+    lifespan_sum = np.bincount(flat, weights=df["Lifespan_Years"].to_numpy(), minlength=size).reshape(shape)
+    mass_sum = np.bincount(flat, weights=df["Mass"].to_numpy(), minlength=size).reshape(shape)
+    return counts, lifespan_sum, mass_sum
+
+
+class FilterCube:
+    def __init__(self, df):
+        # Rows without a usable mass can never pass the mass filter, so they
+        # are left out of the cube entirely.
+        usable, bins = mass_bins(df["Mass"].to_numpy())
+        df = df[usable]
+
+        self.decades = np.sort(df["Launch_Decade"].unique())
+        self.counts, self.lifespan_sum, self.mass_sum = _accumulate(df, self.decades, bins, N_MASS_BINS)
+
+    def arrays(self):
+        return {"decades": self.decades, "counts": self.counts,
+                "lifespan_sum": self.lifespan_sum, "mass_sum": self.mass_sum}
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        # Rebuilds a cube from arrays() output, e.g. memory-mapped from disk.
+        cube = cls.__new__(cls)
+        for name, values in arrays.items():
+            setattr(cube, name, values)
+        return cube
+
+    def select(self, decade_range, mass_range, orbit_type, status):
+        # Returns None when the mass bounds do not fall on the cube's grid, in
+        # which case the caller aggregates the filtered rows instead.
+        lo, hi = mass_range
+        if lo % MASS_STEP or hi % MASS_STEP or lo < 0 or hi > MASS_MAX:
+            return None
+
+        d0 = np.searchsorted(self.decades, decade_range[0], side="left")
+        d1 = np.searchsorted(self.decades, decade_range[1], side="right")
+        m0 = 2 * int(lo) // MASS_STEP
+        m1 = max(2 * int(hi) // MASS_STEP + 1, m0)
+        cells = (slice(d0, d1), slice(m0, m1))
+        pieces = [arr[cells].sum(axis=1) for arr in (self.counts, self.lifespan_sum, self.mass_sum)]
+
+        if orbit_type != 'All' or status != 'All':
+            keep = np.ones(pieces[0].shape[1:], dtype=bool)
+            if orbit_type != 'All':
+                keep[[g != orbit_type for g in ORBIT_GROUPS], :] = False
+            if status != 'All':
+                keep[:, 0 if status == 'Active' else 1] = False
+            pieces = [p * keep for p in pieces]
+
+        return CubeSlice(self.decades[d0:d1], *pieces)
+
+
+def summarize_frame(filtered_df):
+    # Same summary as FilterCube.select, computed from already-filtered rows.
+    decades = np.sort(filtered_df["Launch_Decade"].unique())
+    bins = np.zeros(len(filtered_df), dtype=np.intp)
+    counts, lifespan_sum, mass_sum = _accumulate(filtered_df, decades, bins, 1)
+    return CubeSlice(decades, counts[:, 0], lifespan_sum[:, 0], mass_sum[:, 0])
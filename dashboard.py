@@ -6,49 +6,89 @@ Abrar Faiyaz (201940046)
 """
 
 
-import pandas as pd
+import time
+
+STARTED = time.perf_counter()  # Before the heavy imports, for the startup report
+
+import cProfile
+import datetime
+import gzip
+import hashlib
+import json
+import os
+
 import numpy as np
-from dash import Dash, dcc, html, Input, Output
-import plotly.express as px
+import pandas as pd
+from dash import Dash, ctx, dash_table, dcc, html, Input, Output, State, Patch
+from dash.exceptions import PreventUpdate
+from flask import Response, g, request
 import plotly.graph_objects as go
-from scipy.stats import gaussian_kde
+import plotly.io as pio
 
-df_raw = pd.read_csv("satcat.tsv", sep="\t", low_memory=False)
+from backends import make_backend, selected_rows
+from browser import COLUMNS as BROWSER_COLUMNS, RowBrowser
+from catalog import CACHE_DIR, ORBIT_GROUPS
+from dataset import LiveDataset
+from events import population_series
+from kde import grid_step, ridge_kde
+from memo import FigureCache, LocalCache, normalize_filters
+import metrics
+from survival import N_BINS, STEP_YEARS, kaplan_meier, life_tables
 
+# Current dataset snapshot; satcat.tsv is checked for changes every
+# SATCAT_WATCH_INTERVAL seconds (0 disables) and swapped in without a restart.
+# With SATCAT_LAZY_LOAD=1 the server starts without it and loads it in the
+# background, showing a loading state until it is ready.
+LAZY_LOAD = os.environ.get("SATCAT_LAZY_LOAD") == "1"
+live = LiveDataset("satcat.tsv", CACHE_DIR, interval=float(os.environ.get("SATCAT_WATCH_INTERVAL", "30")),
+                   lazy=LAZY_LOAD)
 
-def parse_vague_date(s):
-    if pd.isna(s) or s.strip() in ("?", ""):
-        return pd.NaT
-    s = s.strip().rstrip("?s")
-    for fmt in ["%Y %b %d %H%M", "%Y %b %d", "%Y %b", "%Y"]:
-        try:
-            return pd.to_datetime(s, format=fmt)
-        except:
-            continue
-    return pd.NaT
-
-
-df_raw["LDate"] = df_raw["LDate"].apply(parse_vague_date)
-df_raw["DDate"] = df_raw["DDate"].apply(parse_vague_date)
-
-df = df_raw[df_raw["Type"].str.startswith("P", na=False)].copy()
-df["DecayOrNow"] = df["DDate"].fillna(pd.Timestamp.now())
-df["Lifespan_Years"] = (df["DecayOrNow"] - df["LDate"]).dt.total_seconds() / (365.25 * 24 * 3600)
-df = df[(df["Lifespan_Years"] >= 0) & (df["Lifespan_Years"] <= 100)]
-df["Launch_Year"] = df["LDate"].dt.year
-df["Launch_Decade"] = (df["Launch_Year"] // 10) * 10
-df["IsActive"] = df["DDate"].isna()
-df["Mass"] = pd.to_numeric(df["Mass"], errors='coerce')
-
-orbit_map = {
-    "LLEO/S": "LEO", "LLEO/I": "LEO", "LEO/S": "LEO", "LEO/I": "LEO", "LEO": "LEO", "SSO": "LEO",
-    "GEO": "GEO", "GEO/I": "GEO", "GEO/S": "GEO",
-    "MEO": "MEO", "MEO/I": "MEO",
-    "HEO": "HEO", "HEO/I": "HEO"
-}
-df["Orbit_Group"] = df["OpOrbit"].map(orbit_map).fillna("Other")
+# Figures shared by all worker processes, keyed by dataset snapshot version
+MEMO_PATH = os.environ.get("SATCAT_MEMO_PATH", os.path.join(CACHE_DIR, "figures.sqlite"))
+figure_cache = FigureCache(MEMO_PATH)
+if live.current is not None:
+    figure_cache.purge(live.current.version)
+live.on_swap.append(lambda data: figure_cache.purge(data.version))
+
+# Life tables of every launch cohort per snapshot, mass range and as-of date;
+# the survival tab's other filters only pick which of them to add up
+survival_tables = LocalCache(metrics.SURVIVAL_TABLES)
+
+# Sort permutations and ordered rows behind the satellite table
+row_browser = RowBrowser(metrics.BROWSER_ORDERS)
+
+# Engine behind the KPIs and bar charts: cube (default), pandas (reference),
+# or duckdb / polars when installed; see backends.py
+query_backend = make_backend(os.environ.get("SATCAT_QUERY_BACKEND", "cube"))
+
+# Callback requests slower than SATCAT_PROFILE_SLOW_MS (unset disables) are
+# profiled and the cProfile stats written to SATCAT_PROFILE_DIR
+PROFILE_SLOW_MS = float(os.environ.get("SATCAT_PROFILE_SLOW_MS", "0"))
+PROFILE_DIR = os.environ.get("SATCAT_PROFILE_DIR", os.path.join(CACHE_DIR, "profiles"))
+
+
+def current_year():
+    # Last position of the as-of slider, which stands for today's snapshot;
+    # read on every use, as the server may run over New Year
+    return datetime.date.today().year
+
+
+# Ends of the decade and mass sliders; the aggregate API rejects ranges
+# outside them
+DECADE_BOUNDS = (1950, 2020)
+MASS_BOUNDS = (0, 10000)
+
+# Ridge curves are sent on a coarser grid when linear interpolation keeps them
+# within this fraction of their height (well under a pixel on the ridge plot)
+GRID_TOLERANCE = 0.005
+
+# The mass/lifespan tab draws every payload as a WebGL marker up to this many
+# in view, and a density image binned on the server on this grid above it
+SCATTER_MAX_POINTS = 10_000
+DENSITY_BINS = (100, 80)
 
 app = Dash(__name__)
+server = app.server  # WSGI entry point, e.g. gunicorn -c gunicorn.conf.py dashboard:server
 
 app.index_string = '''
 <!DOCTYPE html>
@@ -167,186 +207,219 @@ background_images = html.Div([
 })
 
 # Main layout
-app.layout = html.Div([
-    stars,
-    background_images,
-    html.H1("Satellite Lifespan and Decommissioning", style={"color": "white", "textAlign": "center"}),
-
-    # Main content area - filters and graphs
-    html.Div([
-        # Filters panel
+def serve_layout():
+    # Built for every page load, so that the as-of slider ends at the
+    # current year
+    year = current_year()
+    return html.Div([
+        stars,
+        background_images,
+        html.H1("Satellite Lifespan and Decommissioning", style={"color": "white", "textAlign": "center"}),
+
+        # Main content area - filters and graphs
         html.Div([
+            # Filters panel
             html.Div([
-                html.Label("Launch Decade Range", style={"color": "white"}),
-                dcc.RangeSlider(
-                    id='decade-slider',
-                    min=1950, max=2020, step=10, value=[1980, 2020],
-                    marks={d: {"label": str(d), "style": {"color": "white"}} for d in range(1950, 2031, 10)},
-                    tooltip={"placement": "bottom", "always_visible": True}
-                )
-            ], style={"marginBottom": "20px"}),
+                html.Div([
+                    html.Label("Launch Decade Range", style={"color": "white"}),
+                    dcc.RangeSlider(
+                        id='decade-slider',
+                        min=DECADE_BOUNDS[0], max=DECADE_BOUNDS[1], step=10, value=[1980, 2020],
+                        marks={d: {"label": str(d), "style": {"color": "white"}} for d in range(1950, 2031, 10)},
+                        tooltip={"placement": "bottom", "always_visible": True}
+                    )
+                ], style={"marginBottom": "20px"}),
 
-            html.Div([
-                html.Label("Mass Range (kg)", style={"color": "white"}),
-                dcc.RangeSlider(
-                    id='mass-slider',
-                    min=0, max=10000, step=100, value=[0, 5000],
-                    marks={i: {"label": str(i), "style": {"color": "white"}} for i in range(0, 10001, 2000)},
-                    tooltip={"placement": "bottom", "always_visible": True}
-                )
-            ], style={"marginBottom": "20px"}),
+                html.Div([
+                    html.Label("Mass Range (kg)", style={"color": "white"}),
+                    dcc.RangeSlider(
+                        id='mass-slider',
+                        min=MASS_BOUNDS[0], max=MASS_BOUNDS[1], step=100, value=[0, 5000],
+                        marks={i: {"label": str(i), "style": {"color": "white"}} for i in range(0, 10001, 2000)},
+                        tooltip={"placement": "bottom", "always_visible": True}
+                    )
+                ], style={"marginBottom": "20px"}),
 
-            html.Div([
-                html.Label("Orbit Type", style={"color": "white"}),
-                dcc.Dropdown(
-                    id='orbit-dropdown',
-                    options=[
-                        {'label': 'All', 'value': 'All'},
-                        {'label': 'Low Earth Orbit (LEO)', 'value': 'LEO'},
-                        {'label': 'Geostationary Orbit (GEO)', 'value': 'GEO'},
-                        {'label': 'Medium Earth Orbit (MEO)', 'value': 'MEO'},
-                        {'label': 'High Earth Orbit (HEO)', 'value': 'HEO'},
-                        {'label': 'Other', 'value': 'Other'}
-                    ],
-                    value='All',
-                    style={"backgroundColor": "#1f2c56", "color": "white"}
-                )
-            ], style={"marginBottom": "20px"}),
+                html.Div([
+                    html.Label("Orbit Type", style={"color": "white"}),
+                    dcc.Dropdown(
+                        id='orbit-dropdown',
+                        options=[
+                            {'label': 'All', 'value': 'All'},
+                            {'label': 'Low Earth Orbit (LEO)', 'value': 'LEO'},
+                            {'label': 'Geostationary Orbit (GEO)', 'value': 'GEO'},
+                            {'label': 'Medium Earth Orbit (MEO)', 'value': 'MEO'},
+                            {'label': 'High Earth Orbit (HEO)', 'value': 'HEO'},
+                            {'label': 'Other', 'value': 'Other'}
+                        ],
+                        value='All',
+                        style={"backgroundColor": "#1f2c56", "color": "white"}
+                    )
+                ], style={"marginBottom": "20px"}),
 
-            html.Div([
-                html.Label("Status", style={"color": "white"}),
-                dcc.RadioItems(
-                    id='status-radio',
-                    options=[
-                        {'label': 'All', 'value': 'All'},
-                        {'label': 'Active', 'value': 'Active'},
-                        {'label': 'Decommissioned', 'value': 'Decommissioned'}
-                    ],
-                    value='All',
-                    labelStyle={'display': 'block', 'color': 'white'}
-                )
-            ], style={"marginBottom": "20px"}),
+                html.Div([
+                    html.Label("Status", style={"color": "white"}),
+                    dcc.RadioItems(
+                        id='status-radio',
+                        options=[
+                            {'label': 'All', 'value': 'All'},
+                            {'label': 'Active', 'value': 'Active'},
+                            {'label': 'Decommissioned', 'value': 'Decommissioned'}
+                        ],
+                        value='All',
+                        labelStyle={'display': 'block', 'color': 'white'}
+                    )
+                ], style={"marginBottom": "20px"}),
+
+                html.Div([
+                    html.Label("As Of (end of year)", style={"color": "white"}),
+                    dcc.Slider(
+                        id='as-of-slider',
+                        min=1957, max=year, step=1, value=year,
+                        marks={**{y: {"label": str(y), "style": {"color": "white"}} for y in range(1960, year - 4, 10)},
+                               year: {"label": "Now", "style": {"color": "white"}}},
+                        tooltip={"placement": "bottom", "always_visible": False}
+                    )
+                ], style={"marginBottom": "20px"}),
            
-            html.Div(id='plot-description', style={
-                "color": "white",
-                "marginTop": "30px",
-                "fontSize": "16px",
-                "lineHeight": "1.6",
-                "whiteSpace": "pre-wrap"
-            })
+                html.Div(id='plot-description', style={
+                    "color": "white",
+                    "marginTop": "30px",
+                    "fontSize": "16px",
+                    "lineHeight": "1.6",
+                    "whiteSpace": "pre-wrap"
+                })
 
 
-        ], style={
-            "flex": "1 1 300px",  
-            "minWidth": "280px",
+            ], style={
+                "flex": "1 1 300px",  
+                "minWidth": "280px",
 
-            "vertical-align": "top",
-            "padding": "20px",
-            "backgroundColor": "rgba(25, 25, 50, 0.7)",
-            "borderRadius": "10px",
-            "position": "relative",
-            "marginRight": "20px"
-        }),
+                "vertical-align": "top",
+                "padding": "20px",
+                "backgroundColor": "rgba(25, 25, 50, 0.7)",
+                "borderRadius": "10px",
+                "position": "relative",
+                "marginRight": "20px"
+            }),
 
-        # Graphs panel
-        html.Div([
+            # Graphs panel
             html.Div([
-                dcc.Tabs(
-                    id='tabs',
-                    value='tab-1',
-                    children=[
-                        dcc.Tab(label='Lifespan Trends Over Time', value='tab-1', children=[
-                            html.Div(dcc.Graph(id='lifespan-graph'))
-                        ], style={"backgroundColor": "#1f2c56", "color": "white"},
-                                selected_style={"backgroundColor": "#3a4d80", "color": "white"}),
-
-                        dcc.Tab(label='Are Satellites Being Retired Responsibly?', value='tab-2', children=[
-                            html.Div(dcc.Graph(id='lifespan-hist'))
-                        ], style={"backgroundColor": "#1f2c56", "color": "white"},
-                                selected_style={"backgroundColor": "#3a4d80", "color": "white"}),
-
-                        dcc.Tab(label='Where Are Decommissioned Satellites Located?', value='tab-3', children=[
-                            html.Div(dcc.Graph(id='orbit-pie'))
-                        ], style={"backgroundColor": "#1f2c56", "color": "white"},
-                                selected_style={"backgroundColor": "#3a4d80", "color": "white"})
-                    ],
-                    style={"color": "white"}
-                )
-            ], style={"position": "relative", "zIndex": 1})
-        ], style={
-            "flex": "2 1 500px",  
-            "minWidth": "400px",  
-
-            "vertical-align": "top",
-            "backgroundColor": "rgba(25, 25, 50, 0.7)",
-            "borderRadius": "10px"
-        })
-    ], style={"display": "flex", "flexWrap": "wrap","alignItems": "flex-start" }),
-
-    # Stats cards
-    html.Div([
-        html.Div([
-            html.H4("Total Satellites", style={"color": "white", "textAlign": "center"}),
-            html.Div(id='total-satellites', style={"color": "white", "textAlign": "center", "fontSize": "24px"})
-        ], style={"width": "24%", "display": "inline-block", "backgroundColor": "rgba(25, 25, 50, 0.7)",
-                  "borderRadius": "10px", "padding": "10px", "marginRight": "1%"}),
-        html.Div([
-            html.H4("Active Satellites", style={"color": "white", "textAlign": "center"}),
-            html.Div(id='active-satellites', style={"color": "white", "textAlign": "center", "fontSize": "24px"})
-        ], style={"width": "24%", "display": "inline-block", "backgroundColor": "rgba(25, 25, 50, 0.7)",
-                  "borderRadius": "10px", "padding": "10px", "marginRight": "1%"}),
-        html.Div([
-            html.H4("Average Lifespan (years)", style={"color": "white", "textAlign": "center"}),
-            html.Div(id='avg-lifespan', style={"color": "white", "textAlign": "center", "fontSize": "24px"})
-        ], style={"width": "24%", "display": "inline-block", "backgroundColor": "rgba(25, 25, 50, 0.7)",
-                  "borderRadius": "10px", "padding": "10px", "marginRight": "1%"}),
+                html.Div([
+                    dcc.Tabs(
+                        id='tabs',
+                        value='tab-1',
+                        children=[
+                            dcc.Tab(label='Lifespan Trends Over Time', value='tab-1', children=[
+                                html.Div(dcc.Graph(id='lifespan-graph'))
+                            ], style={"backgroundColor": "#1f2c56", "color": "white"},
+                                    selected_style={"backgroundColor": "#3a4d80", "color": "white"}),
+
+                            dcc.Tab(label='Are Satellites Being Retired Responsibly?', value='tab-2', children=[
+                                html.Div(dcc.Graph(id='lifespan-hist'))
+                            ], style={"backgroundColor": "#1f2c56", "color": "white"},
+                                    selected_style={"backgroundColor": "#3a4d80", "color": "white"}),
+
+                            dcc.Tab(label='Where Are Decommissioned Satellites Located?', value='tab-3', children=[
+                                html.Div(dcc.Graph(id='orbit-pie'))
+                            ], style={"backgroundColor": "#1f2c56", "color": "white"},
+                                    selected_style={"backgroundColor": "#3a4d80", "color": "white"}),
+
+                            dcc.Tab(label='How Crowded Has Each Orbit Become?', value='tab-4', children=[
+                                html.Div(dcc.Graph(id='orbit-population'))
+                            ], style={"backgroundColor": "#1f2c56", "color": "white"},
+                                    selected_style={"backgroundColor": "#3a4d80", "color": "white"}),
+
+                            dcc.Tab(label='How Long Do Satellites Last?', value='tab-5', children=[
+                                html.Div(dcc.Graph(id='survival-graph'))
+                            ], style={"backgroundColor": "#1f2c56", "color": "white"},
+                                    selected_style={"backgroundColor": "#3a4d80", "color": "white"}),
+
+                            dcc.Tab(label='Do Heavier Satellites Last Longer?', value='tab-6', children=[
+                                html.Div(dcc.Graph(id='mass-lifespan'))
+                            ], style={"backgroundColor": "#1f2c56", "color": "white"},
+                                    selected_style={"backgroundColor": "#3a4d80", "color": "white"})
+                        ],
+                        style={"color": "white"}
+                    ),
+                    # Dataset version and filters each figure was last drawn with,
+                    # and the structure of that figure
+                    dcc.Store(id='lifespan-graph-filters'),
+                    dcc.Store(id='lifespan-hist-filters'),
+                    dcc.Store(id='orbit-pie-filters'),
+                    dcc.Store(id='orbit-population-filters'),
+                    dcc.Store(id='survival-graph-filters'),
+                    dcc.Store(id='mass-lifespan-filters'),
+                    # Version of the first loaded dataset; polled until set when
+                    # the catalog is loading in the background
+                    dcc.Store(id='data-version'),
+                    dcc.Interval(id='data-poll', interval=1000, disabled=live.current is not None)
+                ], style={"position": "relative", "zIndex": 1})
+            ], style={
+                "flex": "2 1 500px",  
+                "minWidth": "400px",  
+
+                "vertical-align": "top",
+                "backgroundColor": "rgba(25, 25, 50, 0.7)",
+                "borderRadius": "10px"
+            })
+        ], style={"display": "flex", "flexWrap": "wrap","alignItems": "flex-start" }),
+
+        # Stats cards
         html.Div([
-            html.H4("Average Mass (kg)", style={"color": "white", "textAlign": "center"}),
-            html.Div(id='avg-mass', style={"color": "white", "textAlign": "center", "fontSize": "24px"})
-        ], style={"width": "24%", "display": "inline-block", "backgroundColor": "rgba(25, 25, 50, 0.7)",
-                  "borderRadius": "10px", "padding": "10px"})
-    ], style={"marginTop": "20px", "padding": "10px"})
-], style={"backgroundColor": "#111122", "fontFamily": "Arial", "minHeight": "100vh", "padding": "20px"})
+            html.Div([
+                html.H4("Total Satellites", style={"color": "white", "textAlign": "center"}),
+                html.Div(id='total-satellites', style={"color": "white", "textAlign": "center", "fontSize": "24px"})
+            ], style={"width": "24%", "display": "inline-block", "backgroundColor": "rgba(25, 25, 50, 0.7)",
+                      "borderRadius": "10px", "padding": "10px", "marginRight": "1%"}),
+            html.Div([
+                html.H4("Active Satellites", style={"color": "white", "textAlign": "center"}),
+                html.Div(id='active-satellites', style={"color": "white", "textAlign": "center", "fontSize": "24px"})
+            ], style={"width": "24%", "display": "inline-block", "backgroundColor": "rgba(25, 25, 50, 0.7)",
+                      "borderRadius": "10px", "padding": "10px", "marginRight": "1%"}),
+            html.Div([
+                html.H4("Average Lifespan (years)", style={"color": "white", "textAlign": "center"}),
+                html.Div(id='avg-lifespan', style={"color": "white", "textAlign": "center", "fontSize": "24px"})
+            ], style={"width": "24%", "display": "inline-block", "backgroundColor": "rgba(25, 25, 50, 0.7)",
+                      "borderRadius": "10px", "padding": "10px", "marginRight": "1%"}),
+            html.Div([
+                html.H4("Average Mass (kg)", style={"color": "white", "textAlign": "center"}),
+                html.Div(id='avg-mass', style={"color": "white", "textAlign": "center", "fontSize": "24px"})
+            ], style={"width": "24%", "display": "inline-block", "backgroundColor": "rgba(25, 25, 50, 0.7)",
+                      "borderRadius": "10px", "padding": "10px"})
+        ], style={"marginTop": "20px", "padding": "10px"}),
 
+        # Satellite browser: one page of the filtered rows at a time, paged,
+        # sorted and filtered on the server (see browser.py)
+        html.Div([
+            html.H3("Satellites in the Current Selection", style={"color": "white"}),
+            html.Div(id='satellite-count', style={"color": "white", "marginBottom": "10px"}),
+            dash_table.DataTable(
+                id='satellite-table',
+                columns=[{"name": header, "id": column, "type": kind} for column, header, kind in BROWSER_COLUMNS],
+                page_current=0,
+                page_size=25,
+                page_action='custom',
+                sort_action='custom',
+                sort_mode='single',
+                sort_by=[],
+                filter_action='custom',
+                filter_query='',
+                style_header={"backgroundColor": "#1f2c56", "color": "white", "fontWeight": "bold"},
+                style_filter={"backgroundColor": "#3a4d80", "color": "white"},
+                style_cell={"backgroundColor": "rgba(25, 25, 50, 0.7)", "color": "white",
+                            "border": "1px solid #3a4d80", "fontFamily": "Arial", "padding": "4px 8px"},
+            )
+        ], style={"marginTop": "20px", "padding": "10px", "backgroundColor": "rgba(25, 25, 50, 0.7)",
+                  "borderRadius": "10px"})
+    ], style={"backgroundColor": "#111122", "fontFamily": "Arial", "minHeight": "100vh", "padding": "20px"})
 
-@app.callback(
-    [
-        Output('lifespan-graph', 'figure'),
-        Output('lifespan-hist', 'figure'),
-        Output('orbit-pie', 'figure'),
-        Output('total-satellites', 'children'),
-        Output('active-satellites', 'children'),
-        Output('avg-lifespan', 'children'),
-        Output('avg-mass', 'children'),
-        Output('plot-description', 'children')
-    ],
-    [
-        Input('decade-slider', 'value'),
-        Input('mass-slider', 'value'),
-        Input('orbit-dropdown', 'value'),
-        Input('status-radio', 'value'),
-        Input('tabs', 'value')
-    ]
-)
-def update_graphs(decade_range, mass_range, orbit_type, status, tab):
-    # Initial filter
-    filtered_df = df[
-        (df['Launch_Decade'] >= decade_range[0]) &
-        (df['Launch_Decade'] <= decade_range[1]) &
-        (df['Mass'] >= mass_range[0]) &
-        (df['Mass'] <= mass_range[1])
-        ]
 
-    # Status filter 
-    if status != 'All':
-        is_active = True if status == 'Active' else False
-        filtered_df = filtered_df[filtered_df['IsActive'] == is_active]
+app.layout = serve_layout
 
-    # Orbit filter
-    if orbit_type != 'All':
-        filtered_df = filtered_df[filtered_df['Orbit_Group'] == orbit_type]
 
-    # Create empty figures in case of no data
+def empty_figure():
+    # Placeholder shown in case of no data
     empty_fig = go.Figure()
     empty_fig.update_layout(
         title="Oops! Nothing to display. The data for this criteria is unavailable.",
@@ -355,30 +428,66 @@ def update_graphs(decade_range, mass_range, orbit_type, status, tab):
         font_color='white',
         height=500
     )
+    return empty_fig
+
+
+def loading_figure():
+    # Placeholder shown while the catalog loads in the background
+    figure = empty_figure()
+    figure.update_layout(title="Loading the satellite catalog...")
+    return figure
+
+
+def end_of_day(day):
+    # The moment an as-of date is drawn for: its last second, as as-of
+    # comparisons are inclusive
+    return f"{day.isoformat()}T23:59:59"
+
+
+def as_of_date(year):
+    # As-of slider position to the moment the figures are drawn for, the end
+    # of the year; None for the last position, today's snapshot
+    if year is None or year >= current_year():
+        return None
+    return end_of_day(datetime.date(int(year), 12, 31))
+
+
+def as_of_title(title, as_of):
+    return title if as_of is None else f"{title} (as of {str(as_of)[:10]})"
 
-    # Set default description based on tab
-    if tab == 'tab-1':
-        desc = "Satellite lifespans have changed over time. Early satellites lasted only a few years, but by the 1990s, better technology meant they stayed active much longer. Recently, the rise of small, low-cost satellites like CubeSats has led to shorter lifespans again—raising concerns about growing space clutter and long-term sustainability."
-    elif tab == 'tab-2':
-        desc = "Most satellites are never removed after they stop working. While launches have increased each decade, so has the number of inactive satellites left behind. Many older satellites—especially from the 1990s and 2000s—weren't designed to safely deorbit, adding to the growing clutter in space."
-    elif tab == 'tab-3':
-        desc = "Most retired satellites stay in low Earth orbit (LEO). As more small satellites and mega-constellations are launched, LEO is becoming crowded—not just with working satellites, but also with space junk. If this isn't managed, it could threaten future missions."
-    else:
-        desc = ""
 
-    # Check if filtered_df is empty
-    if filtered_df.empty:
-        return empty_fig, empty_fig, empty_fig, "0", "0", "0", "0", desc
+def summarize(data, decade_range, mass_range, orbit_type, status, as_of=None):
+    # Counts and sums for the KPIs, bar charts and aggregate API, from the
+    # configured query backend
+    return query_backend.summarize(data, decade_range, mass_range, orbit_type, status, as_of)
+
+
+def lifespans_by_decade(data, decade_range, mass_range, orbit_type, status, as_of=None):
+    # {decade: lifespans} of the filtered rows; zero-copy slices of the sorted
+    # index for today, recomputed from the launch and decay dates otherwise
+    if as_of is None:
+        return data.frame_index.select(decade_range, mass_range, orbit_type, status).by_decade("Lifespan_Years")
+    rows = selected_rows(data, decade_range, mass_range, orbit_type, status, as_of)
+    return {decade: group.to_numpy() for decade, group in rows.groupby("Launch_Decade")["Lifespan_Years"]}
+
+
+def build_lifespan_figure(data, decade_range, mass_range, orbit_type, status, as_of=None):
+    # Decade, mass, status and orbit filters as slices of the sorted index
+    with metrics.stage('lifespan-graph', 'filter'):
+        lifespans = lifespans_by_decade(data, decade_range, mass_range, orbit_type, status, as_of)
+    metrics.SELECTED_ROWS.observe(sum(len(group) for group in lifespans.values()), component='lifespan-graph')
+    if not lifespans:
+        return empty_figure()
 
     # Figure 1: KDE Lifespan Distribution
     lifespan_fig = go.Figure()
     try:
         overlap = 0.5
-        max_lifespan = filtered_df['Lifespan_Years'].max()
+        max_lifespan = max(group.max() for group in lifespans.values())
         if max_lifespan <= 0:
             max_lifespan = 1  # Ensure we have a valid range
-        x_grid = np.linspace(0, max_lifespan, 500)
-        decade_order = sorted(filtered_df['Launch_Decade'].dropna().unique())
+        x_grid = np.linspace(0, max_lifespan, 501)  # 500 intervals, so coarser grids stay even
+        decade_order = sorted(lifespans)
         
         # Define a color palette
         colors = [
@@ -393,25 +502,31 @@ def update_graphs(decade_range, mass_range, orbit_type, status, tab):
             "rgba(135, 206, 250, 0.7)", 
             "rgba(0, 0, 205, 0.7)"        
         ]
+        # Densities for all decades in one batched pass
+        kde_decades = [d for d in decade_order if len(lifespans[d]) >= 5]  # Need more points for stable KDE
+        with metrics.stage('lifespan-graph', 'kde'):
+            densities = ridge_kde([lifespans[d] for d in kde_decades], x_grid, bw_factor=0.5)
+        metrics.KDE_DECADES.inc(len(kde_decades))
+        densities = dict(zip(kde_decades, densities))
+        # Normalize, skipping curves that are all zero (or NaN)
+        curves = {d: y / y.max() for d, y in densities.items() if y.max() > 0}
         for i, decade in enumerate(decade_order):
-            group = filtered_df[filtered_df["Launch_Decade"] == decade]
-            if len(group) < 5:  # Need more points for stable KDE
+            if decade not in curves:
                 continue
             try:
-                kde = gaussian_kde(group["Lifespan_Years"].dropna(), bw_method=0.5)
-                y = kde(x_grid)
-                if y.max() > 0:
-                    y = y / y.max()  # Normalize, prevent division by zero
-                else:
-                    continue  # Skip if all values are zero
+                # Evenly spaced x is sent as x0/dx rather than as an array,
+                # on the coarsest grid the curve's shape allows
+                step = grid_step(curves[decade], GRID_TOLERANCE)
+                y = curves[decade][::step]
                 offset = i * overlap
                 
                 # Use color from our palette
                 color_index = i % len(colors)
                 
                 lifespan_fig.add_trace(go.Scatter(
-                    x=x_grid,
-                    y=y + offset,
+                    x0=0,
+                    dx=x_grid[step],
+                    y=(y + offset).astype(np.float32),
                     mode="lines",
                     fill="tonexty",
                     name=f"{decade}s",
@@ -419,15 +534,17 @@ def update_graphs(decade_range, mass_range, orbit_type, status, tab):
                     line=dict(width=2),
                     fillcolor=colors[color_index]
                 ))
-            except Exception:
+            except Exception as e:
+                metrics.error('lifespan-graph', f'{decade}s trace', e)
                 continue  # Skip this decade if KDE fails
-    except Exception:
-        lifespan_fig = empty_fig
+    except Exception as e:
+        metrics.error('lifespan-graph', 'ridge plot', e)
+        lifespan_fig = empty_figure()
 
     # Update layout only if we added traces
     if len(lifespan_fig.data) > 0:
         lifespan_fig.update_layout(
-            title="How Satellite Lifespans Have Changed Over the Decades",
+            title=as_of_title("How Satellite Lifespans Have Changed Over the Decades", as_of),
             xaxis_title="Lifespan (Years)",
             yaxis=dict(showticklabels=False, title="Launch Decade (stacked)", zeroline=False),
             showlegend=True,
@@ -439,26 +556,23 @@ def update_graphs(decade_range, mass_range, orbit_type, status, tab):
             margin=dict(t=40, b=40, l=40, r=40)
         )
     else:
-        lifespan_fig = empty_fig
+        lifespan_fig = empty_figure()
+
+    return lifespan_fig
+
+
+def build_status_figure(data, decade_range, mass_range, orbit_type, status, as_of=None):
+    with metrics.stage('lifespan-hist', 'aggregate'):
+        summary = summarize(data, decade_range, mass_range, orbit_type, status, as_of)
+    metrics.SELECTED_ROWS.observe(summary.total, component='lifespan-hist')
 
     # Figure 2: Bar chart of Active vs Inactive satellites
     bar_fig = go.Figure()
     try:
         # Ensure we have data before grouping
-        if not filtered_df.empty:
-            # Create status_counts DataFrame - handle potential groupby errors
-            status_counts = pd.DataFrame(index=filtered_df['Launch_Decade'].unique())
-            
-            # Get counts for each status
-            active_counts = filtered_df[filtered_df['IsActive'] == True].groupby('Launch_Decade').size()
-            inactive_counts = filtered_df[filtered_df['IsActive'] == False].groupby('Launch_Decade').size()
-            
-            # Assign to status_counts, handling missing values
-            status_counts[True] = active_counts.reindex(status_counts.index, fill_value=0)
-            status_counts[False] = inactive_counts.reindex(status_counts.index, fill_value=0)
-            
-            # Sort index for consistent display
-            status_counts = status_counts.sort_index()
+        if summary.total > 0:
+            # Active/decommissioned counts per decade, sorted by decade
+            status_counts = summary.status_counts()
 
             # Decommissioned bar
             bar_fig.add_trace(go.Bar(
@@ -466,8 +580,7 @@ def update_graphs(decade_range, mass_range, orbit_type, status, tab):
                 y=status_counts[False],
                 name="Decommissioned",
                 marker_color="rgba(0, 191, 255, 0.7)",
-                customdata=[["Decommissioned"]] * len(status_counts),
-                hovertemplate="Decade: %{x}<br>Count: %{y}<br>Status: %{customdata[0]}<extra></extra>"
+                hovertemplate="Decade: %{x}<br>Count: %{y}<br>Status: Decommissioned<extra></extra>"
             ))
 
             # Active bar
@@ -476,13 +589,12 @@ def update_graphs(decade_range, mass_range, orbit_type, status, tab):
                 y=status_counts[True],
                 name="Active",
                 marker_color="rgba(255, 255, 255, 0.8)",
-                customdata=[["Active"]] * len(status_counts),
-                hovertemplate="Decade: %{x}<br>Count: %{y}<br>Status: %{customdata[0]}<extra></extra>"
+                hovertemplate="Decade: %{x}<br>Count: %{y}<br>Status: Active<extra></extra>"
             ))
 
             bar_fig.update_layout(
                 barmode='stack',
-                title="Active vs Decommissioned Satellites by Launch Decade",
+                title=as_of_title("Active vs Decommissioned Satellites by Launch Decade", as_of),
                 xaxis_title="Launch Decade",
                 yaxis_title="Number of Satellites",
                 plot_bgcolor='rgba(0,0,0,0)',
@@ -497,101 +609,875 @@ def update_graphs(decade_range, mass_range, orbit_type, status, tab):
                 margin=dict(t=40, b=40, l=40, r=40)
             )
         else:
-            bar_fig = empty_fig
+            bar_fig = empty_figure()
     except Exception as e:
-        print(f"Error in bar chart: {e}")
-        bar_fig = empty_fig
+        metrics.error('lifespan-hist', 'bar chart', e)
+        bar_fig = empty_figure()
+
+    return bar_fig
+
+
+def build_orbit_figure(data, decade_range, mass_range, orbit_type, status, as_of=None):
+    with metrics.stage('orbit-pie', 'aggregate'):
+        summary = summarize(data, decade_range, mass_range, orbit_type, status, as_of)
+    metrics.SELECTED_ROWS.observe(summary.total, component='orbit-pie')
 
     # Figure 3: Orbit distribution
     bar_orbit_fig = go.Figure()
     try:
-        inactive_df = filtered_df[~filtered_df["IsActive"]].copy()
+        # Decommissioned counts per (decade, orbit group)
+        orbit_counts = summary.orbit_counts()
 
         # Check if we have inactive satellites
-        if not inactive_df.empty:
-            # Safely create orbit_grouped DataFrame
-            orbit_counts = inactive_df.groupby(["Launch_Decade", "Orbit_Group"]).size().reset_index(name='count')
+        if not orbit_counts.empty:
+            # Get top orbit groups
+            orbit_sums = orbit_counts.groupby("Orbit_Group")['count'].sum().sort_values(ascending=False)
+            top_orbit_groups = orbit_sums.head(4).index.tolist()
             
-            if not orbit_counts.empty:
-                # Get top orbit groups
-                orbit_sums = orbit_counts.groupby("Orbit_Group")['count'].sum().sort_values(ascending=False)
-                top_orbit_groups = orbit_sums.head(4).index.tolist()
+            # Define colors
+            colors = [
+                "rgba(0, 191, 255, 0.7)",   # deep sky blue
+                "rgba(255, 255, 255, 0.8)",  # white-ish
+                "#ffd700",                  # yellowish
+                "#ff6347"                   # redish
+            ]
+
+            # Filter for just the top orbits
+            for i, orbit in enumerate(top_orbit_groups):
+                orbit_data = orbit_counts[orbit_counts["Orbit_Group"] == orbit]
                 
-                # Define colors
-                colors = [
-                    "rgba(0, 191, 255, 0.7)",   # deep sky blue
-                    "rgba(255, 255, 255, 0.8)",  # white-ish
-                    "#ffd700",                  # yellowish
-                    "#ff6347"                   # redish
-                ]
-
-                # Filter for just the top orbits
-                for i, orbit in enumerate(top_orbit_groups):
-                    orbit_data = orbit_counts[orbit_counts["Orbit_Group"] == orbit]
-                    
-                    if i < len(colors) and not orbit_data.empty:
-                        bar_orbit_fig.add_trace(go.Bar(
-                            x=orbit_data["Launch_Decade"],
-                            y=orbit_data["count"],
-                            name=orbit,
-                            marker_color=colors[i],
-                            hovertemplate="Decade: %{x}<br>Count: %{y}<br>Orbit: " + orbit + "<extra></extra>"
-                        ))
-
-                bar_orbit_fig.update_layout(
-                    barmode='group',
-                    title="Top Orbit Types Where Decommissioned Satellites Accumulate",
-                    xaxis_title="Launch Decade",
-                    yaxis_title="Number of Inactive Satellites",
-                    plot_bgcolor='rgba(0,0,0,0)',
-                    paper_bgcolor='rgba(0,0,0,0)',
-                    font_color='white',
-                    height=500,
-                    legend=dict(
-                        title='Orbit Group',
-                        font=dict(size=14, color='white'),
-                        bgcolor='rgba(25,25,50,0.7)'
-                    ),
-                    margin=dict(t=40, b=40, l=40, r=40)
-                )
-            else:
-                bar_orbit_fig = empty_fig
+                if i < len(colors) and not orbit_data.empty:
+                    bar_orbit_fig.add_trace(go.Bar(
+                        x=orbit_data["Launch_Decade"],
+                        y=orbit_data["count"],
+                        name=orbit,
+                        marker_color=colors[i],
+                        hovertemplate="Decade: %{x}<br>Count: %{y}<br>Orbit: " + orbit + "<extra></extra>"
+                    ))
+
+            bar_orbit_fig.update_layout(
+                barmode='group',
+                title=as_of_title("Top Orbit Types Where Decommissioned Satellites Accumulate", as_of),
+                xaxis_title="Launch Decade",
+                yaxis_title="Number of Inactive Satellites",
+                plot_bgcolor='rgba(0,0,0,0)',
+                paper_bgcolor='rgba(0,0,0,0)',
+                font_color='white',
+                height=500,
+                legend=dict(
+                    title='Orbit Group',
+                    font=dict(size=14, color='white'),
+                    bgcolor='rgba(25,25,50,0.7)'
+                ),
+                margin=dict(t=40, b=40, l=40, r=40)
+            )
+        else:
+            bar_orbit_fig = empty_figure()
+    except Exception as e:
+        metrics.error('orbit-pie', 'orbit chart', e)
+        bar_orbit_fig = empty_figure()
+
+    return bar_orbit_fig
+
+
+def build_population_figure(data, decade_range, mass_range, orbit_type, status, as_of=None):
+    # Whole history regardless of the as-of date, which is marked instead;
+    # the status filter picks in-orbit or decommissioned counts
+    with metrics.stage('orbit-population', 'filter'):
+        rows = data.frame_index.select(decade_range, mass_range, orbit_type, 'All').to_frame()
+    metrics.SELECTED_ROWS.observe(len(rows), component='orbit-population')
+    if rows.empty:
+        return empty_figure()
+
+    # Figure 4: Payloads in each orbit group over time
+    population_fig = go.Figure()
+    try:
+        with metrics.stage('orbit-population', 'sweep'):
+            start, step, in_orbit, decommissioned = population_series(rows, datetime.date.today())
+        counts = decommissioned if status == 'Decommissioned' else in_orbit
+        label = "Decommissioned" if status == 'Decommissioned' else "In-Orbit"
+
+        colors = [
+            "#ffd700",                  # GEO
+            "#ff6347",                  # HEO
+            "rgba(0, 191, 255, 0.7)",   # LEO
+            "rgba(255, 255, 255, 0.8)", # MEO
+            "rgba(100, 149, 237, 0.7)"  # Other
+        ]
+        for i, group in enumerate(ORBIT_GROUPS):
+            if not counts[i].any():
+                continue
+            # Evenly spaced dates are sent as x0/dx (milliseconds on a date axis)
+            population_fig.add_trace(go.Scatter(
+                x0=str(start),
+                dx=step * 1000,
+                y=counts[i].astype(np.int32),
+                mode="lines",
+                stackgroup="orbits",
+                name=group,
+                line=dict(width=1, color=colors[i % len(colors)]),
+                hovertemplate="%{x|%b %Y}<br>" + group + ": %{y}<extra></extra>"
+            ))
+
+        population_fig.update_layout(
+            title=f"{label} Payloads by Orbit Group Over Time",
+            xaxis=dict(type="date", title="Date"),
+            yaxis_title=f"{label} Payloads (stacked)",
+            plot_bgcolor='rgba(0,0,0,0)',
+            paper_bgcolor='rgba(0,0,0,0)',
+            font_color='white',
+            height=500,
+            hovermode="x unified",
+            legend=dict(
+                title='Orbit Group',
+                font=dict(size=14, color='white'),
+                bgcolor='rgba(25,25,50,0.7)'
+            ),
+            margin=dict(t=40, b=40, l=40, r=40)
+        )
+        if as_of is not None:
+            population_fig.update_layout(shapes=[dict(
+                type="line", xref="x", yref="paper", x0=as_of, x1=as_of, y0=0, y1=1,
+                line=dict(color="white", width=1, dash="dot")
+            )])
+    except Exception as e:
+        metrics.error('orbit-population', 'population chart', e)
+        population_fig = empty_figure()
+
+    return population_fig
+
+
+def cohort_life_tables(data, mass_range, as_of=None):
+    # (decades, events, exits) for the rows in the mass range: the life tables
+    # of every (decade, orbit group) cohort, shaped (decades, orbit groups,
+    # lifespan bins), in one pass over the rows
+    def build():
+        every_decade = [int(data.cube.decades[0]), int(data.cube.decades[-1])] if len(data.cube.decades) else [0, 0]
+        if as_of is None:
+            selection = data.frame_index.select(every_decade, mass_range, 'All', 'All')
+            lengths = [stop - start for start, stop in selection.slices]
+            decades = np.unique(selection.decades)
+            cohorts = np.repeat(np.searchsorted(decades, selection.decades) * len(ORBIT_GROUPS)
+                                + np.asarray(selection.orbits, dtype=np.intp), lengths)
+            durations = np.concatenate(selection.column("Lifespan_Years") or [np.empty(0)])
+            active = np.concatenate(selection.column("IsActive") or [np.empty(0, dtype=bool)])
+        else:
+            rows = selected_rows(data, every_decade, mass_range, 'All', 'All', as_of)
+            decades = np.unique(rows["Launch_Decade"].to_numpy())
+            orbits = pd.Categorical(rows["Orbit_Group"], categories=ORBIT_GROUPS).codes.astype(np.intp)
+            cohorts = np.searchsorted(decades, rows["Launch_Decade"].to_numpy()) * len(ORBIT_GROUPS) + orbits
+            durations = rows["Lifespan_Years"].to_numpy()
+            active = rows["IsActive"].to_numpy()
+        events, exits = life_tables(durations, ~active.astype(bool), cohorts, len(decades) * len(ORBIT_GROUPS))
+        shape = (len(decades), len(ORBIT_GROUPS), N_BINS)
+        return decades, events.reshape(shape), exits.reshape(shape)
+
+    return survival_tables.get((data.version, float(mass_range[0]), float(mass_range[1]), as_of), build)
+
+
+def build_survival_figure(data, decade_range, mass_range, orbit_type, status, as_of=None):
+    # The status filter does not apply: being decommissioned is the event
+    # whose timing the curves estimate, and active rows are censored
+    with metrics.stage('survival-graph', 'life-tables'):
+        decades, events, exits = cohort_life_tables(data, mass_range, as_of)
+        keep = (decades >= decade_range[0]) & (decades <= decade_range[1])
+        groups = slice(None)
+        if orbit_type != 'All':
+            groups = [ORBIT_GROUPS.index(orbit_type)] if orbit_type in ORBIT_GROUPS else []
+        events = events[keep][:, groups].sum(axis=1)
+        exits = exits[keep][:, groups].sum(axis=1)
+        decades = decades[keep]
+    metrics.SELECTED_ROWS.observe(int(exits.sum()), component='survival-graph')
+    if not exits.any():
+        return empty_figure()
+
+    # Figure 5: Kaplan-Meier survival curves per launch decade
+    survival_fig = go.Figure()
+    try:
+        with metrics.stage('survival-graph', 'kaplan-meier'):
+            survival, lower, upper, _ = kaplan_meier(events, exits)
+        # Up to the longest lifespan in the selection
+        n_bins = np.flatnonzero(exits.any(axis=0))[-1] + 1
+
+        colors = [
+            "0, 191, 255",
+            "255, 215, 0",
+            "255, 99, 71",
+            "144, 238, 144",
+            "255, 255, 255",
+            "218, 112, 214",
+            "255, 165, 0",
+            "100, 149, 237",
+            "64, 224, 208",
+            "240, 128, 128"
+        ]
+        for i, decade in enumerate(decades):
+            if not exits[i].any():
+                continue
+            rgb = colors[i % len(colors)]
+            # Curves start at 1 at lifespan 0 and step at the end of each bin
+            curve = dict(x0=0, dx=STEP_YEARS, mode="lines", line_shape="hv", legendgroup=f"{decade}s")
+            series = [np.r_[1.0, values[i, :n_bins]].astype(np.float32) for values in (upper, lower, survival)]
+            survival_fig.add_trace(go.Scatter(
+                y=series[0], line=dict(width=0), showlegend=False, hoverinfo="skip", **curve
+            ))
+            survival_fig.add_trace(go.Scatter(
+                y=series[1], line=dict(width=0), fill="tonexty", fillcolor=f"rgba({rgb}, 0.2)",
+                showlegend=False, hoverinfo="skip", **curve
+            ))
+            survival_fig.add_trace(go.Scatter(
+                y=series[2], name=f"{decade}s", line=dict(width=2, color=f"rgb({rgb})"),
+                hovertemplate="%{x:.2f} years: %{y:.1%} still active<extra>" + f"{decade}s</extra>", **curve
+            ))
+
+        survival_fig.update_layout(
+            title=as_of_title("Survival by Launch Decade (Kaplan-Meier, 95% bands)", as_of),
+            xaxis_title="Years Since Launch",
+            yaxis=dict(title="Share Not Yet Decommissioned", tickformat=".0%", range=[0, 1.02]),
+            plot_bgcolor='rgba(0,0,0,0)',
+            paper_bgcolor='rgba(0,0,0,0)',
+            font_color='white',
+            height=500,
+            hovermode="closest",
+            legend=dict(
+                title='Launch Decade',
+                font=dict(size=14, color='white'),
+                bgcolor='rgba(25,25,50,0.7)'
+            ),
+            margin=dict(t=40, b=40, l=40, r=40)
+        )
+    except Exception as e:
+        metrics.error('survival-graph', 'survival chart', e)
+        survival_fig = empty_figure()
+
+    return survival_fig
+
+
+def mass_lifespan_points(data, decade_range, mass_range, orbit_type, status, as_of=None):
+    # (mass, lifespan, orbit group code) of every filtered row
+    if as_of is None:
+        selection = data.frame_index.select(decade_range, mass_range, orbit_type, status)
+        lengths = [stop - start for start, stop in selection.slices]
+        orbits = np.repeat(np.asarray(selection.orbits, dtype=np.int8), lengths)
+        mass = np.concatenate(selection.column("Mass") or [np.empty(0, dtype=np.float32)])
+        lifespan = np.concatenate(selection.column("Lifespan_Years") or [np.empty(0, dtype=np.float32)])
+        return mass, lifespan, orbits
+    rows = selected_rows(data, decade_range, mass_range, orbit_type, status, as_of)
+    orbits = pd.Categorical(rows["Orbit_Group"], categories=ORBIT_GROUPS).codes
+    return rows["Mass"].to_numpy(), rows["Lifespan_Years"].to_numpy(), orbits
+
+
+def build_mass_lifespan_figure(data, decade_range, mass_range, orbit_type, status, as_of=None, zoom=None):
+    # Markers when few enough payloads are in view, otherwise a density image
+    # of the ones in view, binned here, so the payload does not grow with the
+    # selection. `zoom` holds the axis ranges of a zoomed-in view, as
+    # {"x": [lo, hi], "y": [lo, hi]}.
+    with metrics.stage('mass-lifespan', 'filter'):
+        mass, lifespan, orbits = mass_lifespan_points(data, decade_range, mass_range, orbit_type, status, as_of)
+    metrics.SELECTED_ROWS.observe(len(mass), component='mass-lifespan')
+    if not len(mass):
+        return empty_figure()
+
+    # Figure 6: Mass against lifespan, per orbit group
+    scatter_fig = go.Figure()
+    try:
+        zoom = zoom or {}
+        x0, x1 = zoom.get("x") or (float(mass.min()), float(mass.max()))
+        y0, y1 = zoom.get("y") or (0.0, float(lifespan.max()))
+        x1, y1 = max(x1, x0 + 1), max(y1, y0 + STEP_YEARS)
+        in_view = np.ones(len(mass), dtype=bool)
+        if len(mass) > SCATTER_MAX_POINTS:
+            in_view = (mass >= x0) & (mass <= x1) & (lifespan >= y0) & (lifespan <= y1)
+
+        colors = [
+            "#ffd700",                  # GEO
+            "#ff6347",                  # HEO
+            "rgba(0, 191, 255, 0.7)",   # LEO
+            "rgba(255, 255, 255, 0.8)", # MEO
+            "rgba(100, 149, 237, 0.7)"  # Other
+        ]
+        if in_view.sum() <= SCATTER_MAX_POINTS:
+            for code, group in enumerate(ORBIT_GROUPS):
+                keep = in_view & (orbits == code)
+                if not keep.any():
+                    continue
+                scatter_fig.add_trace(go.Scattergl(
+                    x=mass[keep].astype(np.float32),
+                    y=lifespan[keep].astype(np.float32),
+                    mode="markers",
+                    name=group,
+                    marker=dict(size=4, color=colors[code % len(colors)]),
+                    hovertemplate="%{x:.0f} kg, %{y:.1f} years<extra>" + group + "</extra>"
+                ))
+            title = "Mass vs. Lifespan by Orbit Group"
         else:
-            bar_orbit_fig = empty_fig
+            with metrics.stage('mass-lifespan', 'bin'):
+                nx, ny = DENSITY_BINS
+                dx, dy = (x1 - x0) / nx, (y1 - y0) / ny
+                xi = np.minimum(((mass[in_view] - x0) / dx).astype(np.intp), nx - 1)
+                yi = np.minimum(((lifespan[in_view] - y0) / dy).astype(np.intp), ny - 1)
+                counts = np.bincount(yi * nx + xi, minlength=nx * ny).reshape(ny, nx).astype(np.uint32)
+            scatter_fig.add_trace(go.Heatmap(
+                z=counts,
+                x0=x0 + dx / 2,
+                dx=dx,
+                y0=y0 + dy / 2,
+                dy=dy,
+                zmin=0,
+                # A few crowded bins would otherwise wash out the rest
+                zmax=max(1.0, float(np.percentile(counts[counts > 0], 99))),
+                colorscale=[[0, "rgba(0, 0, 0, 0)"], [1e-6, "#1f2c56"], [0.3, "#4169e1"],
+                            [0.7, "#00bfff"], [1, "#ffffff"]],
+                colorbar=dict(title="Payloads"),
+                hovertemplate="%{x:.0f} kg, %{y:.1f} years: %{z} payloads<extra></extra>"
+            ))
+            title = "Mass vs. Lifespan (payloads per bin)"
+
+        scatter_fig.update_layout(
+            title=as_of_title(title, as_of),
+            xaxis_title="Mass (kg)",
+            yaxis_title="Lifespan (Years)",
+            plot_bgcolor='rgba(0,0,0,0)',
+            paper_bgcolor='rgba(0,0,0,0)',
+            font_color='white',
+            height=500,
+            hovermode="closest",
+            legend=dict(
+                title='Orbit Group',
+                font=dict(size=14, color='white'),
+                bgcolor='rgba(25,25,50,0.7)'
+            ),
+            margin=dict(t=40, b=40, l=40, r=40)
+        )
+        if zoom:
+            scatter_fig.update_layout(xaxis_range=[x0, x1], yaxis_range=[y0, y1])
     except Exception as e:
-        print(f"Error in orbit chart: {e}")
-        bar_orbit_fig = empty_fig
+        metrics.error('mass-lifespan', 'scatter', e)
+        scatter_fig = empty_figure()
+
+    return scatter_fig
+
+
+def tab_description(tab):
+    # Set default description based on tab
+    if tab == 'tab-1':
+        desc = "Satellite lifespans have changed over time. Early satellites lasted only a few years, but by the 1990s, better technology meant they stayed active much longer. Recently, the rise of small, low-cost satellites like CubeSats has led to shorter lifespans again—raising concerns about growing space clutter and long-term sustainability."
+    elif tab == 'tab-2':
+        desc = "Most satellites are never removed after they stop working. While launches have increased each decade, so has the number of inactive satellites left behind. Many older satellites—especially from the 1990s and 2000s—weren't designed to safely deorbit, adding to the growing clutter in space."
+    elif tab == 'tab-3':
+        desc = "Most retired satellites stay in low Earth orbit (LEO). As more small satellites and mega-constellations are launched, LEO is becoming crowded—not just with working satellites, but also with space junk. If this isn't managed, it could threaten future missions."
+    elif tab == 'tab-4':
+        desc = "For decades the number of working payloads grew slowly, with geostationary orbit holding a large share. Since the late 2010s low Earth orbit has taken off, driven by mega-constellations. Move the As Of slider to see any past year on the other tabs; the dotted line marks it here."
+    elif tab == 'tab-6':
+        desc = "Heavier payloads tend to be built for longer missions, but the spread is wide in every orbit. Up to a few thousand satellites are drawn individually; larger selections are shown as a density of payloads per bin, which is redrawn in finer detail as you zoom in."
+    elif tab == 'tab-5':
+        desc = "The share of each launch decade's payloads still working after a given number of years. Satellites that are still active count only for as long as they have been up, so recent decades are not biased towards short lives; the shaded bands are 95% confidence intervals. The status filter does not apply here."
+    else:
+        desc = ""
+    return desc
+
 
+def compute_kpis(data, decade_range, mass_range, orbit_type, status, as_of=None):
     # Calculate statistics safely
     try:
-        total_satellites = str(len(filtered_df))
-        active_satellites = str(filtered_df['IsActive'].sum())
-
-        if len(filtered_df) > 0:
-            # Handle potential NaN values
-            lifespan_values = filtered_df['Lifespan_Years'].dropna()
-            if len(lifespan_values) > 0:
-                avg_lifespan = str(round(lifespan_values.mean(), 1))
-            else:
-                avg_lifespan = "0"
-
-            mass_values = filtered_df['Mass'].dropna()
-            if len(mass_values) > 0:
-                avg_mass = str(round(mass_values.mean(), 1))
-            else:
-                avg_mass = "0"
+        with metrics.stage('kpis', 'aggregate'):
+            return summarize(data, decade_range, mass_range, orbit_type, status, as_of).kpis()
+    except Exception as e:
+        metrics.error('kpis', 'stats', e)
+        return "0", "0", "0", "0"
+
+
+# Figure builders per tab; only the selected tab's figure is computed.
+# FIGURE_VERSION keys the shared cache and is bumped when the builders change.
+FIGURE_VERSION = 3
+TAB_FIGURES = {
+    'tab-1': ('lifespan-graph', figure_cache.memoize('lifespan-graph', build_lifespan_figure, FIGURE_VERSION)),
+    'tab-2': ('lifespan-hist', figure_cache.memoize('lifespan-hist', build_status_figure, FIGURE_VERSION)),
+    'tab-3': ('orbit-pie', figure_cache.memoize('orbit-pie', build_orbit_figure, FIGURE_VERSION)),
+    'tab-4': ('orbit-population', figure_cache.memoize('orbit-population', build_population_figure, FIGURE_VERSION)),
+    'tab-5': ('survival-graph', figure_cache.memoize('survival-graph', build_survival_figure, FIGURE_VERSION)),
+    'tab-6': ('mass-lifespan', figure_cache.memoize('mass-lifespan', build_mass_lifespan_figure, FIGURE_VERSION)),
+}
+
+# Most requested filter combinations, built whenever a snapshot is loaded
+# with SATCAT_PREWARM=1
+PREWARM_FILTERS = [
+    ([1980, 2020], [0, 5000], 'All', 'All'),
+    ([1950, 2020], [0, 10000], 'All', 'All'),
+]
+
+
+def prewarm(data):
+    figure_cache.prewarm(data, [build for _, build in TAB_FIGURES.values()], PREWARM_FILTERS)
+
+
+if os.environ.get("SATCAT_PREWARM") == "1":
+    live.on_swap.append(prewarm)
+    if live.current is not None:
+        prewarm(live.current)
+
+
+def update_graphs(decade_range, mass_range, orbit_type, status, tab, as_of=None):
+    # Everything shown for one filter combination, for use outside the app:
+    # the six tab figures in TAB_FIGURES order (tab-1 to tab-6), the four
+    # KPI strings of compute_kpis and the description of `tab`. The figures
+    # are full ones, built without the figure cache or the per-tab stores.
+    data = live.current
+    filters = (decade_range, mass_range, orbit_type, status, as_of)
+    figures = [build(data, *filters) for _, build in TAB_FIGURES.values()]
+    return (*figures, *compute_kpis(data, *filters), tab_description(tab))
+
+
+# Per-trace arrays that change with the filters; everything else in a figure
+# is its structure (trace types, names, colours, layout)
+DATA_KEYS = ("x", "x0", "dx", "y", "y0", "dy", "z", "zmax", "customdata")
+
+
+def figure_structure(figure):
+    # Hash of a figure dict with its data arrays blanked out
+    data = [{k: (None if k in DATA_KEYS else v) for k, v in trace.items()} for trace in figure.get("data", [])]
+    text = json.dumps([data, figure.get("layout")], sort_keys=True)
+    return hashlib.sha1(text.encode()).hexdigest()
+
+
+def figure_patch(figure):
+    # Partial update that swaps in a figure's data arrays, for a graph already
+    # showing a figure with the same structure
+    patch = Patch()
+    for i, trace in enumerate(figure["data"]):
+        for k in DATA_KEYS:
+            if k in trace:
+                patch["data"][i][k] = trace[k]
+    return patch
+
+
+def register_tab_figure(tab_value, graph_id, build):
+    @app.callback(
+        [
+            Output(graph_id, 'figure'),
+            Output(f'{graph_id}-filters', 'data')
+        ],
+        [
+            Input('decade-slider', 'value'),
+            Input('mass-slider', 'value'),
+            Input('orbit-dropdown', 'value'),
+            Input('status-radio', 'value'),
+            Input('as-of-slider', 'value'),
+            Input('tabs', 'value'),
+            Input('data-version', 'data')
+        ],
+        [State(f'{graph_id}-filters', 'data')]
+    )
+    def update_tab_figure(decade_range, mass_range, orbit_type, status, as_of_year, tab, _, rendered):
+        # Hidden tabs wait until they are shown, and a shown tab is only
+        # rebuilt when the filters or the dataset changed since it was last
+        # drawn. If the graph already shows a figure of the same structure,
+        # only the changed data arrays are sent.
+        data = live.current
+        if data is None:
+            if tab != tab_value:
+                raise PreventUpdate
+            return loading_figure(), {}
+        as_of = as_of_date(as_of_year)
+        key = [data.version, decade_range, mass_range, orbit_type, status, as_of]
+        rendered = rendered or {}
+        if tab != tab_value or key == rendered.get("filters"):
+            raise PreventUpdate
+        figure = build(data, decade_range, mass_range, orbit_type, status, as_of)
+        structure = figure_structure(figure)
+        if structure == rendered.get("structure"):
+            figure = figure_patch(figure)
+        return figure, {"filters": key, "structure": structure}
+
+
+for tab_value, (graph_id, build) in TAB_FIGURES.items():
+    register_tab_figure(tab_value, graph_id, build)
+
+
+def relayout_zoom(relayout, zoom):
+    # Axis ranges after a relayout event, merged into the current `zoom`;
+    # None if the event neither zoomed, panned nor reset an axis
+    zoom = dict(zoom or {})
+    changed = False
+    for axis in ("x", "y"):
+        name = f"{axis}axis"
+        if relayout.get(f"{name}.autorange"):
+            zoom.pop(axis, None)
+        elif f"{name}.range[0]" in relayout and f"{name}.range[1]" in relayout:
+            zoom[axis] = sorted([float(relayout[f"{name}.range[0]"]), float(relayout[f"{name}.range[1]"])])
+        elif f"{name}.range" in relayout:
+            zoom[axis] = sorted(float(v) for v in relayout[f"{name}.range"])
         else:
-            avg_lifespan = "0"
-            avg_mass = "0"
+            continue
+        changed = True
+    return zoom if changed else None
+
+
+@app.callback(
+    [
+        Output('mass-lifespan', 'figure', allow_duplicate=True),
+        Output('mass-lifespan-filters', 'data', allow_duplicate=True)
+    ],
+    Input('mass-lifespan', 'relayoutData'),
+    [
+        State('decade-slider', 'value'),
+        State('mass-slider', 'value'),
+        State('orbit-dropdown', 'value'),
+        State('status-radio', 'value'),
+        State('as-of-slider', 'value'),
+        State('mass-lifespan-filters', 'data')
+    ],
+    prevent_initial_call=True
+)
+def rebin_mass_lifespan(relayout, decade_range, mass_range, orbit_type, status, as_of_year, rendered):
+    # Zooming or panning redraws the view from the rows inside it: a density
+    # image binned for the new window, or the markers themselves once few
+    # enough are in view. Not cached; the windows are arbitrary.
+    data = live.current
+    rendered = rendered or {}
+    zoom = relayout_zoom(relayout or {}, rendered.get("zoom"))
+    as_of = as_of_date(as_of_year)
+    key = [data and data.version, decade_range, mass_range, orbit_type, status, as_of]
+    if data is None or zoom is None or key != rendered.get("filters"):
+        raise PreventUpdate
+    figure = build_mass_lifespan_figure(data, decade_range, mass_range, orbit_type, status, as_of, zoom=zoom)
+    with metrics.stage('mass-lifespan', 'serialize'):
+        figure = json.loads(pio.to_json(figure, validate=False))
+    structure = figure_structure(figure)
+    if structure == rendered.get("structure"):
+        figure = figure_patch(figure)
+    return figure, {**rendered, "structure": structure, "zoom": zoom}
+
+
+@app.callback(
+    [
+        Output('total-satellites', 'children'),
+        Output('active-satellites', 'children'),
+        Output('avg-lifespan', 'children'),
+        Output('avg-mass', 'children')
+    ],
+    [
+        Input('decade-slider', 'value'),
+        Input('mass-slider', 'value'),
+        Input('orbit-dropdown', 'value'),
+        Input('status-radio', 'value'),
+        Input('as-of-slider', 'value'),
+        Input('data-version', 'data')
+    ]
+)
+def update_kpis(decade_range, mass_range, orbit_type, status, as_of_year, _):
+    data = live.current
+    if data is None:
+        return "...", "...", "...", "..."
+    return compute_kpis(data, decade_range, mass_range, orbit_type, status, as_of_date(as_of_year))
+
+
+@app.callback(
+    [
+        Output('satellite-table', 'data'),
+        Output('satellite-table', 'page_count'),
+        Output('satellite-table', 'page_current'),
+        Output('satellite-count', 'children')
+    ],
+    [
+        Input('decade-slider', 'value'),
+        Input('mass-slider', 'value'),
+        Input('orbit-dropdown', 'value'),
+        Input('status-radio', 'value'),
+        Input('as-of-slider', 'value'),
+        Input('data-version', 'data'),
+        Input('satellite-table', 'page_current'),
+        Input('satellite-table', 'page_size'),
+        Input('satellite-table', 'sort_by'),
+        Input('satellite-table', 'filter_query')
+    ]
+)
+def update_satellite_table(decade_range, mass_range, orbit_type, status, as_of_year, _, page_current, page_size,
+                           sort_by, filter_query):
+    data = live.current
+    if data is None:
+        return [], 1, 0, "Loading..."
+    # Anything but a page turn starts again from the first page
+    if 'satellite-table.page_current' not in ctx.triggered_prop_ids:
+        page_current = 0
+    filters = (decade_range, mass_range, orbit_type, status, as_of_date(as_of_year))
+    try:
+        with metrics.stage('satellite-table', 'page'):
+            rows, total = row_browser.page(data, filters, page_current, page_size, sort_by, filter_query)
     except Exception as e:
-        print(f"Error calculating stats: {e}")
-        total_satellites = "0"
-        active_satellites = "0"
-        avg_lifespan = "0"
-        avg_mass = "0"
+        metrics.error('satellite-table', 'page', e)
+        return [], 1, 0, "The satellite list is unavailable for these filters."
+    return rows, max(1, -(-total // page_size)), page_current, f"{total:,} satellites match the filters."
+
+
+@app.callback(
+    [
+        Output('data-version', 'data'),
+        Output('data-poll', 'disabled')
+    ],
+    Input('data-poll', 'n_intervals')
+)
+def poll_data(_):
+    # Redraws the figures and KPIs once the background load has finished
+    data = live.current
+    if data is None:
+        raise PreventUpdate
+    return data.version, True
+
+
+@app.callback(
+    Output('plot-description', 'children'),
+    Input('tabs', 'value')
+)
+def update_description(tab):
+    return tab_description(tab)
+
+
+@app.server.before_request
+def watch_catalog():
+    # Starts the background load (if still needed), the file watcher and the
+    # metrics flusher in whichever process ends up serving requests
+    live.start_loading()
+    live.start_watching()
+    metrics.start_flushing()
+
+
+def report_startup(phase, message):
+    seconds = time.perf_counter() - STARTED
+    metrics.STARTUP_SECONDS.set(round(seconds, 3), phase=phase)
+    print(f"Startup: {message} {seconds:.2f}s after import")
+
+
+def report_ready(data):
+    # Time to ready, reported for the first snapshot only
+    if not getattr(report_ready, "done", False):
+        report_ready.done = True
+        report_startup("ready", f"catalog ready as {data.version}")
+
+
+@app.server.after_request
+def report_first_response(response):
+    # Time to first byte of this process
+    if getattr(report_first_response, "pid", None) != os.getpid():
+        report_first_response.pid = os.getpid()
+        report_startup("first_byte", f"first response ({request.path})")
+    return response
+
+
+def callback_name(body):
+    # First output id of a /_dash-update-component request, e.g. 'lifespan-graph'
+    outputs = (body or {}).get("outputs")
+    if isinstance(outputs, list):
+        outputs = outputs[0] if outputs else None
+    if isinstance(outputs, dict):
+        return outputs.get("id", "unknown")
+    return "unknown"
+
+
+@app.server.before_request
+def start_request_timer():
+    if request.path != "/_dash-update-component":
+        return
+    g.callback_start = time.perf_counter()
+    g.profiler = None
+    if PROFILE_SLOW_MS > 0:
+        try:
+            g.profiler = cProfile.Profile()
+            g.profiler.enable()
+        except ValueError:
+            g.profiler = None  # another profiler is active in this process
+
+
+@app.server.after_request
+def record_request_metrics(response):
+    # Latency and payload size per callback; the slow ones are profiled
+    start = g.pop("callback_start", None)
+    if start is None:
+        return response
+    elapsed = time.perf_counter() - start
+    profiler = g.pop("profiler", None)
+    if profiler is not None:
+        profiler.disable()
+    name = callback_name(request.get_json(silent=True))
+    metrics.REQUEST_SECONDS.observe(elapsed, callback=name, status=response.status_code)
+    if not response.direct_passthrough:
+        metrics.RESPONSE_BYTES.observe(response.calculate_content_length() or 0, callback=name)
+    if profiler is not None and elapsed * 1000 >= PROFILE_SLOW_MS:
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        profiler.dump_stats(os.path.join(PROFILE_DIR, f"{stamp}-{name}-{os.getpid()}-{elapsed * 1000:.0f}ms.prof"))
+        metrics.SLOW_PROFILES.inc(callback=name)
+    return response
+
+
+@app.server.route("/healthz")
+def healthz():
+    # Liveness: the server is up, whether or not the catalog is loaded yet
+    data = live.current
+    return {"status": "ready" if data is not None else "loading", "version": data and data.version}
+
+
+@app.server.route("/readyz")
+def readyz():
+    # Readiness: 503 until the catalog is loaded
+    data = live.current
+    if data is None:
+        return {"status": "loading"}, 503
+    return {"status": "ready", "version": data.version}
+
+
+@app.server.route("/cache-stats")
+def cache_stats():
+    # Hit/miss/eviction counters of the shared figure cache
+    return figure_cache.stats()
+
+
+@app.server.route("/metrics")
+def metrics_endpoint():
+    # Prometheus text format, totals over every worker when they share a
+    # metrics store; the figure cache is shared too, so its counters are
+    # reported once per host rather than per worker
+    cache = []
+    for name, value in figure_cache.stats().items():
+        cache += [f"# TYPE satcat_figure_cache_{name} gauge", f"satcat_figure_cache_{name} {value}"]
+    return Response(metrics.render(cache), mimetype="text/plain; version=0.0.4")
+
+
+# Read-only aggregates for other services, with the UI's filters as query
+# parameters, e.g. /api/aggregates?decades=1980-2020&mass=0-5000&orbit=LEO
+# &status=Active&as_of=2005-12-31&format=json. API_VERSION is part of the
+# ETag and is bumped when a response format changes.
+API_VERSION = 1
+API_DEFAULTS = {"decades": "1980-2020", "mass": "0-5000", "orbit": "All", "status": "All", "as_of": "now"}
+STATUSES = ('All', 'Active', 'Decommissioned')
+
+
+def api_filters(args, data):
+    # (decade_range, mass_range, orbit_type, status, as_of) from query
+    # parameters; ValueError for anything the UI could not have sent, which
+    # includes as-of dates before the first launch in `data` or after today
+    params = {name: args.get(name, default) for name, default in API_DEFAULTS.items()}
+    try:
+        decade_range = [int(v) for v in params["decades"].split("-")]
+        mass_range = [float(v) for v in params["mass"].split("-")]
+        as_of = None if params["as_of"] == "now" else datetime.date.fromisoformat(params["as_of"])
+    except ValueError:
+        raise ValueError("decades and mass take LO-HI, as_of a YYYY-MM-DD date or 'now'")
+    if len(decade_range) != 2 or len(mass_range) != 2:
+        raise ValueError("decades and mass take LO-HI")
+    if not DECADE_BOUNDS[0] <= decade_range[0] <= decade_range[1] <= DECADE_BOUNDS[1]:
+        raise ValueError(f"decades must lie within {DECADE_BOUNDS[0]}-{DECADE_BOUNDS[1]}, LO <= HI")
+    if not MASS_BOUNDS[0] <= mass_range[0] <= mass_range[1] <= MASS_BOUNDS[1]:
+        raise ValueError(f"mass must lie within {MASS_BOUNDS[0]}-{MASS_BOUNDS[1]}, LO <= HI")
+    if as_of is not None:
+        first, today = data.first_launch, datetime.date.today()
+        if not first <= as_of <= today:
+            raise ValueError(f"as_of must lie within {first.isoformat()} and {today.isoformat()}")
+        as_of = end_of_day(as_of)
+    if params["orbit"] not in ('All', *ORBIT_GROUPS):
+        raise ValueError(f"orbit must be one of All, {', '.join(ORBIT_GROUPS)}")
+    if params["status"] not in STATUSES:
+        raise ValueError(f"status must be one of {', '.join(STATUSES)}")
+    return decade_range, mass_range, params["orbit"], params["status"], as_of
+
+
+def aggregates_json(data, filters, summary):
+    total, active, avg_lifespan, avg_mass = summary.kpis()
+    per_decade = summary.counts.sum(axis=1)
+    present = per_decade.sum(axis=1) > 0
+    doc = {
+        "dataset": data.version,
+        "filters": dict(zip(("decade_range", "mass_range", "orbit_type", "status", "as_of"), filters)),
+        "kpis": {
+            "total_satellites": int(total),
+            "active_satellites": int(active),
+            "avg_lifespan_years": float(avg_lifespan),
+            "avg_mass_kg": float(avg_mass),
+        },
+        "by_decade": {
+            "decade": summary.decades[present].tolist(),
+            "active": per_decade[present, 1].tolist(),
+            "decommissioned": per_decade[present, 0].tolist(),
+        },
+        "decommissioned_by_orbit": dict(zip(ORBIT_GROUPS, summary.counts[:, :, 0].sum(axis=0).tolist())),
+    }
+    return json.dumps(doc, separators=(",", ":")).encode()
+
+
+def aggregates_arrow(data, filters, summary):
+    # One row per non-empty (decade, orbit group) cell with its counts and
+    # sums, from which every figure in the JSON format can be rebuilt; the
+    # dataset version and filters go in the schema metadata. pyarrow is only
+    # needed by consumers that ask for this format.
+    import pyarrow as pa
+
+    d, o = np.nonzero(summary.counts.sum(axis=2))
+    table = pa.table({
+        "Launch_Decade": summary.decades[d],
+        "Orbit_Group": np.asarray(ORBIT_GROUPS, dtype=object)[o],
+        "active": summary.counts[d, o, 1],
+        "decommissioned": summary.counts[d, o, 0],
+        "lifespan_years_sum": summary.lifespan_sum[d, o].sum(axis=1),
+        "mass_kg_sum": summary.mass_sum[d, o].sum(axis=1),
+    }, metadata={"dataset": data.version, "filters": json.dumps(filters)})
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+API_FORMATS = {
+    "json": (aggregates_json, "application/json"),
+    "arrow": (aggregates_arrow, "application/vnd.apache.arrow.stream"),
+}
+
+
+@app.server.route("/api/aggregates")
+def api_aggregates():
+    # KPIs and per-decade/per-orbit counts without rendering any figure.
+    # The ETag covers the snapshot, filters, format and encoding, so a client
+    # polling with If-None-Match gets a 304 until the catalog changes.
+    data = live.current
+    if data is None:
+        return {"status": "loading"}, 503
+    try:
+        filters = api_filters(request.args, data)
+    except ValueError as e:
+        return {"error": str(e)}, 400
+    fmt = request.args.get("format", "json")
+    if fmt not in API_FORMATS:
+        return {"error": f"format must be one of {', '.join(API_FORMATS)}"}, 400
+
+    compress = "gzip" in request.accept_encodings
+    key = json.dumps([API_VERSION, data.version, fmt, *normalize_filters(*filters)])
+    etag = hashlib.sha1(key.encode()).hexdigest()[:20] + ("-gzip" if compress else "")
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        render, mimetype = API_FORMATS[fmt]
+        try:
+            with metrics.stage('api', 'aggregate'):
+                body = render(data, filters, summarize(data, *filters))
+        except ImportError as e:
+            return {"error": f"format {fmt} is not available on this server: {e}"}, 501
+        if compress:
+            body = gzip.compress(body, compresslevel=6, mtime=0)
+        response = Response(body, mimetype=mimetype)
+        if compress:
+            response.headers["Content-Encoding"] = "gzip"
+    response.set_etag(etag)
+    response.headers["Vary"] = "Accept-Encoding"
+    response.headers["Cache-Control"] = "no-cache"
+    metrics.API_RESPONSES.inc(endpoint="aggregates", status=response.status_code)
+    return response
 
-    return lifespan_fig, bar_fig, bar_orbit_fig, total_satellites, active_satellites, avg_lifespan, avg_mass, desc
+live.on_swap.append(report_ready)
+if live.current is not None:
+    report_ready(live.current)
+else:
+    live.start_loading()
 
 # Run the app
 if __name__ == '__main__':
+    metrics.use_store(reset=True)
     app.run_server(debug=True)
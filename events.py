@@ -0,0 +1,155 @@
+"""
+Launch and decay events for as-of-date queries.
+
+The filter cube and the segment index describe the catalog on the day the
+snapshot was loaded. EventIndex answers the same questions for any date: the
+launch and decay times of the rows in each cube cell (Launch_Decade x mass
+bin x Orbit_Group) are stored as one sorted array of (cell, time) keys each,
+with prefix sums alongside. The launched, active and decommissioned counts
+and the lifespan and mass sums of every cell at a date t then take four
+vectorized binary searches, and come back as a cube that FilterCube.select
+slices like the one for today.
+
+"""
+
+import numpy as np
+import pandas as pd
+
+from catalog import ORBIT_GROUPS, SECONDS_PER_YEAR
+from cube import N_MASS_BINS, FilterCube, mass_bins
+
+# Times are seconds since EPOCH; CELL_SPAN (about 272 years) exceeds any
+# launch or decay time, so a key cell * CELL_SPAN + time sorts by cell first,
+# then by time.
+EPOCH = np.datetime64("1900-01-01T00:00:00", "s")
+CELL_SPAN = np.int64(2**33)
+
+EVENT_ARRAYS = ("decades", "launch_keys", "launch_cum_time", "launch_cum_mass",
+                "decay_keys", "decay_cum_span", "decay_cum_launch", "decay_cum_mass")
+
+# Step of the population time series: a twelfth of a year
+SERIES_STEP = SECONDS_PER_YEAR / 12
+
+
+def to_seconds(dates):
+    # Seconds since EPOCH of datetime64 values or anything pd.Timestamp takes
+    if np.ndim(dates) == 0:
+        dates = pd.Timestamp(dates).to_datetime64()
+    return (np.asarray(dates).astype("datetime64[s]") - EPOCH).astype(np.int64)
+
+
+def _prefix(values):
+    # Cumulative sums with a leading zero: the sum over [i, j) is cum[j] - cum[i].
+    return np.concatenate([[0.0], np.cumsum(values, dtype=np.float64)])
+
+
+class EventIndex:
+    def __init__(self, df):
+        # Same rows and cells as FilterCube.
+        usable, bins = mass_bins(df["Mass"].to_numpy())
+        df = df[usable]
+        self.decades = np.sort(df["Launch_Decade"].unique())
+        d = np.searchsorted(self.decades, df["Launch_Decade"].to_numpy())
+        o = pd.Categorical(df["Orbit_Group"], categories=ORBIT_GROUPS).codes
+        cells = np.ravel_multi_index((d, bins, o), self.shape).astype(np.int64) * CELL_SPAN
+
+        launch = to_seconds(df["LDate"].to_numpy())
+        mass = df["Mass"].to_numpy()
+        keys = cells + launch
+        order = np.argsort(keys, kind="stable")
+        self.launch_keys = keys[order]
+        self.launch_cum_time = _prefix(launch[order])
+        self.launch_cum_mass = _prefix(mass[order])
+
+        ddate = df["DDate"].to_numpy()
+        decayed = ~np.isnat(ddate)
+        decay = to_seconds(ddate[decayed])
+        keys = cells[decayed] + decay
+        order = np.argsort(keys, kind="stable")
+        self.decay_keys = keys[order]
+        self.decay_cum_span = _prefix((decay - launch[decayed])[order])
+        self.decay_cum_launch = _prefix(launch[decayed][order])
+        self.decay_cum_mass = _prefix(mass[decayed][order])
+
+    @property
+    def shape(self):
+        return len(self.decades), N_MASS_BINS, len(ORBIT_GROUPS)
+
+    def arrays(self):
+        return {name: getattr(self, name) for name in EVENT_ARRAYS}
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        # Rebuilds an index from arrays() output, e.g. memory-mapped from disk.
+        index = cls.__new__(cls)
+        for name in EVENT_ARRAYS:
+            setattr(index, name, arrays[name])
+        return index
+
+    def at(self, as_of):
+        # The filter cube of the catalog as it stood at `as_of`: rows launched
+        # by then, split into active and decommissioned at that date, with
+        # lifespans running up to it for the active ones.
+        t = to_seconds(as_of)
+        starts = np.arange(int(np.prod(self.shape)), dtype=np.int64) * CELL_SPAN
+        # Every stored time lies in [0, CELL_SPAN); a date outside it must not
+        # reach into the neighbouring cell's keys
+        ends = starts + np.clip(t, -1, CELL_SPAN - 1)
+
+        def by_cell(keys, *cums):
+            lo = np.searchsorted(keys, starts, side="left")
+            hi = np.searchsorted(keys, ends, side="right")
+            return hi - lo, [cum[hi] - cum[lo] for cum in cums]
+
+        launched, (launch_time, launch_mass) = by_cell(self.launch_keys, self.launch_cum_time,
+                                                       self.launch_cum_mass)
+        decayed, (span, decay_launch, decay_mass) = by_cell(self.decay_keys, self.decay_cum_span,
+                                                            self.decay_cum_launch, self.decay_cum_mass)
+        active = launched - decayed
+        active_span = t * active - (launch_time - decay_launch)
+
+        shape = (*self.shape, 2)
+        return FilterCube.from_arrays({
+            "decades": self.decades,
+            "counts": np.stack([decayed, active], axis=-1).reshape(shape),
+            "lifespan_sum": np.stack([span, active_span], axis=-1).reshape(shape) / SECONDS_PER_YEAR,
+            "mass_sum": np.stack([decay_mass, launch_mass - decay_mass], axis=-1).reshape(shape),
+        })
+
+
+def frame_as_of(df, as_of, status='All'):
+    # The rows of `df` launched by `as_of`, with IsActive and Lifespan_Years
+    # as they stood at that date, and the status filter applied to those.
+    t = pd.Timestamp(as_of)
+    df = df[df["LDate"] <= t]
+    ddate = df["DDate"]
+    active = (ddate.isna() | (ddate > t)).to_numpy()
+    end = ddate.where(~active, t)
+    lifespan = ((end - df["LDate"]).dt.total_seconds() / SECONDS_PER_YEAR).astype(np.float32)
+    df = df.assign(IsActive=active, Lifespan_Years=lifespan)
+    if status != 'All':
+        df = df[df["IsActive"] == (status == 'Active')]
+    return df
+
+
+def population_series(df, until):
+    # In-orbit and decommissioned counts per orbit group on a regular grid
+    # from the first launch in `df` up to `until`, in one cumulative sweep:
+    # every launch adds one to its group from the next grid point on, every
+    # decay removes one. Returns (start date, step in seconds, in_orbit,
+    # decommissioned), the counts as (len(ORBIT_GROUPS), n_points) arrays.
+    codes = pd.Categorical(df["Orbit_Group"], categories=ORBIT_GROUPS).codes.astype(np.intp)
+    launch = to_seconds(df["LDate"].to_numpy())
+    ddate = df["DDate"].to_numpy()
+    decayed = ~np.isnat(ddate)
+    start = launch.min() if len(launch) else to_seconds(until)
+    n_points = int((to_seconds(until) - start) // SERIES_STEP) + 2
+
+    def sweep(codes, times):
+        points = np.minimum((times - start) // SERIES_STEP + 1, n_points - 1).astype(np.intp)
+        counts = np.bincount(codes * n_points + points, minlength=len(ORBIT_GROUPS) * n_points)
+        return counts.reshape(len(ORBIT_GROUPS), n_points).cumsum(axis=1)
+
+    launched = sweep(codes, launch)
+    decommissioned = sweep(codes[decayed], to_seconds(ddate[decayed]))
+    return EPOCH + np.timedelta64(int(start), "s"), SERIES_STEP, launched - decommissioned, decommissioned
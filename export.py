@@ -0,0 +1,214 @@
+"""
+Headless export of dashboard views for offline reports.
+
+Renders every figure and the KPIs of the dashboard for a grid of filter
+combinations (decade ranges x mass bands x orbit groups x statuses x as-of
+dates), one file
+per combination: figure JSON with the KPIs, or a standalone HTML page that
+loads plotly.min.js from the same directory. The figures come from the same
+builders the dashboard callbacks use.
+
+The catalog is loaded once and the views are rendered by a pool of forked
+processes sharing it. Each finished view is recorded in manifest.jsonl with
+the dataset snapshot and figure version it was built from; views that are
+already current are skipped, so re-running after a catalog change only
+redoes what changed. kpis.csv summarizes the KPIs of every view in the grid.
+
+Usage: python export.py [--out exports] [--format json|html] [--jobs N]
+                        [--decades 1980-2020 ...] [--masses 0-5000 ...]
+                        [--orbits All LEO ...] [--statuses All Active ...]
+                        [--as-of now 2005-12-31 ...]
+
+"""
+
+import argparse
+import csv
+import datetime
+import html
+import itertools
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+import plotly.io as pio
+from plotly.offline import get_plotlyjs
+
+# The export reads the catalog once, up front; it does not need the file
+# watcher or the background load.
+os.environ.setdefault("SATCAT_WATCH_INTERVAL", "0")
+os.environ["SATCAT_LAZY_LOAD"] = "0"
+
+import dashboard  # noqa: E402
+from catalog import ORBIT_GROUPS  # noqa: E402
+
+# Uncached builders: a full export would otherwise evict the live figure cache
+VIEWS = {
+    "lifespan-graph": dashboard.build_lifespan_figure,
+    "lifespan-hist": dashboard.build_status_figure,
+    "orbit-pie": dashboard.build_orbit_figure,
+    "orbit-population": dashboard.build_population_figure,
+    "survival-graph": dashboard.build_survival_figure,
+    "mass-lifespan": dashboard.build_mass_lifespan_figure,
+}
+KPI_NAMES = ("total_satellites", "active_satellites", "avg_lifespan_years", "avg_mass_kg")
+
+DECADES = list(range(1950, 2021, 10))
+DEFAULT_DECADES = [f"{lo}-{hi}" for lo, hi in itertools.combinations_with_replacement(DECADES, 2)]
+DEFAULT_MASSES = ["0-10000", "0-5000", "0-500", "500-2000", "2000-5000", "5000-10000"]
+DEFAULT_ORBITS = ["All", *ORBIT_GROUPS]
+DEFAULT_STATUSES = ["All", "Active", "Decommissioned"]
+DEFAULT_AS_OF = ["now"]
+
+MANIFEST = "manifest.jsonl"
+
+PAGE = """<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"><title>{title}</title><script src="plotly.min.js"></script></head>
+<body style="background-color: #111122; color: white; font-family: Arial">
+<h1>{title}</h1>
+<table>{kpis}</table>
+{figures}
+</body>
+</html>
+"""
+
+
+def parse_range(text):
+    lo, hi = text.split("-")
+    return [int(lo), int(hi)]
+
+
+def view_name(decade_range, mass_range, orbit_type, status, as_of=None):
+    name = f"d{decade_range[0]}-{decade_range[1]}_m{mass_range[0]}-{mass_range[1]}_{orbit_type}_{status}"
+    return name if as_of is None else f"{name}_{as_of}"
+
+
+def render_json(data, filters, figures, kpis):
+    doc = {
+        "dataset": data.version,
+        "filters": dict(zip(("decade_range", "mass_range", "orbit_type", "status", "as_of"), filters)),
+        "kpis": kpis,
+        "figures": figures,
+    }
+    return pio.json.to_json_plotly(doc)
+
+
+def render_html(data, filters, figures, kpis):
+    title = html.escape(f"{filters[0][0]}s-{filters[0][1]}s, {filters[1][0]}-{filters[1][1]} kg, "
+                        f"orbit {filters[2]}, status {filters[3]}, as of {(filters[4] or 'today')[:10]}")
+    rows = "".join(f"<tr><td>{name}</td><td>{value}</td></tr>" for name, value in kpis.items())
+    divs = "\n".join(fig.to_html(full_html=False, include_plotlyjs=False) for fig in figures.values())
+    return PAGE.format(title=title, kpis=rows, figures=divs)
+
+
+RENDERERS = {"json": render_json, "html": render_html}
+
+
+def export_view(task):
+    # Runs in a pool process forked after the catalog was loaded.
+    out, fmt, name, filters = task
+    data = dashboard.live.current
+    figures = {graph_id: build(data, *filters) for graph_id, build in VIEWS.items()}
+    kpis = dict(zip(KPI_NAMES, dashboard.compute_kpis(data, *filters)))
+    path = os.path.join(out, f"{name}.{fmt}")
+    with open(path + ".tmp", "w") as f:
+        f.write(RENDERERS[fmt](data, filters, figures, kpis))
+    os.replace(path + ".tmp", path)
+    return name, kpis
+
+
+def read_manifest(out):
+    # {view name: entry} from the last line recorded for each view
+    entries = {}
+    path = os.path.join(out, MANIFEST)
+    if os.path.exists(path):
+        with open(path) as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # Torn last line of an interrupted run
+                entries[entry["name"]] = entry
+    return entries
+
+
+def write_manifest(out, entries):
+    path = os.path.join(out, MANIFEST)
+    with open(path + ".tmp", "w") as f:
+        for entry in entries.values():
+            f.write(json.dumps(entry) + "\n")
+    os.replace(path + ".tmp", path)
+
+
+def write_kpis(out, names, entries):
+    with open(os.path.join(out, "kpis.csv"), "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["view", "decade_range", "mass_range", "orbit_type", "status", "as_of", *KPI_NAMES])
+        for name in names:
+            entry = entries[name]
+            decade_range, mass_range, orbit_type, status, as_of = entry["filters"]
+            writer.writerow([name, "-".join(map(str, decade_range)), "-".join(map(str, mass_range)),
+                             orbit_type, status, as_of or "", *(entry["kpis"][k] for k in KPI_NAMES)])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", default="exports")
+    parser.add_argument("--format", choices=sorted(RENDERERS), default="json")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count())
+    parser.add_argument("--decades", nargs="+", default=DEFAULT_DECADES)
+    parser.add_argument("--masses", nargs="+", default=DEFAULT_MASSES)
+    parser.add_argument("--orbits", nargs="+", default=DEFAULT_ORBITS)
+    parser.add_argument("--statuses", nargs="+", default=DEFAULT_STATUSES)
+    parser.add_argument("--as-of", nargs="+", default=DEFAULT_AS_OF,
+                        help="dates (YYYY-MM-DD) to draw the catalog as of; 'now' for today's snapshot")
+    parser.add_argument("--force", action="store_true", help="re-render views that are already current")
+    args = parser.parse_args()
+
+    os.makedirs(args.out, exist_ok=True)
+    if args.format == "html" and not os.path.exists(os.path.join(args.out, "plotly.min.js")):
+        with open(os.path.join(args.out, "plotly.min.js"), "w") as f:
+            f.write(get_plotlyjs())
+
+    # A view is current if it was rendered from this snapshot by these builders,
+    # with these filters
+    stamp = f"{dashboard.live.current.version}/v{dashboard.FIGURE_VERSION}/{args.format}"
+    grid = {}
+    combinations = itertools.product(args.decades, args.masses, args.orbits, args.statuses, args.as_of)
+    for decades, masses, orbit_type, status, as_of in combinations:
+        day = None if as_of == "now" else datetime.date.fromisoformat(as_of)
+        filters = (parse_range(decades), parse_range(masses), orbit_type, status)
+        # Views are named by the date and drawn, like the dashboard draws
+        # them, as of the end of that day
+        grid[view_name(*filters, day)] = (*filters, None if day is None else dashboard.end_of_day(day))
+
+    entries = read_manifest(args.out)
+    todo = [
+        (args.out, args.format, name, filters) for name, filters in grid.items()
+        if args.force or entries.get(name, {}).get("stamp") != stamp
+        or entries[name].get("filters") != json.loads(json.dumps(filters))
+        or not os.path.exists(os.path.join(args.out, f"{name}.{args.format}"))
+    ]
+    print(f"{len(grid)} views, {len(grid) - len(todo)} current, {len(todo)} to render with {args.jobs} processes")
+
+    start = time.perf_counter()
+    if todo:
+        # Forked workers share the parent's memory-mapped catalog snapshot
+        context = multiprocessing.get_context("fork" if sys.platform != "win32" else "spawn")
+        with context.Pool(args.jobs) as pool, open(os.path.join(args.out, MANIFEST), "a") as manifest:
+            for i, (name, kpis) in enumerate(pool.imap_unordered(export_view, todo, chunksize=8), 1):
+                entries[name] = {"name": name, "stamp": stamp, "filters": grid[name], "kpis": kpis}
+                manifest.write(json.dumps(entries[name]) + "\n")
+                if i % 500 == 0:
+                    manifest.flush()
+                    print(f"  {i}/{len(todo)} in {time.perf_counter() - start:.1f}s")
+
+    write_manifest(args.out, entries)
+    write_kpis(args.out, list(grid), entries)
+    print(f"Rendered {len(todo)} views to {args.out}/ in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
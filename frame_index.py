@@ -0,0 +1,121 @@
+"""
+Sorted-segment index over the processed frame.
+
+Rows are stored sorted by (Launch_Decade, Orbit_Group, IsActive), with Mass
+sorted inside each of those segments. A dashboard filter then becomes one
+contiguous slice per matching segment, found with two binary searches on the
+segment's masses, instead of four full-length boolean masks and a frame copy.
+
+"""
+
+import numpy as np
+import pandas as pd
+
+from catalog import ORBIT_GROUPS
+
+SEGMENT_ARRAYS = ("order", "starts", "stops", "seg_decade", "seg_orbit", "seg_active")
+
+
+class Selection:
+    # The rows matching one filter, as (start, stop) slices into the index,
+    # with the decade and orbit group code of each slice's segment.
+    def __init__(self, index, decades, orbits, slices):
+        self.index = index
+        self.decades = decades
+        self.orbits = orbits
+        self.slices = slices
+
+    def __len__(self):
+        return int(sum(stop - start for start, stop in self.slices))
+
+    @property
+    def empty(self):
+        return len(self) == 0
+
+    def column(self, name):
+        # Zero-copy views of `name`, one per matching segment.
+        values = self.index.columns[name]
+        return [values[start:stop] for start, stop in self.slices]
+
+    def by_decade(self, name):
+        # {decade: values} for decades with at least one selected row, in
+        # ascending decade order. Only decades spanning several segments are
+        # concatenated; single-segment decades stay views.
+        groups = {}
+        for decade, part in zip(self.decades, self.column(name)):
+            if len(part):
+                groups.setdefault(decade, []).append(part)
+        return {d: parts[0] if len(parts) == 1 else np.concatenate(parts) for d, parts in groups.items()}
+
+    def rows(self):
+        # Positions of the selected rows in the indexed frame, in index order.
+        positions = np.concatenate([np.arange(start, stop) for start, stop in self.slices] or [np.arange(0)])
+        return self.index.order[positions]
+
+    def to_frame(self):
+        # Materialized copy of the selected rows, for code that needs a DataFrame.
+        return self.index.frame.iloc[self.rows()]
+
+
+class SegmentIndex:
+    def __init__(self, df, columns=("Launch_Decade", "Lifespan_Years", "Mass", "IsActive")):
+        orbit_codes = pd.Categorical(df["Orbit_Group"], categories=ORBIT_GROUPS).codes
+        decade = df["Launch_Decade"].to_numpy()
+        active = df["IsActive"].to_numpy()
+        mass = df["Mass"].to_numpy()
+
+        # Last key is the primary one; NaN masses sort to the end of each segment.
+        order = np.lexsort((mass, active, orbit_codes, decade))
+        self.frame = df
+        self.order = order
+        # Only the columns the callbacks read are stored physically sorted.
+        self.columns = {name: df[name].to_numpy()[order] for name in columns}
+        self.mass = self.columns["Mass"]
+
+        keys = np.stack([decade[order], orbit_codes[order], active[order]]).astype(np.int64)
+        starts = np.flatnonzero(np.r_[True, (keys[:, 1:] != keys[:, :-1]).any(axis=0)]) if len(order) else np.arange(0)
+        self.starts = starts
+        self.stops = np.r_[starts[1:], len(order)].astype(np.int64)
+        self.seg_decade, self.seg_orbit, self.seg_active = keys[:, starts]
+
+    def arrays(self):
+        arrays = {name: getattr(self, name) for name in SEGMENT_ARRAYS}
+        arrays.update({f"sorted-{name}": values for name, values in self.columns.items()})
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, df, arrays):
+        # Rebuilds the index of `df` from arrays() output, e.g. memory-mapped
+        # from disk; nothing is sorted or copied.
+        index = cls.__new__(cls)
+        index.frame = df
+        for name in SEGMENT_ARRAYS:
+            setattr(index, name, arrays[name])
+        index.columns = {name[len("sorted-"):]: values for name, values in arrays.items()
+                         if name.startswith("sorted-")}
+        index.mass = index.columns["Mass"]
+        return index
+
+    def select(self, decade_range, mass_range, orbit_type, status):
+        # Same rows as the inclusive decade/mass masks plus the orbit and status
+        # equality filters in update_graphs.
+        match = (self.seg_decade >= decade_range[0]) & (self.seg_decade <= decade_range[1])
+        if orbit_type != 'All':
+            code = ORBIT_GROUPS.index(orbit_type) if orbit_type in ORBIT_GROUPS else -1
+            match &= self.seg_orbit == code
+        if status != 'All':
+            match &= self.seg_active == (1 if status == 'Active' else 0)
+
+        slices = []
+        decades = []
+        orbits = []
+        for seg in np.flatnonzero(match):
+            start, stop = self.starts[seg], self.stops[seg]
+            masses = self.mass[start:stop]
+            lo = start + np.searchsorted(masses, mass_range[0], side="left")
+            hi = start + np.searchsorted(masses, mass_range[1], side="right")
+            if hi > lo:
+                slices.append((int(lo), int(hi)))
+                decades.append(self.seg_decade[seg])
+                orbits.append(self.seg_orbit[seg])
+        return Selection(self, decades, orbits, slices)
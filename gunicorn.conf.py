@@ -0,0 +1,44 @@
+"""
+Multi-worker deployment: gunicorn -c gunicorn.conf.py dashboard:server
+
+The app is imported once in the parent before the workers are forked, so the
+dataset snapshot is published (or attached) a single time and every worker
+shares its memory-mapped arrays through the page cache.
+
+With SATCAT_LAZY_LOAD=1 the app is not preloaded: forking while the loader
+thread runs is unsafe, so each worker binds at once and loads (or, once one
+of them has published it, attaches) the snapshot in the background.
+
+"""
+
+import gc
+import os
+
+bind = os.environ.get("SATCAT_BIND", "0.0.0.0:8050")
+workers = int(os.environ.get("SATCAT_WORKERS", "4"))
+preload_app = os.environ.get("SATCAT_LAZY_LOAD") != "1"
+
+
+def on_starting(server):
+    # /metrics is answered by whichever worker takes the scrape, so the
+    # workers keep their metrics in one file, emptied for each server run
+    import metrics
+    metrics.use_store(reset=True)
+
+
+def worker_exit(server, worker):
+    # What the worker recorded since its last flush
+    import metrics
+    metrics.flush()
+
+
+def child_exit(server, worker):
+    # Series of a worker that has gone, however it ended
+    import metrics
+    metrics.forget_process(worker.pid)
+
+
+def pre_fork(server, worker):
+    # Keeps the garbage collector from touching, and so copying, every
+    # object the parent created while importing the app.
+    gc.freeze()
@@ -0,0 +1,229 @@
+"""
+Cross-worker memoization of figure builders.
+
+Results are stored as figure JSON in a SQLite file that every worker process
+on the host opens, so a filter combination built by one worker is served from
+disk by all the others. Entries are namespaced by the version of the dataset
+snapshot they were built from; when a new snapshot is loaded the stale
+namespace is purged. Eviction is least-recently-used, bounded
+by both entry count and total payload bytes.
+
+A hit only reads the file. Its use time and the hit/miss counts are kept in
+the process and written in one batch every few seconds (and before an
+eviction, a stats read or a fork), so hits in different workers never queue
+for the SQLite write lock.
+
+LocalCache is the in-process counterpart, for intermediate results that are
+cheap to rebuild but not worth serializing (life tables, row orders).
+
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter, OrderedDict
+
+import plotly.io as pio
+
+import metrics
+
+
+def normalize_filters(decade_range, mass_range, orbit_type, status, as_of=None):
+    # Sliders can send ints or floats for the same position; key on numbers.
+    return (
+        float(decade_range[0]), float(decade_range[1]),
+        float(mass_range[0]), float(mass_range[1]),
+        str(orbit_type), str(status),
+        None if as_of is None else str(as_of),
+    )
+
+
+class FigureCache:
+    def __init__(self, path, max_entries=5000, max_bytes=256 * 1024 * 1024, sync_interval=5.0):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sync_interval = sync_interval
+        self._local = threading.local()
+        # Use times by key and hit/miss counts not yet written to the file
+        self._used = {}
+        self._counts = Counter()
+        self._synced = time.monotonic()
+        # Connections of this process, closed before every fork; a reopened
+        # generation tells threads their connection is gone
+        self._connections = []
+        self._generation = 0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        os.register_at_fork(before=self.close)
+
+    def purge(self, keep_version):
+        # Drops entries built from any other dataset version.
+        self._connect().execute("DELETE FROM entries WHERE version != ?", (keep_version,))
+
+    def close(self):
+        # Writes what is pending and closes this process's connections. Runs
+        # before every fork: SQLite connections must not be carried into a
+        # child (a preloading gunicorn parent opens one at import), as the
+        # child dropping its copy can release the parent's locks. Threads
+        # reconnect on their next call.
+        try:
+            self.sync()
+        except sqlite3.Error:
+            pass  # Only usage counts are lost
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections = []
+            self._generation += 1
+
+    def _connect(self):
+        # One connection per thread and per process
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid() or self._local.generation != self._generation:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, version TEXT, payload TEXT, size INTEGER, last_used REAL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used)")
+            conn.execute("CREATE TABLE IF NOT EXISTS stats (name TEXT PRIMARY KEY, value INTEGER)")
+            with self._lock:
+                self._connections.append(conn)
+                self._local.generation = self._generation
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, key):
+        row = self._connect().execute("SELECT payload FROM entries WHERE key = ?", (key,)).fetchone()
+        with self._lock:
+            if row is None:
+                self._counts["misses"] += 1
+            else:
+                self._counts["hits"] += 1
+                self._used[key] = time.time()
+            due = time.monotonic() - self._synced >= self.sync_interval
+        if due:
+            self.sync()
+        return None if row is None else row[0]
+
+    def sync(self):
+        # Writes the pending use times and counts in one transaction
+        with self._lock:
+            used, self._used = self._used, {}
+            counts, self._counts = self._counts, Counter()
+            self._synced = time.monotonic()
+        if not used and not counts:
+            return
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany("UPDATE entries SET last_used = max(last_used, ?) WHERE key = ?",
+                             [(t, key) for key, t in used.items()])
+            conn.executemany("INSERT INTO stats VALUES (?, ?) ON CONFLICT(name) DO UPDATE SET value = value + ?",
+                             [(name, n, n) for name, n in counts.items()])
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def put(self, key, version, payload):
+        # Pending use times go first, so that eviction sees the current order
+        self.sync()
+        conn = self._connect()
+        conn.execute(
+            "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)",
+            (key, version, payload, len(payload), time.time()),
+        )
+        self._evict(conn)
+
+    def _evict(self, conn):
+        count, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+        evicted = 0
+        for key, size in conn.execute("SELECT key, size FROM entries ORDER BY last_used").fetchall():
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            count -= 1
+            total -= size
+            evicted += 1
+        conn.execute(
+            "INSERT INTO stats VALUES ('evictions', ?) ON CONFLICT(name) DO UPDATE SET value = value + ?",
+            (evicted, evicted),
+        )
+
+    def stats(self):
+        self.sync()
+        conn = self._connect()
+        stats = dict(conn.execute("SELECT name, value FROM stats").fetchall())
+        count, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        return {
+            "hits": stats.get("hits", 0),
+            "misses": stats.get("misses", 0),
+            "evictions": stats.get("evictions", 0),
+            "entries": count,
+            "bytes": total,
+        }
+
+    def memoize(self, name, build, version=1):
+        # Wraps a figure builder taking a dataset snapshot (anything with a
+        # `version`), the four dashboard filters and an optional as-of date
+        # (None for the snapshot's own day). The wrapped builder returns the
+        # figure as a plain dict, which Dash accepts as-is. Bump `version`
+        # when the builder changes what it draws.
+        def cached_build(data, decade_range, mass_range, orbit_type, status, as_of=None):
+            filters = normalize_filters(decade_range, mass_range, orbit_type, status, as_of)
+            key = json.dumps([data.version, name, version, *filters])
+            payload = self.get(key)
+            if payload is None:
+                figure = build(data, decade_range, mass_range, orbit_type, status, as_of)
+                with metrics.stage(name, 'serialize'):
+                    payload = pio.to_json(figure, validate=False)
+                self.put(key, data.version, payload)
+            return json.loads(payload)
+
+        cached_build.__name__ = getattr(build, "__name__", name)
+        return cached_build
+
+    def prewarm(self, data, cached_builds, filter_sets):
+        # Runs memoized builders over the given filter combinations so that
+        # missing entries are built, e.g. the dashboard defaults at startup.
+        for filters in filter_sets:
+            for cached_build in cached_builds:
+                cached_build(data, *filters)
+
+
+class LocalCache:
+    # Small in-process LRU keyed by whatever identifies the inputs of a value
+    # (snapshot version, filters, ...); lookups are counted on `counter` by
+    # result, hit or build.
+    def __init__(self, counter, max_entries=32):
+        self.counter = counter
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, build):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.counter.inc(result="hit")
+                return self._entries[key]
+        value = build()
+        self.counter.inc(result="build")
+        with self._lock:
+            self._entries[key] = value
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,296 @@
+"""
+Minimal Prometheus-style metrics for the dashboard.
+
+Counters, histograms and gauges are rendered in the Prometheus text
+exposition format by render(), which dashboard.py serves at /metrics.
+
+A scrape reaches whichever worker process accepts it, so under gunicorn the
+numbers are kept in a SQLite file that every worker shares (use_store, called
+from gunicorn.conf.py). Each process records into memory and flush() adds
+what it recorded since the last flush to the file: once a second from a
+background thread (start_flushing), at every scrape and before every fork.
+render() then reports the totals of all processes. Counters and histograms
+are summed; gauges keep one series per process, labelled with its pid and
+dropped when it exits (forget_process). Without a store (a single process,
+the export, benchmarks) render() reports the process's own numbers.
+
+"""
+
+import bisect
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (1e3, 1e4, 3e4, 1e5, 3e5, 1e6, 3e6, 1e7)
+ROW_BUCKETS = (0, 10, 100, 1e3, 1e4, 1e5, 1e6, 1e7)
+
+# Seconds between flushes of each process's metrics to the store
+FLUSH_INTERVAL = 1.0
+
+# Shared store, the same default directory as catalog.CACHE_DIR
+STORE_PATH = os.environ.get(
+    "SATCAT_METRICS_PATH", os.path.join(os.environ.get("SATCAT_CACHE_DIR", ".satcat_cache"), "metrics.sqlite")
+)
+
+_registry = []
+_lock = threading.Lock()
+# Path of the shared store, None for per-process metrics; the connection is
+# opened lazily in each process and closed before every fork
+_store = {"path": None, "conn": None, "pid": None, "flusher_pid": None}
+
+log = logging.getLogger(__name__)
+
+
+def _label_text(labels):
+    return ",".join(f'{k}="{v}"' for k, v in sorted(labels.items()))
+
+
+def _number(value):
+    # Whole numbers without a decimal point or exponent, as counts read
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Counter:
+    # `values` holds what this process recorded and has not flushed yet
+    kind = "counter"
+
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help = help_text
+        self.values = {}
+        _registry.append(self)
+
+    def inc(self, amount=1, **labels):
+        key = tuple(sorted(labels.items()))
+        with _lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def samples(self):
+        # (labels, part, value) rows for the store
+        return [(dict(key), "", value) for key, value in self.values.items()]
+
+    def render(self, rows):
+        # Lines for rows of {labels: {part: value}}
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for labels, parts in rows.items():
+            lines.append(f"{self.name}{{{_label_text(dict(labels))}}} {_number(parts[''])}")
+        return lines
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name, help_text, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(buckets)
+        self.values = {}
+        _registry.append(self)
+
+    def observe(self, value, **labels):
+        key = tuple(sorted(labels.items()))
+        with _lock:
+            counts, total = self.values.get(key, ([0] * (len(self.buckets) + 1), 0.0))
+            counts[bisect.bisect_left(self.buckets, value)] += 1
+            self.values[key] = (counts, total + value)
+
+    def samples(self):
+        # One row per bucket (its index as part) and one for the sum
+        rows = []
+        for key, (counts, total) in self.values.items():
+            rows += [(dict(key), str(i), count) for i, count in enumerate(counts) if count]
+            rows.append((dict(key), "sum", total))
+        return rows
+
+    def render(self, rows):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, parts in rows.items():
+            labels = dict(labels)
+            cumulative = 0
+            for i, bound in enumerate(self.buckets + (float("inf"),)):
+                cumulative += int(parts.get(str(i), 0))
+                le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                lines.append(f"{self.name}_bucket{{{_label_text({**labels, 'le': le})}}} {cumulative}")
+            lines.append(f"{self.name}_sum{{{_label_text(labels)}}} {float(parts.get('sum', 0.0))}")
+            lines.append(f"{self.name}_count{{{_label_text(labels)}}} {cumulative}")
+        return lines
+
+
+class Gauge:
+    # Last value per process: recorded with the process's pid as a label
+    kind = "gauge"
+
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help = help_text
+        self.values = {}
+        _registry.append(self)
+
+    def set(self, value, **labels):
+        key = tuple(sorted({**labels, "pid": os.getpid()}.items()))
+        with _lock:
+            self.values[key] = value
+
+    def samples(self):
+        return [(dict(key), "", value) for key, value in self.values.items()]
+
+    def render(self, rows):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge"]
+        for labels, parts in rows.items():
+            lines.append(f"{self.name}{{{_label_text(dict(labels))}}} {_number(parts[''])}")
+        return lines
+
+
+def _rows(samples):
+    # {labels: {part: value}} from (labels, part, value) samples
+    rows = {}
+    for labels, part, value in samples:
+        rows.setdefault(tuple(sorted(labels.items())), {})[part] = value
+    return rows
+
+
+def _connect():
+    # The store's connection for this process; a forked child never uses
+    # its parent's (see _close_before_fork)
+    if _store["conn"] is None or _store["pid"] != os.getpid():
+        os.makedirs(os.path.dirname(_store["path"]) or ".", exist_ok=True)
+        conn = sqlite3.connect(_store["path"], timeout=30, isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        # `pid` is set on the rows of per-process series (gauges)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS samples ("
+            "name TEXT, labels TEXT, part TEXT, value REAL, pid INTEGER, PRIMARY KEY (name, labels, part))"
+        )
+        _store["conn"], _store["pid"] = conn, os.getpid()
+    return _store["conn"]
+
+
+def use_store(path=STORE_PATH, reset=False):
+    # Keeps metrics in the SQLite file at `path`, shared by every process
+    # forked from this one; reset=True starts it empty (at server start).
+    with _lock:
+        _store["path"] = path
+        if reset:
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(path + suffix):
+                    os.remove(path + suffix)
+            _store["conn"] = None
+
+
+def flush():
+    # Adds what this process recorded since the last flush to the store;
+    # gauges replace their previous value. A no-op without a store.
+    with _lock:
+        if _store["path"] is None:
+            return
+        pending = [(metric, sample) for metric in _registry for sample in metric.samples()]
+        if not pending:
+            return
+        try:
+            conn = _connect()
+            conn.execute("BEGIN IMMEDIATE")
+            for metric, (labels, part, value) in pending:
+                update = "excluded.value" if metric.kind == "gauge" else "value + excluded.value"
+                conn.execute(
+                    "INSERT INTO samples VALUES (?, ?, ?, ?, ?) "
+                    f"ON CONFLICT(name, labels, part) DO UPDATE SET value = {update}",
+                    (metric.name, json.dumps(sorted(labels.items())), part, value, labels.get("pid")),
+                )
+            conn.execute("COMMIT")
+        except sqlite3.Error as e:
+            # Kept in memory for the next flush
+            if _store["conn"] is not None and _store["conn"].in_transaction:
+                _store["conn"].execute("ROLLBACK")
+            log.error("Error flushing metrics to %s: %s", _store["path"], e)
+            return
+        for metric in _registry:
+            metric.values = {}
+
+
+def _flush_periodically():
+    while True:
+        time.sleep(FLUSH_INTERVAL)
+        flush()
+
+
+def start_flushing():
+    # Safe to call on every request: starts one flusher thread per process
+    # using a store (threads do not survive a fork)
+    if _store["path"] is None or _store["flusher_pid"] == os.getpid():
+        return
+    with _lock:
+        if _store["flusher_pid"] != os.getpid():
+            _store["flusher_pid"] = os.getpid()
+            threading.Thread(target=_flush_periodically, name="satcat-metrics", daemon=True).start()
+
+
+def forget_process(pid):
+    # Drops the per-process series of `pid` from the store, once that
+    # process has exited (see gunicorn.conf.py)
+    with _lock:
+        if _store["path"] is None:
+            return
+        try:
+            _connect().execute("DELETE FROM samples WHERE pid = ?", (pid,))
+        except sqlite3.Error as e:
+            log.error("Error dropping metrics of process %s from %s: %s", pid, _store["path"], e)
+
+
+def _close_before_fork():
+    # A SQLite connection must not be carried across fork(); whatever the
+    # parent recorded is flushed first, so children do not report it again
+    flush()
+    with _lock:
+        if _store["conn"] is not None and _store["pid"] == os.getpid():
+            _store["conn"].close()
+        _store["conn"] = None
+
+
+os.register_at_fork(before=_close_before_fork)
+
+
+def render(extra_lines=()):
+    flush()
+    with _lock:
+        if _store["path"] is None:
+            samples = {metric.name: metric.samples() for metric in _registry}
+        else:
+            samples = {}
+            for name, labels, part, value in _connect().execute("SELECT name, labels, part, value FROM samples"):
+                samples.setdefault(name, []).append((dict(json.loads(labels)), part, value))
+        lines = [line for metric in _registry for line in metric.render(_rows(samples.get(metric.name, [])))]
+    return "\n".join([*lines, *extra_lines]) + "\n"
+
+
+REQUEST_SECONDS = Histogram("satcat_callback_seconds", "Callback request latency by tab/callback.")
+RESPONSE_BYTES = Histogram("satcat_callback_response_bytes", "Callback response payload size.", SIZE_BUCKETS)
+STAGE_SECONDS = Histogram("satcat_stage_seconds", "Time spent in each stage of a catalog refresh, figure or KPI build.")
+SELECTED_ROWS = Histogram("satcat_selected_rows", "Rows left after the filter stage.", ROW_BUCKETS)
+KDE_DECADES = Counter("satcat_kde_decades_total", "Decades for which a lifespan KDE was computed.")
+ERRORS = Counter("satcat_errors_total", "Errors caught while building figures or KPIs or reloading the catalog.")
+SLOW_PROFILES = Counter("satcat_slow_profiles_total", "cProfile dumps written for slow requests.")
+API_RESPONSES = Counter("satcat_api_responses_total", "Aggregate API responses, by endpoint and status (304 for unchanged).")
+BROWSER_ORDERS = Counter("satcat_browser_orders_total", "Satellite table row orders, by result (hit or build).")
+SURVIVAL_TABLES = Counter("satcat_survival_tables_total", "Cohort life-table lookups, by result (hit or build).")
+STARTUP_SECONDS = Gauge("satcat_startup_seconds", "Seconds from dashboard import to first response and to catalog ready.")
+
+
+@contextmanager
+def stage(component, name):
+    # Times one stage of a build into satcat_stage_seconds{component, stage}.
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - start, component=component, stage=name)
+
+
+def error(component, name, e):
+    ERRORS.inc(component=component, stage=name)
+    log.error("Error in %s %s: %s", component, name, e)
@@ -0,0 +1,60 @@
+"""
+Kaplan-Meier survival curves for launch cohorts.
+
+An active satellite has not been decommissioned yet, so its age is a lower
+bound on its lifespan (right-censored), not the lifespan itself. Survival
+curves are estimated with the Kaplan-Meier product-limit estimator on a
+quarterly lifespan grid, with Greenwood confidence bands on the log(-log)
+scale.
+
+Everything is computed from life tables: per cohort and lifespan bin, the
+number of rows decommissioned and the number leaving the risk set either way.
+Tables of several cohorts add up to the table of their union, so the tables
+of every (Launch_Decade, Orbit_Group) cohort are built in one bincount pass
+over the rows and cached; a filter change that only picks other cohorts sums
+their tables and reruns the cumulative product, for all curves at once
+(the dashboard keeps them in a memo.LocalCache).
+
+"""
+
+import numpy as np
+
+STEP_YEARS = 0.25
+# Lifespans are bounded to [0, 100] years in catalog.derive_columns
+MAX_YEARS = 100
+N_BINS = int(round(MAX_YEARS / STEP_YEARS)) + 1
+Z_95 = 1.959963984540054
+
+
+def life_tables(durations, observed, cohorts, n_cohorts, step=STEP_YEARS, n_bins=N_BINS):
+    # (events, exits), each (n_cohorts, n_bins): the rows of each cohort
+    # decommissioned, and the rows leaving the risk set (decommissioned or
+    # censored), with a lifespan in [j * step, (j + 1) * step).
+    bins = np.clip((np.asarray(durations, dtype=np.float64) / step).astype(np.intp), 0, n_bins - 1)
+    flat = np.asarray(cohorts, dtype=np.intp) * n_bins + bins
+    size = n_cohorts * n_bins
+    exits = np.bincount(flat, minlength=size).reshape(n_cohorts, n_bins)
+    events = np.bincount(flat[np.asarray(observed, dtype=bool)], minlength=size).reshape(n_cohorts, n_bins)
+    return events.astype(np.int32), exits.astype(np.int32)
+
+
+def kaplan_meier(events, exits, z=Z_95):
+    # Survival at the end of each bin and its confidence band, one row per
+    # life table: S(t_j) = prod over i <= j of (1 - d_i / n_i), n_i being the
+    # rows still at risk when bin i starts. NaN once nobody is left at risk.
+    # Returns (survival, lower, upper, at_risk).
+    events = np.atleast_2d(events).astype(np.float64)
+    exits = np.atleast_2d(exits).astype(np.float64)
+    at_risk = exits.sum(axis=1, keepdims=True) - np.cumsum(exits, axis=1) + exits
+    with np.errstate(divide="ignore", invalid="ignore"):
+        hazard = np.where(at_risk > 0, events / at_risk, 0.0)
+        survival = np.cumprod(1 - hazard, axis=1)
+        # Greenwood: Var[log S] = sum of d / (n (n - d)); the delta method
+        # turns it into the standard error of log(-log S).
+        greenwood = np.cumsum(np.where(at_risk > events, events / (at_risk * (at_risk - events)), 0.0), axis=1)
+        se = np.sqrt(greenwood) / np.abs(np.log(survival))
+        lower = np.where((survival > 0) & (survival < 1), survival ** np.exp(z * se), survival)
+        upper = np.where((survival > 0) & (survival < 1), survival ** np.exp(-z * se), survival)
+    gone = at_risk == 0
+    return (np.where(gone, np.nan, survival), np.where(gone, np.nan, lower),
+            np.where(gone, np.nan, upper), at_risk)
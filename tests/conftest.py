@@ -0,0 +1,66 @@
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# The project modules read these at import: anything they write goes to a
+# throwaway directory, and importing the dashboard loads no catalog
+CACHE = tempfile.TemporaryDirectory(prefix="satcat-tests-")
+os.environ["SATCAT_CACHE_DIR"] = CACHE.name
+os.environ["SATCAT_LAZY_LOAD"] = "1"
+os.environ["SATCAT_WATCH_INTERVAL"] = "0"
+
+from benchmarks.synthetic import write_catalog  # noqa: E402
+from catalog import load_catalog  # noqa: E402
+from dataset import Dataset  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def catalog_path(tmp_path_factory):
+    # A small synthetic satcat.tsv
+    return write_catalog(5_000, str(tmp_path_factory.mktemp("catalog") / "satcat.tsv"))
+
+
+@pytest.fixture(scope="session")
+def frame(catalog_path, tmp_path_factory):
+    # Processed frame of the catalog, through the column cache as the
+    # dashboard loads it
+    return load_catalog(catalog_path, str(tmp_path_factory.mktemp("cache")))
+
+
+@pytest.fixture(scope="session")
+def data(frame):
+    return Dataset(frame)
+
+
+@pytest.fixture(scope="session")
+def dashboard(catalog_path):
+    # The dashboard module, serving the same catalog as `data`: it loads
+    # ./satcat.tsv in the background from import on
+    cwd = os.getcwd()
+    os.chdir(os.path.dirname(catalog_path))
+    try:
+        import dashboard
+        assert dashboard.live.ready.wait(60)
+    finally:
+        os.chdir(cwd)
+    return dashboard
+
+
+def assert_same_summary(got, want):
+    # Two CubeSlices hold the same non-empty (decade, orbit, status) cells;
+    # decades without rows may be left out by either
+    def table(summary):
+        keep = summary.counts.sum(axis=(1, 2)) > 0
+        return summary.decades[keep], summary.counts[keep], summary.lifespan_sum[keep], summary.mass_sum[keep]
+
+    got, want = table(got), table(want)
+    np.testing.assert_array_equal(got[0], want[0])
+    np.testing.assert_array_equal(got[1], want[1])
+    np.testing.assert_allclose(got[2], want[2], rtol=1e-6, atol=1e-6)
+    np.testing.assert_allclose(got[3], want[3], rtol=1e-6, atol=1e-6)
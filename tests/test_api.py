@@ -0,0 +1,56 @@
+import pandas as pd
+import pytest
+
+FULL_RANGE = "decades=1950-2020&mass=0-10000"
+
+
+def aggregates(dashboard, query):
+    response = dashboard.app.server.test_client().get(f"/api/aggregates?{query}")
+    return response.status_code, response.get_json()
+
+
+@pytest.mark.parametrize("year", [1990, 2005, 2019])
+def test_as_of_matches_the_slider(dashboard, year):
+    status, doc = aggregates(dashboard, f"{FULL_RANGE}&as_of={year}-12-31")
+    assert status == 200
+    assert doc["filters"]["as_of"] == dashboard.as_of_date(year)
+    kpis = dashboard.update_kpis([1950, 2020], [0, 10000], 'All', 'All', year, None)
+    assert [str(value) for value in doc["kpis"].values()] == list(kpis)
+
+
+def test_as_of_counts_the_whole_day(dashboard):
+    # A launch late in the day counts from that day on
+    df = dashboard.live.current.df
+    in_range = df[df["Mass"].between(0, 10000) & (df["Launch_Year"] < 2020)]
+    launch = in_range["LDate"].loc[(in_range["LDate"] - in_range["LDate"].dt.normalize()).idxmax()]
+    assert launch != launch.normalize()
+    status, doc = aggregates(dashboard, f"{FULL_RANGE}&as_of={launch.date()}")
+    assert status == 200
+    launched = df["Mass"].between(0, 10000) & (df["LDate"] < launch.normalize() + pd.Timedelta(days=1))
+    assert doc["kpis"]["total_satellites"] == int(launched.sum())
+
+
+def slider(node):
+    # The as-of slider in a /_dash-layout document
+    if isinstance(node, dict):
+        if node.get("props", {}).get("id") == "as-of-slider":
+            return node["props"]
+        node = list(node.values())
+    if isinstance(node, list):
+        for child in node:
+            found = slider(child)
+            if found is not None:
+                return found
+    return None
+
+
+def test_slider_moves_on_at_new_year(dashboard, monkeypatch):
+    # A server started in one year and still running in the next
+    year = dashboard.current_year()
+    assert dashboard.as_of_date(year) is None
+    monkeypatch.setattr(dashboard, "current_year", lambda: year + 1)
+    props = slider(dashboard.app.server.test_client().get("/_dash-layout").get_json())
+    assert props["max"] == props["value"] == year + 1
+    assert props["marks"][str(year + 1)]["label"] == "Now"
+    assert dashboard.as_of_date(year) == f"{year}-12-31T23:59:59"
+    assert dashboard.as_of_date(year + 1) is None
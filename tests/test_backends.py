@@ -0,0 +1,34 @@
+import itertools
+
+import pandas as pd
+import pytest
+
+from backends import PandasBackend, make_backend
+from conftest import assert_same_summary
+
+GRID = list(itertools.product(
+    ([1950, 2020], [1980, 2020], [2010, 2010]),
+    ([0, 10000], [150, 4250], [100, 100]),
+    ('All', 'GEO', 'Lunar'),
+    ('All', 'Active', 'Decommissioned'),
+    (None, '1990-12-31T23:59:59', '2005-06-30T23:59:59'),
+))
+
+
+@pytest.fixture(scope="module", params=["duckdb", "polars"])
+def backend(request):
+    # The optional engines, checked wherever they are installed
+    pytest.importorskip(request.param)
+    return make_backend(request.param)
+
+
+@pytest.mark.parametrize("filters", GRID)
+def test_summary_matches_pandas(backend, data, filters):
+    got = backend.summarize(data, *filters)
+    want = PandasBackend().summarize(data, *filters)
+    assert_same_summary(got, want)
+    assert got.kpis() == want.kpis()
+    status, expected = got.status_counts(), want.status_counts()
+    pd.testing.assert_frame_equal(status.reindex(expected.index, fill_value=0), expected, check_dtype=False)
+    orbits, expected = got.orbit_counts(), want.orbit_counts()
+    pd.testing.assert_frame_equal(orbits.reset_index(drop=True), expected.reset_index(drop=True), check_dtype=False)
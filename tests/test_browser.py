@@ -0,0 +1,161 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import metrics
+from backends import selected_rows
+from browser import COLUMNS, DIRECT_SORT_SHARE, RowBrowser, filter_mask
+from catalog import ORBIT_GROUPS
+
+FULL = ([1950, 2020], [0, 10000], 'All', 'All')
+# Few enough rows to be sorted directly rather than through a permutation
+SMALL = ([2010, 2010], [0, 1000], 'LEO', 'Decommissioned')
+AS_OF = "2005-12-31T23:59:59"
+
+
+@pytest.fixture
+def browser():
+    return RowBrowser(metrics.BROWSER_ORDERS)
+
+
+def reference(data, filters):
+    # The rows behind the filters, in the order of the filter index, with
+    # the table's columns as of the date, if any
+    rows = selected_rows(data, *filters[:4], filters[4] if len(filters) > 4 else None)
+    ddate = rows["DDate"]
+    if len(filters) > 4:
+        ddate = ddate.where(ddate <= pd.Timestamp(filters[4]))
+    return pd.DataFrame({
+        "jcat": rows["JCAT"].str.decode("utf-8"),
+        "name": rows["Name"].str.decode("utf-8"),
+        "row": rows.index,
+        "launched": rows["LDate"],
+        "decommissioned": ddate,
+        "decade": rows["Launch_Decade"],
+        "orbit": pd.Categorical(rows["Orbit_Group"], categories=ORBIT_GROUPS),
+        "status": rows["IsActive"].astype(bool),
+        "mass": rows["Mass"],
+        "lifespan": rows["Lifespan_Years"],
+    }, index=rows.index)
+
+
+def positions(data, rows):
+    return data.df.index.get_indexer(rows.index)
+
+
+@pytest.mark.parametrize("direction", ["asc", "desc"])
+@pytest.mark.parametrize("column", [column for column, _, _ in COLUMNS])
+@pytest.mark.parametrize("filters", [FULL, SMALL, (*FULL, AS_OF)], ids=["permutation", "direct", "as-of"])
+def test_sorted_rows_match_pandas(data, browser, filters, column, direction):
+    # Ties are broken by position in the frame
+    expected = reference(data, filters).sort_index(kind="stable").sort_values(column, kind="stable")
+    if direction == "desc":
+        # The ascending order reversed: ties and missing values come first
+        expected = expected.iloc[::-1]
+    sort_by = [{"column_id": column, "direction": direction}]
+    np.testing.assert_array_equal(browser.ordered_rows(data, filters, sort_by), positions(data, expected))
+
+
+def test_selections_take_both_sorting_paths(data):
+    assert len(reference(data, FULL)) >= len(data.df) * DIRECT_SORT_SHARE
+    assert 0 < len(reference(data, SMALL)) < len(data.df) * DIRECT_SORT_SHARE
+
+
+def test_pages_are_slices_of_the_order(data, browser):
+    sort_by = [{"column_id": "mass", "direction": "desc"}]
+    expected = reference(data, FULL).sort_index(kind="stable").sort_values("mass", kind="stable").iloc[::-1]
+    size = 25
+    last = (len(expected) - 1) // size
+    for page in (0, 1, last // 2, last):
+        records, total = browser.page(data, FULL, page, size, sort_by)
+        assert total == len(expected)
+        rows = expected.iloc[page * size:(page + 1) * size]
+        assert [record["row"] for record in records] == rows.index.tolist()
+        assert [record["jcat"] for record in records] == rows["jcat"].tolist()
+        assert [record["mass"] for record in records] == np.round(rows["mass"].astype(np.float64), 1).tolist()
+    assert browser.page(data, FULL, last + 1, size, sort_by) == ([], len(expected))
+
+
+FILTERS = [
+    ("{decade} eq 1990", lambda f: f["decade"] == 1990),
+    ("{decade} = 1990", lambda f: f["decade"] == 1990),
+    ("{decade} ne 1990", lambda f: f["decade"] != 1990),
+    ("{mass} lt 1000", lambda f: f["mass"] < 1000),
+    ("{mass} <= 1000", lambda f: f["mass"] <= 1000),
+    ("{mass} gt 1000", lambda f: f["mass"] > 1000),
+    ("{mass} ge 1000", lambda f: f["mass"] >= 1000),
+    ("{lifespan} > 10.5", lambda f: f["lifespan"] > 10.5),
+    ('{orbit} eq "leo"', lambda f: f["orbit"] == "LEO"),
+    ("{orbit} ne GEO", lambda f: f["orbit"] != "GEO"),
+    ("{orbit} contains eo", lambda f: f["orbit"].isin(["GEO", "HEO", "LEO", "MEO"])),
+    ("{status} eq Active", lambda f: f["status"]),
+    ("{name} contains 12", lambda f: f["name"].str.contains("12", regex=False)),
+    ("{name} icontains sat 1", lambda f: f["name"].str.startswith("SAT 1")),
+    ("{jcat} ne s000006", lambda f: f["jcat"] != "S000006"),
+    ("{launched} datestartswith 2005", lambda f: f["launched"].dt.year == 2005),
+    ("{launched} lt 2005", lambda f: f["launched"] < "2005-01-01"),
+    ("{launched} le 2005-03", lambda f: f["launched"] < "2005-04-01"),
+    ("{launched} gt 2005-03-14", lambda f: f["launched"] >= "2005-03-15"),
+    ("{decommissioned} ge 2010", lambda f: f["decommissioned"] >= "2010-01-01"),
+    ("{decommissioned} ne 2010", lambda f: f["decommissioned"].dt.year != 2010),
+    ("{orbit} eq LEO && {mass} ge 1000", lambda f: (f["orbit"] == "LEO") & (f["mass"] >= 1000)),
+]
+
+
+@pytest.mark.parametrize("query, keep", FILTERS, ids=[query for query, _ in FILTERS])
+def test_filters_match_pandas(data, browser, query, keep):
+    expected = reference(data, FULL)
+    expected = expected[keep(expected).to_numpy(dtype=bool)]
+    assert 0 < len(expected) < len(data.df)
+    np.testing.assert_array_equal(browser.ordered_rows(data, FULL, filter_query=query), positions(data, expected))
+
+
+@pytest.mark.parametrize("query", ["{mass} ge heavy", "{launched} lt someday", "{mass} contains 5"])
+def test_unusable_filters_match_nothing(data, browser, query):
+    assert len(browser.ordered_rows(data, FULL, filter_query=query)) == 0
+
+
+def test_unknown_filter_parts_are_ignored(data, browser):
+    everything = browser.ordered_rows(data, FULL)
+    for query in ["{cospar} eq 1", "{mass} between 1 2", "mass ge 1000"]:
+        np.testing.assert_array_equal(browser.ordered_rows(data, FULL, filter_query=query), everything)
+
+
+@pytest.mark.parametrize("op", ["eq", "ne", "lt", "le", "gt", "ge"])
+def test_missing_masses(op):
+    # NaN compares false, except for "ne", as in pandas
+    masses = np.array([np.nan, 500, 1000, 1500], dtype=np.float32)
+    compare = {"eq": "__eq__", "ne": "__ne__", "lt": "__lt__", "le": "__le__", "gt": "__gt__", "ge": "__ge__"}[op]
+    expected = getattr(pd.Series(masses), compare)(1000).to_numpy()
+    np.testing.assert_array_equal(filter_mask(masses, "mass", op, "1000"), expected)
+
+
+@pytest.mark.parametrize("op, value, expected", [
+    ("contains", "rsted", [True, False, False]),
+    ("contains", "SAT", [False, False, True]),
+    ("eq", "sat 1", [False, False, True]),
+    ("eq", "Ørsted", [True, False, False]),
+    # Only ASCII letters are case-folded
+    ("eq", "ørsted", [False, False, False]),
+    ("ne", "sat 1", [True, True, False]),
+])
+def test_names(op, value, expected):
+    # A missing name is only kept by "ne"
+    names = np.array(["Ørsted".encode("utf-8"), b"", b"SAT 1"])
+    assert filter_mask(names, "name", op, value).tolist() == expected
+
+
+@pytest.mark.parametrize("status", ["All", "Active", "Decommissioned"])
+def test_as_of_selects_the_rows_of_that_date(data, browser, status):
+    filters = ([1950, 2020], [0, 10000], 'All', status, AS_OF)
+    expected = selected_rows(data, *filters)
+    assert len(expected) > 0
+    np.testing.assert_array_equal(browser.ordered_rows(data, filters), positions(data, expected))
+
+    records, total = browser.page(data, filters, 0, 1000)
+    assert total == len(expected)
+    assert all(record["launched"] <= AS_OF[:10] for record in records)
+    assert all(record["decommissioned"] <= AS_OF[:10] for record in records)
+    assert [record["status"] == "Active" for record in records] == expected["IsActive"].tolist()[:1000]
+    lifespans = np.round(expected["Lifespan_Years"].astype(np.float64), 2).tolist()[:1000]
+    assert [record["lifespan"] for record in records] == lifespans
@@ -0,0 +1,81 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import generate
+from catalog import TEXT_COLUMNS, ingest, load_catalog, preprocess, read_cache, read_catalog, refresh_catalog
+
+
+def write_raw(raw, path):
+    raw.to_csv(path, sep="\t", index=False)
+    return str(path)
+
+
+def memory_mapped(values):
+    # Whether an array is a view of a memory-mapped file
+    while values is not None:
+        if isinstance(values, np.memmap):
+            return True
+        values = getattr(values, "base", None)
+    return False
+
+
+def assert_same_frame(got, want):
+    # Lifespans run up to "now", which differs between two loads, and date
+    # units may differ between the cache and a fresh parse. Memory-mapped
+    # columns are compared as plain arrays.
+    def comparable(df):
+        df = df.drop(columns="Lifespan_Years")
+        df = df.astype({c: "datetime64[ns]" for c in df.columns if df[c].dtype.kind == "M"})
+        return pd.DataFrame({c: df[c].array if df[c].dtype == "category" else np.array(df[c]) for c in df.columns},
+                            index=np.array(df.index))
+
+    got, want = comparable(got), comparable(want)
+    pd.testing.assert_frame_equal(got, want[list(got.columns)], check_categorical=False, check_dtype=False,
+                                  check_index_type=False)
+
+
+def test_text_columns_are_memory_mapped_bytes(tmp_path):
+    raw = generate(3_000, seed=1)
+    # Non-ASCII, missing and, after the first chunk, wider names, on payloads
+    raw.loc[[10, 11, 2_500], ["Type", "LDate", "DDate"]] = ["P", "2000 Jan 1", "-"]
+    raw.loc[10, "Name"] = "Sputnik-Ü"
+    raw.loc[11, "Name"] = None
+    raw.loc[2_500, "Name"] = "A MUCH LONGER NAME THAN ANY IN THE FIRST CHUNK"
+    path = write_raw(raw, tmp_path / "satcat.tsv")
+    ingest(path, str(tmp_path / "cache"), chunk_rows=500)
+
+    df = read_cache(str(tmp_path / "cache"))
+    assert_same_frame(df, preprocess(read_catalog(path)))
+    with open(tmp_path / "cache" / "meta.json") as f:
+        meta = json.load(f)
+    for entry in meta["columns"]:
+        if entry["name"] in TEXT_COLUMNS:
+            assert "categories" not in entry
+            values = df[entry["name"]].to_numpy()
+            assert values.dtype.kind == "S"
+            assert memory_mapped(values)
+    names = df["Name"].to_numpy()
+    assert names.dtype.itemsize == len("A MUCH LONGER NAME THAN ANY IN THE FIRST CHUNK")
+    assert names[df.index.get_loc(10)].decode("utf-8") == "Sputnik-Ü"
+    assert names[df.index.get_loc(11)] == b""
+
+
+def test_refresh_matches_full_load(tmp_path):
+    raw = generate(3_000, seed=2)
+    path = write_raw(raw, tmp_path / "satcat.tsv")
+    old = load_catalog(path, str(tmp_path / "cache"))
+
+    changed = pd.concat([raw, generate(200, seed=3).assign(**{"#JCAT": lambda d: "N" + d["#JCAT"]})],
+                        ignore_index=True)
+    changed.loc[5, "Name"] = "RENAMED TO SOMETHING WIDER THAN BEFORE"
+    changed.loc[6, "Mass"] = "123.4"
+    changed = changed.drop(index=[7, 8]).reset_index(drop=True)
+    write_raw(changed, path)
+
+    got = refresh_catalog(old, path, str(tmp_path / "cache"), chunk_rows=700)
+    want = load_catalog(path, str(tmp_path / "fresh"))
+    assert got.attrs["dataset_version"] == want.attrs["dataset_version"]
+    assert_same_frame(got, want)
+    assert got["Name"].dtype.kind == "S"
@@ -0,0 +1,58 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from backends import CubeBackend, PandasBackend
+from conftest import assert_same_summary
+
+GRID = list(itertools.product(
+    ([1950, 2020], [1980, 2020], [2010, 2010], [1990, 1960]),
+    ([0, 10000], [0, 5000], [500, 2000], [100, 100], [9900, 10000]),
+    ('All', 'LEO', 'GEO', 'Other'),
+    ('All', 'Active', 'Decommissioned'),
+))
+
+
+def mask(df, decade_range, mass_range, orbit_type, status):
+    # The boolean-mask filter the cube replaces
+    keep = df["Launch_Decade"].between(*decade_range) & df["Mass"].between(*mass_range)
+    if orbit_type != 'All':
+        keep &= df["Orbit_Group"] == orbit_type
+    if status != 'All':
+        keep &= df["IsActive"] == (status == 'Active')
+    return df[keep]
+
+
+@pytest.mark.parametrize("filters", GRID)
+def test_select_matches_reference(data, filters):
+    summary = data.cube.select(*filters)
+    assert summary is not None
+    assert_same_summary(summary, PandasBackend().summarize(data, *filters))
+
+
+@pytest.mark.parametrize("filters", GRID[::7])
+def test_kpis_and_bars_match_masks(data, filters):
+    rows = mask(data.df, *filters)
+    summary = data.cube.select(*filters)
+    total, active, avg_lifespan, avg_mass = summary.kpis()
+    assert int(total) == len(rows)
+    assert int(active) == int(rows["IsActive"].sum())
+    if len(rows):
+        assert float(avg_lifespan) == pytest.approx(round(float(rows["Lifespan_Years"].mean()), 1), abs=0.11)
+        assert float(avg_mass) == pytest.approx(round(float(rows["Mass"].mean()), 1), abs=0.11)
+    expected = rows.groupby(["Launch_Decade", "IsActive"]).size().unstack(fill_value=0)
+    expected = expected.reindex(columns=[True, False], fill_value=0)
+    got = summary.status_counts().reindex(expected.index, fill_value=0)
+    for active_flag in (True, False):
+        np.testing.assert_array_equal(got[active_flag].to_numpy(), expected[active_flag].to_numpy())
+    decommissioned = rows[~rows["IsActive"]].groupby(["Launch_Decade", "Orbit_Group"], observed=True).size()
+    orbits = summary.orbit_counts().set_index(["Launch_Decade", "Orbit_Group"])["count"]
+    assert orbits.to_dict() == decommissioned[decommissioned > 0].to_dict()
+
+
+@pytest.mark.parametrize("mass_range", [[150, 4250], [0.5, 10000], [-100, 20000]])
+def test_off_grid_masses_fall_back(data, mass_range):
+    filters = ([1950, 2020], mass_range, 'All', 'All')
+    assert data.cube.select(*filters) is None
+    assert_same_summary(CubeBackend().summarize(data, *filters), PandasBackend().summarize(data, *filters))
@@ -0,0 +1,16 @@
+from benchmarks.synthetic import write_catalog
+from dataset import LiveDataset
+
+
+def test_lazy_start_does_not_touch_the_catalog(tmp_path):
+    # The file need not exist until the loader thread runs
+    path = str(tmp_path / "satcat.tsv")
+    live = LiveDataset(path, str(tmp_path / "cache"), interval=0, lazy=True)
+    assert live.current is None
+    assert not live.reload_if_changed()
+
+    write_catalog(1_000, path)
+    live.start_loading()
+    assert live.ready.wait(60)
+    assert live.current is not None
+    assert not live.reload_if_changed()
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import generate
+from catalog import parse_vague_date, parse_vague_dates
+
+# One or more strings of every precision class and marker, and malformed values
+EDGE_CASES = [
+    "2005 Mar 14 1230", "2005 Mar 14 0000", "1957 Oct  4 1928", "2005 Mar 14", "2005 Mar  4", "2005 Mar",
+    "2005", "1960s", "1960s?", "1965 Jul?", "1965 Jul 3?", "2005?", "2005 Mar 14 1230?",
+    "?", " ? ", "", "   ", "-", "2005 Foo", "2005 Mar 32", "2005 Mar 14 2561", "05 Mar 14", "March 2005",
+    "2005-03-14", "2005 Mar 14 1230 extra", "s", "?s", " 2005 Mar 14 ", "2005 mar 14", "2005 MAR",
+    None, np.nan,
+]
+
+
+def assert_same_dates(col):
+    expected = col.apply(parse_vague_date)
+    dates, precision = parse_vague_dates(col)
+    assert len(dates) == len(col)
+    assert dates.index.equals(col.index)
+    for value, got, want in zip(col, dates, expected):
+        assert (pd.isna(got) and pd.isna(want)) or got == want, f"{value!r}: {got} != {want}"
+    # Rows that parse are given their precision class; the rest are unknown
+    # (or missing for a missing value)
+    parsed = ~expected.isna().to_numpy()
+    assert precision[parsed].isin(["minute", "day", "month", "year", "decade"]).all()
+    assert (precision[~parsed & col.notna().to_numpy()] == "unknown").all()
+
+
+@pytest.mark.parametrize("value", EDGE_CASES)
+def test_edge_case(value):
+    assert_same_dates(pd.Series([value], dtype=object))
+
+
+def test_edge_cases_together():
+    assert_same_dates(pd.Series(EDGE_CASES, dtype=object, index=np.arange(len(EDGE_CASES)) * 3))
+
+
+def test_precision_classes():
+    col = pd.Series(["2005 Mar 14 1230", "2005 Mar 14", "2005 Mar", "2005", "1960s", "?"])
+    _, precision = parse_vague_dates(col)
+    assert precision.tolist() == ["minute", "day", "month", "year", "decade", "unknown"]
+
+
+@pytest.mark.parametrize("column", ["LDate", "DDate"])
+def test_synthetic_column(column):
+    assert_same_dates(generate(5_000, seed=1)[column].astype(object))
+
+
+def test_str_dtype_column():
+    # As read_catalog returns it
+    assert_same_dates(pd.Series(EDGE_CASES[:-2], dtype="str"))
@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from backends import CubeBackend, PandasBackend
+from conftest import assert_same_summary
+from cube import mass_bins
+from events import frame_as_of
+
+# Before the first launch, inside the catalog's range, after the last decay,
+# and past the 2**33 s span of an event index cell (about 2172)
+AS_OF_DATES = ["1900-06-01", "1956-12-31", "1975-07-14T12:00:00", "2005-12-31T23:59:59", "2024-01-01",
+               "2100-01-01", "2172-06-01", "2190-01-01", "2500-01-01"]
+
+
+@pytest.mark.parametrize("as_of", AS_OF_DATES)
+def test_at_matches_direct_mask(data, as_of):
+    # Launched and decommissioned counts of every row with a usable mass
+    df = data.df[mass_bins(data.df["Mass"].to_numpy())[0]]
+    t = pd.Timestamp(as_of)
+    launched = df["LDate"] <= t
+    decayed = launched & (df["DDate"] <= t)
+    counts = data.events.at(as_of).counts
+    assert counts.sum() == launched.sum()
+    assert counts[..., 0].sum() == decayed.sum()
+
+
+@pytest.mark.parametrize("as_of", AS_OF_DATES)
+@pytest.mark.parametrize("filters", [
+    ([1950, 2020], [0, 10000], 'All', 'All'),
+    ([1980, 2010], [500, 2000], 'LEO', 'Active'),
+    ([1960, 2020], [0, 5000], 'All', 'Decommissioned'),
+])
+def test_cube_as_of_matches_reference(data, filters, as_of):
+    assert_same_summary(CubeBackend().summarize(data, *filters, as_of),
+                        PandasBackend().summarize(data, *filters, as_of))
+
+
+def test_frame_as_of_after_last_decay(data):
+    # Far-future dates keep every row, with lifespans running up to the date
+    rows = frame_as_of(data.df, "2500-01-01")
+    assert len(rows) == len(data.df)
+    assert rows["IsActive"].sum() == data.df["DDate"].isna().sum()
+    assert np.isfinite(rows["Lifespan_Years"]).all()
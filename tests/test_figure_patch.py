@@ -0,0 +1,45 @@
+import copy
+import json
+
+import plotly.io as pio
+import pytest
+
+
+def apply_patch(figure, patch):
+    # What the browser does with a Patch sent for the figure it shows
+    figure = copy.deepcopy(figure)
+    for operation in patch.to_plotly_json()["operations"]:
+        assert operation["operation"] == "Assign"
+        *path, key = operation["location"]
+        target = figure
+        for step in path:
+            target = target[step]
+        target[key] = operation["params"]["value"]
+    return figure
+
+
+@pytest.mark.parametrize("mass_before, mass_after", [([0, 5000], [500, 3000]), ([0, 5000], [0, 4000])])
+@pytest.mark.parametrize("tab", ['tab-1', 'tab-2', 'tab-3', 'tab-4', 'tab-5', 'tab-6'])
+def test_patch_matches_rebuild(dashboard, tab, mass_before, mass_after):
+    # A mass slider move: the graph shows the cached figure of the old range
+    # and receives a Patch built from the new one
+    data = dashboard.live.current
+    _, cached_build = dashboard.TAB_FIGURES[tab]
+    shown = cached_build(data, [1950, 2020], mass_before, 'All', 'All')
+    update = cached_build(data, [1950, 2020], mass_after, 'All', 'All')
+    assert dashboard.figure_structure(update) == dashboard.figure_structure(shown)
+
+    build = getattr(dashboard, cached_build.__name__)
+    rebuilt = json.loads(pio.to_json(build(data, [1950, 2020], mass_after, 'All', 'All'), validate=False))
+    assert rebuilt != shown
+    assert apply_patch(shown, dashboard.figure_patch(update)) == rebuilt
+
+
+def test_new_structure_is_not_patched(dashboard):
+    # Fewer decades with enough rows for a curve: whole figure
+    data = dashboard.live.current
+    _, cached_build = dashboard.TAB_FIGURES['tab-1']
+    shown = cached_build(data, [1950, 2020], [0, 10000], 'All', 'All')
+    update = cached_build(data, [1950, 2020], [1000, 8000], 'All', 'All')
+    assert len(update["data"]) < len(shown["data"])
+    assert dashboard.figure_structure(update) != dashboard.figure_structure(shown)
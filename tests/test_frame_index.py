@@ -0,0 +1,47 @@
+import itertools
+
+import numpy as np
+import pytest
+
+GRID = list(itertools.product(
+    ([1950, 2020], [1980, 2020], [2010, 2010], [1990, 1960]),
+    ([0, 10000], [0, 5000], [150, 4250], [0.5, 99.5], [-100, 20000], [100, 100]),
+    ('All', 'LEO', 'MEO', 'Other', 'Lunar'),
+    ('All', 'Active', 'Decommissioned'),
+))
+
+
+def mask_rows(df, decade_range, mass_range, orbit_type, status):
+    # Frame positions the four boolean masks of the original filter select
+    keep = df["Launch_Decade"].between(*decade_range) & df["Mass"].between(*mass_range)
+    if orbit_type != 'All':
+        keep &= df["Orbit_Group"] == orbit_type
+    if status != 'All':
+        keep &= df["IsActive"] == (status == 'Active')
+    return np.flatnonzero(keep.to_numpy())
+
+
+@pytest.mark.parametrize("filters", GRID)
+def test_select_matches_masks(data, filters):
+    selection = data.frame_index.select(*filters)
+    rows = selection.rows()
+    np.testing.assert_array_equal(np.sort(rows), mask_rows(data.df, *filters))
+    assert len(selection) == len(rows)
+    # The sorted column views hold the selected rows' values, in index order
+    lifespans = np.concatenate(selection.column("Lifespan_Years") or [np.empty(0, dtype=np.float32)])
+    np.testing.assert_array_equal(lifespans, data.df["Lifespan_Years"].to_numpy()[rows])
+
+
+def test_column_views_are_zero_copy(data):
+    selection = data.frame_index.select([1950, 2020], [0, 5000], 'All', 'All')
+    stored = data.frame_index.columns["Lifespan_Years"]
+    parts = selection.column("Lifespan_Years")
+    assert parts
+    assert all(part.base is stored or np.shares_memory(part, stored) for part in parts)
+
+
+def test_to_frame_matches_masks(data):
+    filters = ([1980, 2020], [0, 5000], 'LEO', 'Active')
+    frame = data.frame_index.select(*filters).to_frame()
+    expected = data.df.iloc[mask_rows(data.df, *filters)]
+    assert frame.sort_index().equals(expected.sort_index())
@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+from scipy.stats import gaussian_kde
+
+import kde
+from kde import ridge_kde
+
+BW = 0.5
+X_GRID = np.linspace(0, 60, 501)
+# Largest difference from gaussian_kde, relative to the curve's peak: the
+# direct path evaluates the same sum, the binned path approximates it
+DIRECT_TOLERANCE = 1e-10
+BINNED_TOLERANCE = 1e-3
+
+
+def reference(values):
+    return gaussian_kde(values, bw_method=BW)(X_GRID)
+
+
+def spy_direct(monkeypatch):
+    # Sizes of the groups evaluated directly rather than binned
+    sizes = []
+    direct = kde._direct
+
+    def spy(values, x_grid, sigma):
+        sizes.append(len(values))
+        return direct(values, x_grid, sigma)
+
+    monkeypatch.setattr(kde, "_direct", spy)
+    return sizes
+
+
+def assert_close(got, want, tolerance):
+    assert np.abs(got - want).max() <= tolerance * want.max()
+
+
+def test_small_and_narrow_groups_are_evaluated_directly(monkeypatch):
+    rng = np.random.default_rng(0)
+    groups = [
+        rng.gamma(2.0, 5.0, 50),                 # small
+        20 + rng.normal(0, 0.01, 5_000),         # bandwidth under MIN_BANDWIDTH_STEPS grid steps
+        rng.gamma(2.0, 5.0, 1_000) + 50,         # reaches past the grid
+    ]
+    sizes = spy_direct(monkeypatch)
+    out = ridge_kde(groups, X_GRID, bw_factor=BW)
+    assert sizes == [len(g) for g in groups]
+    for values, row in zip(groups, out):
+        assert_close(row, reference(values), DIRECT_TOLERANCE)
+
+
+def test_large_groups_are_binned(monkeypatch):
+    rng = np.random.default_rng(1)
+    groups = [rng.gamma(2.0, scale, n).clip(0, 60) for n, scale in [(2_000, 6.0), (20_000, 3.0), (100_000, 0.8)]]
+    sizes = spy_direct(monkeypatch)
+    out = ridge_kde(groups, X_GRID, bw_factor=BW)
+    assert sizes == []
+    for values, row in zip(groups, out):
+        assert_close(row, reference(values), BINNED_TOLERANCE)
+
+
+@pytest.mark.parametrize("values", [[12.5], [3.0] * 1_000], ids=["single-value", "zero-variance"])
+def test_degenerate_groups_give_nan(values):
+    # No bandwidth can be estimated from these; the other groups are unaffected
+    rng = np.random.default_rng(2)
+    other = rng.gamma(2.0, 5.0, 2_000)
+    out = ridge_kde([np.array(values), other], X_GRID, bw_factor=BW)
+    assert np.isnan(out[0]).all()
+    assert_close(out[1], reference(other), BINNED_TOLERANCE)
+
+
+def test_empty_inputs():
+    assert ridge_kde([], X_GRID).shape == (0, len(X_GRID))
+    assert np.isnan(ridge_kde([np.arange(10.0)], X_GRID[:1])).all()
@@ -0,0 +1,55 @@
+import itertools
+
+import pytest
+
+import memo
+from memo import FigureCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    # Strictly increasing use times, so that LRU order is never a tie
+    ticks = itertools.count(1)
+    monkeypatch.setattr(memo.time, "time", lambda: float(next(ticks)))
+
+
+def keys(cache):
+    return {key for key, in cache._connect().execute("SELECT key FROM entries")}
+
+
+def test_evicts_least_recently_used_past_either_limit(tmp_path, clock):
+    cache = FigureCache(str(tmp_path / "figures.sqlite"), max_entries=3, max_bytes=35)
+    for key in "abc":
+        cache.put(key, "v1", "x" * 10)
+    assert cache.get("a") == "x" * 10  # a is now the most recently used
+    cache.put("d", "v1", "x" * 10)     # 4 entries: b goes
+    assert keys(cache) == {"a", "c", "d"}
+    assert cache.get("b") is None
+    cache.put("e", "v1", "x" * 20)     # 50 bytes: c, then a (used before d was put) go
+    assert keys(cache) == {"d", "e"}
+    assert cache.stats() == {"hits": 1, "misses": 1, "evictions": 3, "entries": 2, "bytes": 30}
+
+
+def test_hits_are_written_in_batches(tmp_path, clock):
+    path = str(tmp_path / "figures.sqlite")
+    cache = FigureCache(path, sync_interval=3600)
+    cache.put("a", "v1", "payload")
+    conn = cache._connect()
+    writes = conn.total_changes
+    for _ in range(10):
+        assert cache.get("a") == "payload"
+    assert cache.get("missing") is None
+    assert conn.total_changes == writes
+    # Counts reach the file, for every worker's stats, once synced
+    assert FigureCache(path).stats()["hits"] == 0
+    cache.sync()
+    assert FigureCache(path).stats()["hits"] == 10
+    assert FigureCache(path).stats()["misses"] == 1
+
+
+def test_purge_keeps_only_one_version(tmp_path):
+    cache = FigureCache(str(tmp_path / "figures.sqlite"))
+    cache.put("old", "v1", "x")
+    cache.put("new", "v2", "x")
+    cache.purge("v2")
+    assert keys(cache) == {"new"}
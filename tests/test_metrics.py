@@ -0,0 +1,39 @@
+import logging
+import os
+
+import pytest
+
+import metrics
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    # A store of its own, with only the metrics a test registers
+    monkeypatch.setattr(metrics, "_registry", [])
+    monkeypatch.setattr(metrics, "_store", dict(metrics._store, conn=None, pid=None))
+    metrics.use_store(str(tmp_path / "metrics.sqlite"), reset=True)
+
+
+def test_flushes_add_up_and_exited_processes_are_dropped(store):
+    requests = metrics.Counter("test_requests_total", "Requests.")
+    ready = metrics.Gauge("test_ready_seconds", "Seconds to ready.")
+    requests.inc(2, endpoint="a")
+    ready.set(1.5)
+    metrics.flush()
+    requests.inc(3, endpoint="a")
+    text = metrics.render()
+    assert 'test_requests_total{endpoint="a"} 5' in text
+    assert f'test_ready_seconds{{pid="{os.getpid()}"}} 1.5' in text
+
+    metrics.forget_process(os.getpid())
+    text = metrics.render()
+    assert 'test_requests_total{endpoint="a"} 5' in text
+    assert "test_ready_seconds{" not in text
+
+
+def test_errors_are_logged(store, caplog, monkeypatch):
+    monkeypatch.setattr(metrics, "ERRORS", metrics.Counter("satcat_errors_total", "Errors."))
+    with caplog.at_level(logging.ERROR, logger="metrics"):
+        metrics.error("orbit-pie", "figure", ValueError("boom"))
+    assert "Error in orbit-pie figure: boom" in caplog.text
+    assert 'satcat_errors_total{component="orbit-pie",stage="figure"} 1' in metrics.render()
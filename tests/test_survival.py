@@ -0,0 +1,121 @@
+import math
+
+import numpy as np
+import pytest
+
+from catalog import ORBIT_GROUPS
+from events import frame_as_of
+from survival import Z_95, kaplan_meier, life_tables
+
+# One cohort on a one-year grid: (lifespan, decommissioned)
+ROWS = [(0.5, True), (1.2, True), (1.7, False), (2.5, False), (3.1, True), (3.9, True), (4.5, False)]
+# Worked by hand: rows at risk when each bin starts, decommissioned in it
+AT_RISK = [7, 6, 4, 3, 1]
+EVENTS = [1, 1, 0, 2, 0]
+SURVIVAL = [6 / 7, 5 / 7, 5 / 7, 5 / 21, 5 / 21]
+# Greenwood sum of d / (n (n - d))
+GREENWOOD = [1 / 42, 1 / 42 + 1 / 30, 1 / 42 + 1 / 30, 1 / 42 + 1 / 30 + 2 / 3, 1 / 42 + 1 / 30 + 2 / 3]
+
+
+def tables(rows, n_bins=5):
+    durations, observed = zip(*rows)
+    return life_tables(durations, observed, np.zeros(len(rows)), 1, step=1.0, n_bins=n_bins)
+
+
+def test_life_tables_count_each_bin():
+    events, exits = tables(ROWS)
+    assert events.tolist() == [EVENTS]
+    assert exits.tolist() == [[1, 2, 1, 2, 1]]
+
+
+def test_matches_hand_worked_estimate():
+    survival, lower, upper, at_risk = kaplan_meier(*tables(ROWS))
+    assert at_risk[0].tolist() == AT_RISK
+    np.testing.assert_allclose(survival[0], SURVIVAL, rtol=1e-12)
+    for j, (s, v) in enumerate(zip(SURVIVAL, GREENWOOD)):
+        # log(-log) band: S ** exp(-+z sqrt(V) / |log S|)
+        se = math.sqrt(v) / abs(math.log(s))
+        assert lower[0, j] == pytest.approx(s ** math.exp(Z_95 * se), rel=1e-12)
+        assert upper[0, j] == pytest.approx(s ** math.exp(-Z_95 * se), rel=1e-12)
+        assert lower[0, j] < s < upper[0, j]
+
+
+def test_curve_ends_with_the_risk_set():
+    # Everyone has left after the fourth bin: nothing is estimated past it,
+    # and a curve that reaches 0 has no band
+    rows = [(0.5, False), (1.5, True), (2.5, True), (3.5, True)]
+    survival, lower, upper, at_risk = kaplan_meier(*tables(rows, n_bins=6))
+    assert at_risk[0].tolist() == [4, 3, 2, 1, 0, 0]
+    np.testing.assert_allclose(survival[0, :4], [1, 2 / 3, 1 / 3, 0])
+    assert lower[0, 0] == upper[0, 0] == 1
+    assert lower[0, 3] == upper[0, 3] == 0
+    assert np.isnan(survival[0, 4:]).all() and np.isnan(lower[0, 4:]).all() and np.isnan(upper[0, 4:]).all()
+
+
+def test_cohort_tables_add_up_to_their_union():
+    rng = np.random.default_rng(0)
+    n = 1000
+    durations = rng.uniform(0, 30, n)
+    observed = rng.random(n) < 0.6
+    cohorts = rng.integers(0, 4, n)
+    events, exits = life_tables(durations, observed, cohorts, 4)
+    union = life_tables(durations, observed, np.zeros(n), 1)
+    np.testing.assert_array_equal(events.sum(axis=0), union[0][0])
+    np.testing.assert_array_equal(exits.sum(axis=0), union[1][0])
+    # Each row of a stack of tables is estimated on its own
+    survival = kaplan_meier(events, exits)[0]
+    for k in range(4):
+        np.testing.assert_array_equal(survival[k], kaplan_meier(events[k], exits[k])[0][0])
+
+
+def test_matches_lifelines():
+    lifelines = pytest.importorskip("lifelines")
+    rng = np.random.default_rng(1)
+    n = 400
+    durations = rng.exponential(8, n).clip(0, 99)
+    observed = rng.random(n) < 0.7
+    events, exits = life_tables(durations, observed, np.zeros(n), 1)
+    survival, lower, upper, at_risk = kaplan_meier(events, exits)
+    # Rows leave at the end of their bin, censored rows after the events
+    fitter = lifelines.KaplanMeierFitter(alpha=0.05).fit((np.floor(durations / 0.25) + 1) * 0.25, observed)
+    ends = (np.arange(survival.shape[1]) + 1) * 0.25
+    seen = at_risk[0] > 0
+    np.testing.assert_allclose(survival[0, seen], fitter.survival_function_at_times(ends[seen]), rtol=1e-10)
+    band = fitter.confidence_interval_.reindex(ends[seen], method="ffill")
+    np.testing.assert_allclose(lower[0, seen], band.iloc[:, 0], rtol=1e-8)
+    np.testing.assert_allclose(upper[0, seen], band.iloc[:, 1], rtol=1e-8)
+
+
+def test_empty_selection():
+    events, exits = life_tables(np.empty(0), np.empty(0, dtype=bool), np.empty(0), 3)
+    assert events.shape == exits.shape == (3, events.shape[1])
+    assert not events.any() and not exits.any()
+    survival, lower, upper, at_risk = kaplan_meier(events, exits)
+    assert not at_risk.any()
+    assert np.isnan(survival).all() and np.isnan(lower).all() and np.isnan(upper).all()
+
+
+@pytest.mark.parametrize("as_of", [None, "2005-12-31T23:59:59"])
+def test_cohort_tables_match_the_frame(dashboard, as_of):
+    data = dashboard.live.current
+    decades, events, exits = dashboard.cohort_life_tables(data, [500, 3000], as_of)
+    df = data.df if as_of is None else frame_as_of(data.df, as_of)
+    rows = df[df["Mass"].between(500, 3000)]
+    counts = rows.groupby(["Launch_Decade", "Orbit_Group"], observed=True).size()
+    decommissioned = rows[~rows["IsActive"].astype(bool)].groupby(["Launch_Decade", "Orbit_Group"],
+                                                                  observed=True).size()
+    assert decades.tolist() == sorted(rows["Launch_Decade"].unique())
+    for (decade, group), n in counts.items():
+        cohort = (decades.tolist().index(decade), ORBIT_GROUPS.index(group))
+        assert exits[cohort].sum() == n
+        assert events[cohort].sum() == decommissioned.get((decade, group), 0)
+    assert exits.sum() == len(rows)
+
+
+@pytest.mark.parametrize("as_of", [None, "1900-12-31T23:59:59"])
+def test_empty_selection_shows_placeholder(dashboard, as_of):
+    # Masses no row has, or a date before the first launch
+    mass_range = [0, 10000] if as_of else [-2, -1]
+    fig = dashboard.build_survival_figure(dashboard.live.current, [1950, 2020], mass_range, 'All', 'All', as_of)
+    assert fig.layout.title.text == dashboard.empty_figure().layout.title.text
+    assert len(fig.data) == 0